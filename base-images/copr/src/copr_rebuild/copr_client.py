@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import shlex
@@ -15,6 +16,7 @@ import stamina
 logger = logging.getLogger(__name__)
 
 _DEFAULT_WAIT_TIMEOUT = 12 * 3600  # 12 hours
+_MAX_POLL_INTERVAL = 300  # 5 minutes
 
 # Terminal build statuses
 _SUCCEEDED = "succeeded"
@@ -35,6 +37,22 @@ _SCRIPT_CHROOT = "fedora-rawhide-x86_64"
 _SCRIPT_BUILDDEPS = "curl rpm cpio"
 
 
+def log_wave_progress(waves: list[list[str]], elapsed: float) -> None:
+    """Log one line per wave with the number of builds in each status.
+
+    Args:
+        waves: Build statuses grouped by wave.
+        elapsed: Seconds since the builds were submitted.
+    """
+    logger.info("Build progress after %.0fs:", elapsed)
+    for index, statuses in enumerate(waves):
+        counts: dict[str, int] = {}
+        for status in statuses:
+            counts[status] = counts.get(status, 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        logger.info("  Wave %d (%d builds): %s", index, len(statuses), summary)
+
+
 class CoprBuildError(Exception):
     """Raised when a Copr build fails."""
 
@@ -273,7 +291,6 @@ class CoprClient:
         """
         deadline = time.monotonic() + timeout
         interval = poll_interval
-        max_interval = 300  # 5 minutes
         polls = 0
 
         while True:
@@ -303,7 +320,7 @@ class CoprClient:
                 raise TimeoutError(msg)
 
             time.sleep(interval)
-            interval = min(interval * 1.5, max_interval)
+            interval = min(interval * 1.5, _MAX_POLL_INTERVAL)
 
     def submit_wave(self, srpm_urls: list[str], *, timeout: int | None = None) -> list[int]:
         """Submit all packages in a build wave.
@@ -317,91 +334,196 @@ class CoprClient:
         """
         return [self.submit_build(url, timeout=timeout) for url in srpm_urls]
 
-    def submit_all_waves(
+    @stamina.retry(on=CoprCliError, attempts=5, wait_initial=2.0, wait_max=60.0, wait_jitter=5.0)
+    def _list_builds(self) -> list[dict]:
+        """Return every build of the project from one ``copr-cli list-builds`` call."""
+        cmd = ["copr-cli", "list-builds", "--output-format", "json", self.project]
+        return json.loads(self._run_copr_cli(cmd))
+
+    def get_build_durations(self) -> dict[str, float]:
+        """Return how long the latest succeeded build of each package in the project took.
+
+        Returns:
+            Mapping of source package name to build duration in seconds.
+        """
+        durations: dict[str, float] = {}
+        for build in sorted(self._list_builds(), key=lambda b: b["id"]):
+            name = (build.get("source_package") or {}).get("name")
+            started, ended = build.get("started_on"), build.get("ended_on")
+            if build["state"] == _SUCCEEDED and name and started and ended:
+                durations[name] = float(ended - started)
+        return durations
+
+    def get_build_statuses(self, build_ids: list[int]) -> dict[int, str]:
+        """Query the status of many Copr builds at once.
+
+        One ``copr-cli list-builds`` call covers all builds of the project;
+        builds missing from the listing fall back to ``get_build_status``.
+
+        Args:
+            build_ids: The Copr build IDs.
+
+        Returns:
+            Mapping of build ID to status string.
+        """
+        states = {build["id"]: build["state"] for build in self._list_builds()}
+        statuses = {bid: states[bid] for bid in build_ids if bid in states}
+        for bid in build_ids:
+            if bid not in statuses:
+                logger.debug("Build %d missing from project listing, querying it directly", bid)
+                statuses[bid] = self.get_build_status(bid)
+        return statuses
+
+
+class DependencyScheduler:
+    """Submit each build with only its real predecessors, and wait for all of them.
+
+    Every build gets its own Copr batch.  A build is submitted with
+    ``--after-build-id`` on one of its unfinished in-project dependencies
+    when all its other unfinished dependencies are ahead of that one in
+    the same batch chain, so Copr starts it server-side as soon as they
+    succeed.  A build whose unfinished dependencies sit on different
+    chains is held back and submitted by the polling loop once enough of
+    them have succeeded.  Builds are considered in ``priority`` order
+    (longest remaining dependency chain first), so critical-path builds
+    reach the Copr queue first.
+    """
+
+    def __init__(
         self,
-        waves: list[list[tuple[str, str]]],
+        copr: CoprClient,
+        srpm_urls: dict[str, str],
+        dependencies: dict[str, frozenset[str]],
+        priority: list[str],
         *,
         timeout: int | None = None,
         skip_tests_names: frozenset[str] = frozenset(),
-    ) -> list[list[int]]:
-        """Submit all build waves at once using Copr batch ordering.
-
-        Builds within the same wave are placed in the same batch
-        (``--with-build-id``) so they run in parallel.  Each wave's batch
-        is chained after the previous wave's batch (``--after-build-id``)
-        so Copr enforces the correct build order server-side.
-
-        Packages whose names appear in ``skip_tests_names`` are submitted
-        via ``submit_custom_build`` (which patches ``%check`` to skip tests).
+    ) -> None:
+        """Initialize the schedule.
 
         Args:
-            waves: List of waves, where each wave is a list of
-                ``(package_name, srpm_url)`` tuples.
+            copr: Client for Copr operations.
+            srpm_urls: SRPM URL by package name.
+            dependencies: In-project build dependencies by package name.
+            priority: Package names in a topological order, most urgent first.
             timeout: Build timeout in seconds per build.
             skip_tests_names: Package names that should skip ``%check``.
+        """
+        self.copr = copr
+        self.srpm_urls = srpm_urls
+        self.dependencies = dependencies
+        self.priority = priority
+        self.timeout = timeout
+        self.skip_tests_names = skip_tests_names
+        self.build_ids: dict[str, int] = {}
+        # Packages each submitted build waits for through its batch chain
+        self._chain: dict[str, frozenset[str]] = {}
+
+    def _anchor(self, name: str, statuses: dict[str, str]) -> tuple[bool, str | None]:
+        """Decide whether *name* can be submitted now, and after which build.
+
+        Returns:
+            ``(ready, anchor)``: *anchor* is the package to chain after, or
+            None when every dependency has already succeeded.
+        """
+        active = [dep for dep in self.dependencies[name] if statuses.get(dep) != _SUCCEEDED]
+        if any(dep not in self.build_ids for dep in active):
+            return False, None
+        if not active:
+            return True, None
+        for anchor in sorted(active, key=lambda dep: len(self._chain[dep]), reverse=True):
+            if all(dep == anchor or dep in self._chain[anchor] for dep in active):
+                return True, anchor
+        return False, None
+
+    def submit_ready(self, statuses: dict[str, str]) -> list[str]:
+        """Submit every unsubmitted build whose dependencies allow it.
+
+        Args:
+            statuses: Current status of the submitted builds, by package name.
 
         Returns:
-            List of lists of Copr build IDs (one inner list per wave).
+            Names of the packages submitted in this call.
         """
-        all_wave_ids: list[list[int]] = []
-        prev_wave_anchor: int | None = None
-
-        for wave_items in waves:
-            wave_ids: list[int] = []
-            wave_anchor: int | None = None
-
-            for i, (name, url) in enumerate(wave_items):
-                submit = self.submit_custom_build if name in skip_tests_names else self.submit_build
-                if i == 0:
-                    # First build in the wave: chain after previous wave (if any)
-                    build_id = submit(
-                        url,
-                        timeout=timeout,
-                        after_build_id=prev_wave_anchor,
-                    )
-                    wave_anchor = build_id
-                else:
-                    # Subsequent builds: same batch as the first build in this wave
-                    build_id = submit(
-                        url,
-                        timeout=timeout,
-                        with_build_id=wave_anchor,
-                    )
-                wave_ids.append(build_id)
-
-            all_wave_ids.append(wave_ids)
-            prev_wave_anchor = wave_anchor
-
-        return all_wave_ids
-
-    def wait_for_wave(
+        submitted: list[str] = []
+        for name in self.priority:
+            if name in self.build_ids:
+                continue
+            ready, anchor = self._anchor(name, statuses)
+            if not ready:
+                continue
+            submit = self.copr.submit_custom_build if name in self.skip_tests_names else self.copr.submit_build
+            after_build_id = self.build_ids[anchor] if anchor is not None else None
+            self.build_ids[name] = submit(self.srpm_urls[name], timeout=self.timeout, after_build_id=after_build_id)
+            self._chain[name] = self._chain[anchor] | {anchor} if anchor is not None else frozenset()
+            logger.info(
+                "Submitted %s as build %d%s",
+                name,
+                self.build_ids[name],
+                f" (after {anchor}, build {after_build_id})" if anchor is not None else "",
+            )
+            submitted.append(name)
+        return submitted
+
+    def run(
         self,
-        build_ids: list[int],
+        waves: list[list[str]],
         poll_interval: int = 30,
         timeout: int = _DEFAULT_WAIT_TIMEOUT,
-    ) -> None:
-        """Wait for all builds to complete, polling round-robin for fast failure detection.
+    ) -> dict[str, int]:
+        """Submit all builds and wait for them to complete.
+
+        Each polling round fetches every status with one
+        ``get_build_statuses`` call.  The interval starts at ``poll_interval``,
+        grows by 1.5x (capped at 5 minutes) while nothing changes, and resets
+        as soon as any build changes status or is submitted.  Held-back builds
+        are submitted as soon as a polling round allows it, and the progress
+        table lists them as ``unsubmitted`` until then.
 
         Args:
-            build_ids: List of Copr build IDs to monitor.
-            poll_interval: Seconds between polling rounds.
+            waves: Package names grouped by wave, for the progress table.
+            poll_interval: Initial seconds between polling rounds.
             timeout: Maximum seconds to wait before raising TimeoutError.
 
+        Returns:
+            Copr build ID by package name.
+
         Raises:
-            CoprBuildError: If any build fails or is canceled.
+            CoprBuildError: As soon as any build fails or is canceled.
             TimeoutError: If builds do not finish within ``timeout`` seconds.
         """
-        deadline = time.monotonic() + timeout
-        pending = set(build_ids)
-        while pending:
-            for bid in list(pending):
-                status = self.get_build_status(bid)
-                logger.info("Build %d: %s", bid, status)
-                if status == _SUCCEEDED:
-                    pending.discard(bid)
-                elif status in (_FAILED, _CANCELED):
-                    raise CoprBuildError(bid, status)
-            if pending:
-                if time.monotonic() + poll_interval > deadline:
-                    raise TimeoutError(f"Timed out waiting for builds {sorted(pending)} after {timeout}s")
-                time.sleep(poll_interval)
+        start = time.monotonic()
+        deadline = start + timeout
+        interval: float = poll_interval
+        statuses: dict[str, str] = {}
+        self.submit_ready(statuses)
+        held_back = len(self.priority) - len(self.build_ids)
+        logger.info("Submitted %d builds upfront, %d held back for their dependencies", len(self.build_ids), held_back)
+        rounds = 0
+
+        while True:
+            names = list(self.build_ids)
+            by_id = self.copr.get_build_statuses([self.build_ids[name] for name in names])
+            previous, statuses = statuses, {name: by_id[self.build_ids[name]] for name in names}
+            failed = [name for name in names if statuses[name] in (_FAILED, _CANCELED)]
+            # nothing more is queued once a build failed, its dependents could never build
+            submitted = self.submit_ready(statuses) if not failed else []
+            changed = bool(submitted) or statuses != previous
+            rounds += 1
+            if changed or rounds % 10 == 0:
+                table = [
+                    [statuses.get(name, "submitted" if name in self.build_ids else "unsubmitted") for name in wave]
+                    for wave in waves
+                ]
+                log_wave_progress(table, time.monotonic() - start)
+
+            if failed:
+                raise CoprBuildError(self.build_ids[failed[0]], statuses[failed[0]])
+            pending = sorted(name for name in self.priority if statuses.get(name) != _SUCCEEDED)
+            if not pending:
+                return self.build_ids
+
+            interval = poll_interval if changed else min(interval * 1.5, _MAX_POLL_INTERVAL)
+            if time.monotonic() + interval > deadline:
+                raise TimeoutError(f"Timed out waiting for builds of {pending} after {timeout}s")
+            time.sleep(interval)
@@ -6,37 +6,28 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 
-from .models import BuildWave, PackageMetadata
+from .models import BuildWave, PackageMetadata, ScheduleEstimate
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BUILD_DURATION = 3600.0  # assumed build time (seconds) when Copr has no history at all
 
-def compute_build_waves(packages: dict[str, PackageMetadata]) -> list[BuildWave]:
-    """Compute build waves via topological sort (Kahn's algorithm).
 
-    Given a set of packages with their provides and build_requires,
-    determine which packages can be built in parallel (same wave) and
-    which must wait for earlier waves to complete.
+def compute_dependencies(packages: dict[str, PackageMetadata]) -> dict[str, frozenset[str]]:
+    """Map each package to the in-project packages it BuildRequires.
 
     Algorithm:
         1. Build a global provides map: capability -> source package name
         2. For each package, intersect its BuildRequires with the provides map
            to find in-project dependency edges
-        3. Topological sort (Kahn's algorithm) into waves
 
     Args:
         packages: Mapping of source package name to its metadata.
 
     Returns:
-        Ordered list of BuildWave objects. Packages within a wave have
-        no inter-dependencies and can be built in parallel.
-
-    Raises:
-        ValueError: If a dependency cycle is detected among the packages.
+        Mapping of source package name to the names of its in-project
+        build dependencies (never including itself).
     """
-    if not packages:
-        return []
-
     # Step 1: provides map (only for packages in our set)
     provides_map: dict[str, str] = {}
     for pkg in packages.values():
@@ -51,24 +42,53 @@ def compute_build_waves(packages: dict[str, PackageMetadata]) -> list[BuildWave]
                 )
             provides_map[cap] = pkg.name
 
-    # Step 2: build adjacency list
-    # in_degree[pkg] = number of in-project packages it depends on
-    in_degree: dict[str, int] = dict.fromkeys(packages, 0)
-    dependents: dict[str, list[str]] = defaultdict(list)
-
+    # Step 2: in-project dependency edges
+    dependencies: dict[str, frozenset[str]] = {}
     for pkg in packages.values():
         deps_in_project: set[str] = set()
         for req in pkg.build_requires:
             provider = provides_map.get(req)
             if provider is not None and provider != pkg.name:
                 deps_in_project.add(provider)
-        in_degree[pkg.name] = len(deps_in_project)
-        for dep in deps_in_project:
-            dependents[dep].append(pkg.name)
+        dependencies[pkg.name] = frozenset(deps_in_project)
+    return dependencies
+
+
+def compute_build_waves(packages: dict[str, PackageMetadata]) -> list[BuildWave]:
+    """Compute build waves via topological sort (Kahn's algorithm).
+
+    Given a set of packages with their provides and build_requires,
+    determine which packages can be built in parallel (same wave) and
+    which must wait for earlier waves to complete.
+
+    Algorithm:
+        1. Find in-project dependency edges (``compute_dependencies``)
+        2. Topological sort (Kahn's algorithm) into waves
+
+    Args:
+        packages: Mapping of source package name to its metadata.
+
+    Returns:
+        Ordered list of BuildWave objects. Packages within a wave have
+        no inter-dependencies and can be built in parallel.
+
+    Raises:
+        ValueError: If a dependency cycle is detected among the packages.
+    """
+    if not packages:
+        return []
+
+    # in_degree[pkg] = number of in-project packages it depends on
+    dependencies = compute_dependencies(packages)
+    in_degree: dict[str, int] = {name: len(deps) for name, deps in dependencies.items()}
+    dependents: dict[str, list[str]] = defaultdict(list)
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(name)
 
     logger.debug("Dependency edges: %s", dict(dependents))
 
-    # Step 3: Kahn's algorithm, collecting by wave
+    # Kahn's algorithm, collecting by wave
     waves: list[BuildWave] = []
     queue = sorted(name for name, deg in in_degree.items() if deg == 0)
     wave_idx = 0
@@ -92,3 +112,63 @@ def compute_build_waves(packages: dict[str, PackageMetadata]) -> list[BuildWave]
         raise ValueError(msg)
 
     return waves
+
+
+def estimate_schedule(
+    waves: list[BuildWave],
+    dependencies: dict[str, frozenset[str]],
+    durations: dict[str, float],
+) -> ScheduleEstimate:
+    """Estimate build timing when every build starts as soon as its own dependencies finish.
+
+    Packages without a known duration are assumed to take the median of the
+    known durations, or ``DEFAULT_BUILD_DURATION`` when nothing is known.
+    Copr capacity is assumed to be unlimited, so the makespan is the length
+    of the critical path (the longest duration-weighted dependency chain).
+
+    Args:
+        waves: Build waves from ``compute_build_waves`` (a topological order).
+        dependencies: In-project dependencies from ``compute_dependencies``.
+        durations: Historical build duration in seconds, by package name.
+
+    Returns:
+        ScheduleEstimate with per-package start times, the critical path,
+        the expected makespan, and the makespan of strict wave-by-wave builds.
+    """
+    known = sorted(durations[name] for name in dependencies if name in durations)
+    fallback = known[len(known) // 2] if known else DEFAULT_BUILD_DURATION
+    duration = {name: max(durations.get(name, fallback), 1.0) for name in dependencies}
+    order = [name for wave in waves for name in wave.packages]
+
+    # Earliest start and the predecessor that determines it
+    start: dict[str, float] = {}
+    critical_dep: dict[str, str | None] = {}
+    for name in order:
+        dep = max(dependencies[name], key=lambda d: start[d] + duration[d], default=None)
+        critical_dep[name] = dep
+        start[name] = start[dep] + duration[dep] if dep is not None else 0.0
+
+    # Longest remaining chain from the start of each package: submission priority
+    dependents: dict[str, list[str]] = defaultdict(list)
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(name)
+    remaining: dict[str, float] = {}
+    for name in reversed(order):
+        remaining[name] = duration[name] + max((remaining[d] for d in dependents[name]), default=0.0)
+
+    makespan = max((start[name] + duration[name] for name in order), default=0.0)
+    critical_path: list[str] = []
+    last = max(order, key=lambda n: start[n] + duration[n], default=None)
+    while last is not None:
+        critical_path.append(last)
+        last = critical_dep[last]
+
+    return ScheduleEstimate(
+        durations=duration,
+        start=start,
+        critical_path=critical_path[::-1],
+        priority=sorted(order, key=lambda n: (-remaining[n], n)),
+        makespan=makespan,
+        wave_makespan=sum(max(duration[name] for name in wave.packages) for wave in waves),
+    )
@@ -4,9 +4,16 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
 import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
 
 import koji
+import pydantic
 import stamina
 
 from .models import PackageMetadata
@@ -18,12 +25,51 @@ DEP_BUILDREQUIRES = 0  # BuildRequires on SRPMs use type 0 in Koji
 DEP_PROVIDES = 1
 DEP_REQUIRES = 2
 
+# Calls per multicall request, and multicall requests in flight at once
+MULTICALL_BATCH_SIZE = 100
+MULTICALL_WORKERS = 4
+
+
+def default_cache_dir() -> Path:
+    """Return the directory for cached Koji metadata (``$XDG_CACHE_HOME/copr-rebuild/koji``)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "copr-rebuild" / "koji"
+
+
+type _Call = tuple[str, tuple[Any, ...], dict[str, Any]]
 
-class KojiClient:
-    """Wrapper around the Koji XML-RPC API for querying package metadata."""
 
-    def __init__(self, hub_url: str = "https://koji.fedoraproject.org/kojihub") -> None:
+class KojiClient:
+    """Wrapper around the Koji XML-RPC API for querying package metadata.
+
+    Calls are batched with Koji ``multicall`` and the batches are sent
+    concurrently, each worker thread using its own ``ClientSession``.
+
+    Build metadata is cached on disk by NVR.  A Koji NVR identifies one
+    immutable build, so cache entries never expire; pass ``refresh=True``
+    to re-query Koji and overwrite them.
+    """
+
+    def __init__(
+        self,
+        hub_url: str = "https://koji.fedoraproject.org/kojihub",
+        cache_dir: Path | None = None,
+        *,
+        refresh: bool = False,
+    ) -> None:
+        self.hub_url = hub_url
         self.session = koji.ClientSession(hub_url)
+        self.cache_dir = cache_dir / (urlparse(hub_url).hostname or "koji") if cache_dir is not None else None
+        self.refresh = refresh
+        self._local = threading.local()
+
+    def _session(self) -> koji.ClientSession:
+        """Return the ``ClientSession`` of the calling thread (sessions are not thread-safe)."""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        if not hasattr(self._local, "session"):
+            self._local.session = koji.ClientSession(self.hub_url)
+        return self._local.session
 
     @stamina.retry(
         on=(xmlrpc.client.ProtocolError, ConnectionError, TimeoutError),
@@ -32,6 +78,49 @@ class KojiClient:
         wait_max=60.0,
         wait_jitter=5.0,
     )
+    def _call_batch(self, calls: list[_Call]) -> list[Any]:
+        """Send one multicall request and return the results in call order.
+
+        Raises:
+            koji.GenericError: (or a subclass) for the first call that returned a fault.
+        """
+        with self._session().multicall(strict=False) as m:
+            pending = [getattr(m, method)(*args, **kwargs) for method, args, kwargs in calls]
+        return [call.result for call in pending]
+
+    def _multicall(self, calls: list[_Call]) -> list[Any]:
+        """Run *calls* in multicall batches of ``MULTICALL_BATCH_SIZE``, several batches at a time."""
+        batches = [calls[i : i + MULTICALL_BATCH_SIZE] for i in range(0, len(calls), MULTICALL_BATCH_SIZE)]
+        if len(batches) <= 1:
+            return self._call_batch(calls) if calls else []
+        with ThreadPoolExecutor(max_workers=MULTICALL_WORKERS, thread_name_prefix="koji") as pool:
+            return [result for batch in pool.map(self._call_batch, batches) for result in batch]
+
+    def _cache_file(self, nvr: str) -> Path | None:
+        return self.cache_dir / f"{nvr}.json" if self.cache_dir is not None else None
+
+    def _load_cached(self, nvr: str) -> PackageMetadata | None:
+        path = self._cache_file(nvr)
+        if path is None or self.refresh:
+            return None
+        try:
+            meta = PackageMetadata.model_validate_json(path.read_bytes())
+        except OSError, pydantic.ValidationError:
+            return None
+        return meta if meta.nvr == nvr else None
+
+    def _store_cached(self, meta: PackageMetadata) -> None:
+        path = self._cache_file(meta.nvr)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(meta.model_dump_json(), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as exc:
+            logger.warning("Could not cache Koji metadata for %s: %s", meta.nvr, exc)
+
     def get_package_metadata(self, nvr: str) -> PackageMetadata:
         """Query Koji for a build's subpackages, provides, and BuildRequires.
 
@@ -41,42 +130,97 @@ class KojiClient:
         Returns:
             PackageMetadata with provides/build_requires populated from Koji.
         """
-        build = self.session.getBuild(nvr, strict=True)
-        rpms = self.session.listRPMs(buildID=build["id"])
-
-        # Find SRPM
-        srpm = next((r for r in rpms if r["arch"] == "src"), None)
-        if srpm is None:
-            msg = f"No SRPM found for build {nvr}"
-            raise ValueError(msg)
-
-        # Collect Provides from all binary RPMs
-        provides: set[str] = set()
-        for rpm in rpms:
-            if rpm["arch"] == "src":
-                continue
-            deps = self.session.getRPMDeps(rpm["id"], depType=DEP_PROVIDES)
-            provides.update(d["name"] for d in deps)
-
-        # Get BuildRequires from SRPM
+        return self.get_packages_metadata([nvr])[nvr]
+
+    def get_packages_metadata(self, nvrs: list[str]) -> dict[str, PackageMetadata]:
+        """Query Koji for the metadata of several builds at once.
+
+        Uncached NVRs are resolved together in three multicall rounds:
+        ``getBuild``, ``listRPMs``, then ``getRPMDeps`` for every RPM of
+        every build.
+
+        Args:
+            nvrs: Name-Version-Release strings.
+
+        Returns:
+            Mapping of NVR to PackageMetadata, in the order of *nvrs*.
+
+        Raises:
+            ValueError: If a build does not exist or has no SRPM.
+        """
+        found: dict[str, PackageMetadata] = {}
+        missing: list[str] = []
+        for nvr in dict.fromkeys(nvrs):
+            meta = self._load_cached(nvr)
+            if meta is None:
+                missing.append(nvr)
+            else:
+                found[nvr] = meta
+        if found:
+            logger.info("Using cached Koji metadata for %d of %d builds", len(found), len(found) + len(missing))
+
+        if missing:
+            for meta in self._fetch_packages_metadata(missing):
+                self._store_cached(meta)
+                found[meta.nvr] = meta
+
+        return {nvr: found[nvr] for nvr in nvrs}
+
+    def _fetch_packages_metadata(self, nvrs: list[str]) -> list[PackageMetadata]:
+        builds = self._multicall([("getBuild", (nvr,), {}) for nvr in nvrs])
+        for nvr, build in zip(nvrs, builds, strict=True):
+            if build is None:
+                msg = f"No such build in Koji: {nvr}"
+                raise ValueError(msg)
+
+        rpm_lists = self._multicall([("listRPMs", (), {"buildID": build["id"]}) for build in builds])
+
+        # Find SRPMs
+        srpms = []
+        for nvr, rpms in zip(nvrs, rpm_lists, strict=True):
+            srpm = next((r for r in rpms if r["arch"] == "src"), None)
+            if srpm is None:
+                msg = f"No SRPM found for build {nvr}"
+                raise ValueError(msg)
+            srpms.append(srpm)
+
+        # Provides of every binary RPM and all deps of every SRPM, in one round.
         # Note: Koji stores SRPM BuildRequires with type=0, not the usual
-        # REQUIRES type (2).  We fetch all deps and filter by type.
-        all_srpm_deps = self.session.getRPMDeps(srpm["id"])
-        build_requires = {
-            d["name"] for d in all_srpm_deps if d["type"] == DEP_BUILDREQUIRES and not d["name"].startswith("rpmlib(")
-        }
+        # REQUIRES type (2).  We fetch all SRPM deps and filter by type.
+        dep_calls: list[_Call] = []
+        for rpms, srpm in zip(rpm_lists, srpms, strict=True):
+            dep_calls.append(("getRPMDeps", (srpm["id"],), {}))
+            dep_calls.extend(("getRPMDeps", (r["id"],), {"depType": DEP_PROVIDES}) for r in rpms if r["arch"] != "src")
+        logger.info("Querying Koji for dependencies of %d RPMs in %d builds ...", len(dep_calls), len(nvrs))
+        deps = iter(self._multicall(dep_calls))
 
-        # Build SRPM download URL
         pathinfo = koji.PathInfo(topdir="https://kojipkgs.fedoraproject.org")
-        srpm_url = pathinfo.build(build) + "/" + pathinfo.rpm(srpm)
-
-        logger.info("Fetched metadata for %s: %d provides, %d build_requires", nvr, len(provides), len(build_requires))
-
-        return PackageMetadata(
-            name=build["name"],
-            nvr=nvr,
-            srpm_id=srpm["id"],
-            srpm_url=srpm_url,
-            provides=frozenset(provides),
-            build_requires=frozenset(build_requires),
-        )
+        results = []
+        for nvr, build, rpms, srpm in zip(nvrs, builds, rpm_lists, srpms, strict=True):
+            all_srpm_deps = next(deps)
+            build_requires = {
+                d["name"]
+                for d in all_srpm_deps
+                if d["type"] == DEP_BUILDREQUIRES and not d["name"].startswith("rpmlib(")
+            }
+            provides: set[str] = set()
+            for _ in range(sum(r["arch"] != "src" for r in rpms)):
+                provides.update(d["name"] for d in next(deps))
+
+            # Build SRPM download URL
+            srpm_url = pathinfo.build(build) + "/" + pathinfo.rpm(srpm)
+
+            logger.info(
+                "Fetched metadata for %s: %d provides, %d build_requires", nvr, len(provides), len(build_requires)
+            )
+            results.append(
+                PackageMetadata(
+                    name=build["name"],
+                    nvr=nvr,
+                    srpm_id=srpm["id"],
+                    srpm_url=srpm_url,
+                    provides=frozenset(provides),
+                    build_requires=frozenset(build_requires),
+                )
+            )
+        return results
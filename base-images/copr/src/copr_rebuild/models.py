@@ -66,6 +66,19 @@ class BuildWave(BaseModel):
     model_config = {"frozen": True}
 
 
+class ScheduleEstimate(BaseModel):
+    """Expected timing of a build plan, from historical build durations."""
+
+    durations: dict[str, float] = Field(description="Expected build duration in seconds, by package name")
+    start: dict[str, float] = Field(description="Earliest start in seconds after submission, by package name")
+    critical_path: list[str] = Field(description="Longest dependency chain, first build first")
+    priority: list[str] = Field(description="Package names by descending longest remaining chain (topological)")
+    makespan: float = Field(description="Expected seconds until the last build finishes")
+    wave_makespan: float = Field(description="Expected seconds if every wave waited for the whole previous wave")
+
+    model_config = {"frozen": True}
+
+
 class BuildResult(BaseModel):
     """Result of a single Copr build."""
 
@@ -5,16 +5,18 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
+import subprocess
 import sys
 from pathlib import Path
 
 import yaml
 
-from copr_rebuild.copr_client import CoprBuildError, CoprClient, CoprCliError
-from copr_rebuild.dependency_resolver import compute_build_waves
-from copr_rebuild.koji_client import KojiClient
-from copr_rebuild.models import Manifest, PackageMetadata
+from copr_rebuild.copr_client import CoprBuildError, CoprClient, CoprCliError, DependencyScheduler
+from copr_rebuild.dependency_resolver import compute_build_waves, compute_dependencies, estimate_schedule
+from copr_rebuild.koji_client import KojiClient, default_cache_dir
+from copr_rebuild.models import Manifest, PackageMetadata, ScheduleEstimate
 
 logger = logging.getLogger(__name__)
 
@@ -39,14 +41,18 @@ def resolve_package_metadata(
 ) -> tuple[dict[str, PackageMetadata], frozenset[str]]:
     """Query Koji for metadata of all packages in the manifest.
 
+    All entries are resolved together, so Koji calls for different
+    packages share multicall batches.
+
     Returns:
         Tuple of (packages dict keyed by name, frozenset of names with skip_tests).
     """
     packages: dict[str, PackageMetadata] = {}
     skip_tests_names: set[str] = set()
+    logger.info("Querying Koji for %d builds ...", len(manifest.packages))
+    metadata = koji_client.get_packages_metadata([entry.nvr for entry in manifest.packages])
     for entry in manifest.packages:
-        logger.info("Querying Koji for %s ...", entry.nvr)
-        meta = koji_client.get_package_metadata(entry.nvr)
+        meta = metadata[entry.nvr]
         if entry.name != meta.name:
             msg = f"Manifest name mismatch for {entry.nvr}: manifest says '{entry.name}', Koji says '{meta.name}'"
             raise ValueError(msg)
@@ -72,6 +78,37 @@ def configure_chroots(manifest: Manifest, copr: CoprClient) -> None:
         copr.configure_chroot(chroot, packages=manifest.chroot_packages)
 
 
+def load_build_durations(copr: CoprClient) -> dict[str, float]:
+    """Fetch historical build durations from Copr, or an empty mapping if Copr cannot be queried.
+
+    Args:
+        copr: Client for Copr operations.
+    """
+    try:
+        return copr.get_build_durations()
+    except (CoprCliError, OSError, subprocess.TimeoutExpired, json.JSONDecodeError) as exc:
+        logger.warning("Could not fetch build durations from Copr, using defaults: %s", exc)
+        return {}
+
+
+def _hours(seconds: float) -> str:
+    return f"{seconds / 3600:.1f}h"
+
+
+def print_estimate(estimate: ScheduleEstimate, durations: dict[str, float]) -> None:
+    """Print the expected makespan and critical path of a build plan.
+
+    Args:
+        estimate: Schedule estimate from ``estimate_schedule``.
+        durations: Historical build durations (packages missing here use estimated defaults).
+    """
+    print(f"  Expected makespan: {_hours(estimate.makespan)} (wave by wave: {_hours(estimate.wave_makespan)})")
+    print(f"  Critical path: {' -> '.join(estimate.critical_path)}")
+    missing = sorted(set(estimate.durations) - set(durations))
+    if missing:
+        print(f"  No build history for: {', '.join(missing)}")
+
+
 def run_dry_run(manifest: Manifest, koji_client: KojiClient) -> None:
     """Compute and display the build plan without submitting builds.
 
@@ -81,6 +118,9 @@ def run_dry_run(manifest: Manifest, koji_client: KojiClient) -> None:
     """
     packages, _ = resolve_package_metadata(manifest, koji_client)
     waves = compute_build_waves(packages)
+    dependencies = compute_dependencies(packages)
+    durations = load_build_durations(CoprClient(project=manifest.copr_project))
+    estimate = estimate_schedule(waves, dependencies, durations)
 
     print("Build plan:")
     print(f"  Copr project: {manifest.copr_project}")
@@ -92,6 +132,7 @@ def run_dry_run(manifest: Manifest, koji_client: KojiClient) -> None:
         print(f"  Build timeout: {manifest.build_timeout}s ({manifest.build_timeout / 3600:.1f}h)")
     print(f"  Total packages: {len(packages)}")
     print(f"  Total waves: {len(waves)}")
+    print_estimate(estimate, durations)
     entries_by_name = {e.name: e for e in manifest.packages}
     print()
     for wave in waves:
@@ -100,6 +141,9 @@ def run_dry_run(manifest: Manifest, koji_client: KojiClient) -> None:
             meta = packages[pkg_name]
             print(f"    - {meta.nvr}")
             print(f"      SRPM: {meta.srpm_url}")
+            start, duration = estimate.start[pkg_name], estimate.durations[pkg_name]
+            after = ", ".join(sorted(dependencies[pkg_name])) or "nothing"
+            print(f"      Estimate: starts at +{_hours(start)}, takes {_hours(duration)}, after {after}")
             if entries_by_name[pkg_name].skip_tests:
                 print("      [skip_tests: %check disabled]")
 
@@ -107,10 +151,11 @@ def run_dry_run(manifest: Manifest, koji_client: KojiClient) -> None:
 def run_rebuild(manifest: Manifest, koji_client: KojiClient) -> None:
     """Execute the full rebuild: resolve dependencies, submit builds, wait for completion.
 
-    All waves are submitted upfront using Copr's batch ordering
-    (``--with-build-id`` / ``--after-build-id``), so Copr enforces the
-    correct build sequence server-side.  The tool then waits for all
-    builds to complete.
+    Each build is submitted with only its real in-project predecessors
+    (see ``DependencyScheduler``), most of them upfront using Copr's batch
+    ordering (``--after-build-id``), so Copr enforces the build sequence
+    server-side.  The tool then waits for all builds to complete,
+    submitting any held-back builds once their dependencies allow it.
 
     Args:
         manifest: The validated manifest.
@@ -118,31 +163,29 @@ def run_rebuild(manifest: Manifest, koji_client: KojiClient) -> None:
     """
     packages, skip_tests_names = resolve_package_metadata(manifest, koji_client)
     waves = compute_build_waves(packages)
+    dependencies = compute_dependencies(packages)
 
     copr = CoprClient(project=manifest.copr_project)
     configure_chroots(manifest, copr)
 
-    # Collect (name, srpm_url) tuples grouped by wave
-    wave_items: list[list[tuple[str, str]]] = [
-        [(name, packages[name].srpm_url) for name in wave.packages] for wave in waves
-    ]
+    durations = load_build_durations(copr)
+    estimate = estimate_schedule(waves, dependencies, durations)
+    print_estimate(estimate, durations)
 
-    # Submit all waves at once; Copr handles ordering via batches
-    print(f"Submitting {len(packages)} packages in {len(waves)} waves ...")
-    all_wave_ids = copr.submit_all_waves(
-        wave_items,
+    scheduler = DependencyScheduler(
+        copr,
+        {name: meta.srpm_url for name, meta in packages.items()},
+        dependencies,
+        estimate.priority,
         timeout=manifest.build_timeout,
-        skip_tests_names=frozenset(skip_tests_names),
+        skip_tests_names=skip_tests_names,
     )
+    print(f"Submitting {len(packages)} packages ...")
+    build_ids = scheduler.run([wave.packages for wave in waves])
 
-    # Report submitted build IDs
-    for wave, wave_ids in zip(waves, all_wave_ids, strict=True):
-        print(f"  Wave {wave.index} ({wave.packages}): build IDs {wave_ids}")
-
-    # Wait for all builds to complete
-    all_build_ids = [bid for wave_ids in all_wave_ids for bid in wave_ids]
-    print(f"Waiting for {len(all_build_ids)} builds to complete ...")
-    copr.wait_for_wave(all_build_ids)
+    # Report build IDs
+    for wave in waves:
+        print(f"  Wave {wave.index} ({wave.packages}): build IDs {[build_ids[name] for name in wave.packages]}")
 
     print("All builds complete.")
 
@@ -161,6 +204,22 @@ def main(argv: list[str] | None = None) -> None:
         action="store_true",
         help="Compute and display the build plan without submitting builds",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Directory for Koji build metadata cached by NVR (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the Koji metadata cache",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-query Koji for every NVR and overwrite the cached metadata",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -180,7 +239,7 @@ def main(argv: list[str] | None = None) -> None:
         print(f"Error: failed to load manifest {args.manifest}: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    koji_client = KojiClient()
+    koji_client = KojiClient(cache_dir=None if args.no_cache else args.cache_dir, refresh=args.refresh)
 
     try:
         if args.dry_run:
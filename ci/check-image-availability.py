@@ -5,22 +5,28 @@ This is a focused availability check.
 It verifies that images can be fetched and, for successful checks,
 reads the image config timestamp so CI and local runs can show a richer summary with image age.
 
+Digest-pinned references (``repo@sha256:...``) are immutable, so a successful check is
+remembered in .cache/check-image-availability/inspect.json and reused on later runs
+(for a week locally, for a day in CI, where the workflow keeps the file with actions/cache);
+only new digests and tag-based references go to the registry. Pass ``--refresh`` to
+ignore the cache (entries are still rewritten afterwards).
+
 Usage:
     python ci/check-image-availability.py manifests/odh/base/params-latest.env manifests/odh/base/params.env
+    python ci/check-image-availability.py --refresh manifests/odh/base/params.env
 """
 
 from __future__ import annotations
 
+import argparse
 import asyncio
 import json
 import os
 import pathlib
-import re
-import shutil
 import sys
 from contextlib import AbstractContextManager
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from typing import Self
 from urllib.parse import quote
 
@@ -31,6 +37,7 @@ from rich.table import Table
 from rich.text import Text
 
 from ci.logging_config import configure_logging, make_pretty_log
+from ci.oci_registry import ImageReference, RegistryClient, RegistryError
 from manifests.tools.commit_env_refs import parse_env_file as _parse_env_dict
 
 log = structlog.get_logger()
@@ -40,6 +47,15 @@ COMMAND_TIMEOUT_SECONDS = 120
 MAX_CONCURRENT_CHECKS = 22
 SUMMARY_MISSING_VALUE = "—"
 
+ROOT_DIR = pathlib.Path(__file__).parent.parent
+INSPECT_CACHE_FILE = ROOT_DIR / ".cache" / "check-image-availability" / "inspect.json"
+# Least recently used entries beyond this are dropped when the cache is saved.
+INSPECT_CACHE_MAX_ENTRIES = 2000
+# Registries can garbage-collect digests too; re-confirm cached ones now and then.
+INSPECT_CACHE_MAX_AGE = timedelta(days=7)
+# The scheduled workflow exists to notice such deletions, so it re-confirms much sooner.
+INSPECT_CACHE_MAX_AGE_CI = timedelta(days=1)
+
 
 @dataclass(slots=True)
 class ImageCheckResult:
@@ -48,6 +64,7 @@ class ImageCheckResult:
     available: bool
     created: datetime | None = None
     error: str | None = None
+    cached: bool = False
 
 
 @dataclass(slots=True)
@@ -56,6 +73,94 @@ class ProgressState:
     completed: int = 0
     ok_count: int = 0
     missing_count: int = 0
+    cached_count: int = 0
+
+
+def is_digest_reference(image_url: str) -> bool:
+    return "@sha256:" in image_url
+
+
+class InspectCache:
+    """On-disk record of successful checks of digest-pinned images.
+
+    Keyed by ``repository@sha256:digest`` (availability is per repository, not per blob).
+    Only positive results are stored: a digest that is missing now may still be pushed later.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        *,
+        max_entries: int = INSPECT_CACHE_MAX_ENTRIES,
+        max_age: timedelta = INSPECT_CACHE_MAX_AGE,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: dict[str, dict[str, str | None]] = {}
+        self.hits = 0
+
+    @classmethod
+    def load(
+        cls,
+        path: pathlib.Path,
+        *,
+        max_entries: int = INSPECT_CACHE_MAX_ENTRIES,
+        max_age: timedelta = INSPECT_CACHE_MAX_AGE,
+    ) -> InspectCache:
+        cache = cls(path, max_entries=max_entries, max_age=max_age)
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return cache
+        except OSError, ValueError:
+            log.warning("Ignoring unreadable inspect cache", path=str(path))
+            return cache
+        if isinstance(data, dict) and isinstance(data.get("entries"), dict):
+            cache._entries = data["entries"]
+        return cache
+
+    def get(self, variable: str, image_url: str) -> ImageCheckResult | None:
+        entry = self._entries.get(image_url)
+        if entry is None or not is_digest_reference(image_url):
+            return None
+        try:
+            checked_at = datetime.fromisoformat(entry["checked_at"])
+            created = parse_created_timestamp(entry.get("created"))
+        except KeyError, TypeError, ValueError:
+            return None
+        if datetime.now(UTC) - checked_at > self.max_age:
+            return None
+        entry["used_at"] = datetime.now(UTC).isoformat()
+        self.hits += 1
+        return ImageCheckResult(variable=variable, image_url=image_url, available=True, created=created, cached=True)
+
+    def put(self, result: ImageCheckResult) -> None:
+        if result.cached or not is_digest_reference(result.image_url):
+            return
+        if not result.available:
+            self._entries.pop(result.image_url, None)
+            return
+        now = datetime.now(UTC).isoformat()
+        self._entries[result.image_url] = {
+            "created": result.created.isoformat() if result.created else None,
+            "checked_at": now,
+            "used_at": now,
+        }
+
+    def save(self) -> None:
+        entries = sorted(self._entries.items(), key=lambda item: item[1].get("used_at") or "", reverse=True)
+        data = {"entries": dict(entries[: self.max_entries])}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=1, sort_keys=True))
+            tmp.replace(self.path)
+        except OSError:
+            log.exception("Failed to write inspect cache", path=str(self.path))
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class RichProgressTable(AbstractContextManager["RichProgressTable"]):
@@ -109,6 +214,8 @@ class RichProgressTable(AbstractContextManager["RichProgressTable"]):
         age = format_age(result.created)
         if age != SUMMARY_MISSING_VALUE:
             progress_line.append(f" ({age})", style="dim")
+        if result.cached:
+            progress_line.append(" [cached]", style="dim")
         return progress_line
 
     def _render_table(self) -> Table:
@@ -303,64 +410,28 @@ def should_use_rich_output() -> bool:
     return not os.environ.get("CI") and sys.stderr.isatty()
 
 
-_SKOPEO_MSG_RE = re.compile(r'msg="(.*)"')
-
-
-def _extract_skopeo_error(stderr_text: str) -> str:
-    """Extract a concise error reason from skopeo's logfmt stderr.
-
-    Skopeo emits lines like:
-        time="..." level=fatal msg="Error parsing image name \"docker://REG/REPO:TAG\": ... : manifest unknown"
-
-    This extracts just the tail reason (e.g. "manifest unknown") for readable logging.
-    Falls back to the full stderr if parsing fails.
-    """
-    match = _SKOPEO_MSG_RE.search(stderr_text)
-    if not match:
-        return stderr_text
-    msg = match.group(1).replace('\\"', '"')
-    # The reason is typically after the last ": "
-    last_colon = msg.rfind(": ")
-    if last_colon != -1:
-        return msg[last_colon + 2 :]
-    return msg
-
-
 async def check_image(
+    client: RegistryClient,
     variable: str,
     image_url: str,
     semaphore: asyncio.Semaphore,
     *,
     emit_immediate_errors: bool,
 ) -> ImageCheckResult:
-    """Check whether a container image exists in the registry."""
-    full_image_url = f"docker://{image_url}"
-    command = [
-        "skopeo",
-        "inspect",
-        "--config",
-        "--override-os=linux",
-        "--override-arch=amd64",
-        "--retry-times=3",
-        full_image_url,
-    ]
+    """Check whether a container image exists in the registry.
+
+    Existence is a single manifest HEAD; the (linux/amd64) image config is then fetched
+    only for images that exist, to report their age.
+    """
+    ref = ImageReference.parse(image_url)
 
     try:
         async with semaphore:
             log.debug("Checking image availability", image_url=image_url)
-            process = await asyncio.create_subprocess_exec(
-                *command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=COMMAND_TIMEOUT_SECONDS,
-                )
+                async with asyncio.timeout(COMMAND_TIMEOUT_SECONDS):
+                    config = await client.get_config(ref) if await client.exists(ref) else None
             except TimeoutError:
-                process.kill()
-                await process.wait()
                 if emit_immediate_errors:
                     log.error("Timeout checking image", image_url=image_url)
                 return ImageCheckResult(
@@ -369,21 +440,27 @@ async def check_image(
                     available=False,
                     error="Timeout checking image",
                 )
+            except RegistryError as exc:
+                if emit_immediate_errors:
+                    log.error("Image check failed", image_url=image_url, error=str(exc))
+                return ImageCheckResult(
+                    variable=variable,
+                    image_url=image_url,
+                    available=False,
+                    error=str(exc),
+                )
 
-        if process.returncode != 0:
-            stderr_text = stderr.decode().strip() if stderr else ""
-            error = _extract_skopeo_error(stderr_text) if stderr_text else "Image not found"
+        if config is None:
             if emit_immediate_errors:
-                log.error("Image check failed", image_url=image_url, error=error)
+                log.error("Image check failed", image_url=image_url, error="manifest unknown")
             return ImageCheckResult(
                 variable=variable,
                 image_url=image_url,
                 available=False,
-                error=error,
+                error="manifest unknown",
             )
 
-        inspect_data = json.loads(stdout.decode())
-        created = parse_created_timestamp(inspect_data.get("created"))
+        created = parse_created_timestamp(config.get("created"))
         log.debug("Image exists", image_url=image_url, created=created.isoformat() if created else None)
         return ImageCheckResult(
             variable=variable,
@@ -403,19 +480,26 @@ async def check_image(
 
 
 async def check_image_with_progress(
+    client: RegistryClient,
     variable: str,
     image_url: str,
     semaphore: asyncio.Semaphore,
     state: ProgressState,
     state_lock: asyncio.Lock,
     rich_table: RichProgressTable | None,
+    cache: InspectCache | None = None,
 ) -> ImageCheckResult:
-    result = await check_image(
-        variable,
-        image_url,
-        semaphore,
-        emit_immediate_errors=rich_table is None,
-    )
+    result = cache.get(variable, image_url) if cache is not None else None
+    if result is None:
+        result = await check_image(
+            client,
+            variable,
+            image_url,
+            semaphore,
+            emit_immediate_errors=rich_table is None,
+        )
+        if cache is not None:
+            cache.put(result)
     quay_url = build_quay_url(result.image_url)
     age = format_age(result.created)
 
@@ -425,6 +509,8 @@ async def check_image_with_progress(
             state.ok_count += 1
         else:
             state.missing_count += 1
+        if result.cached:
+            state.cached_count += 1
 
         if rich_table is not None:
             rich_table.update_result(result, state)
@@ -437,6 +523,7 @@ async def check_image_with_progress(
                 missing_so_far=state.missing_count,
                 image_url=result.image_url,
                 available=result.available,
+                cached=result.cached,
                 age=None if age == SUMMARY_MISSING_VALUE else age,
                 quay_url=quay_url,
             )
@@ -455,30 +542,43 @@ def parse_env_file(path: pathlib.Path) -> list[tuple[str, str]]:
 async def run_checks(
     all_entries: list[tuple[str, str]],
     rich_table: RichProgressTable | None,
+    cache: InspectCache | None = None,
 ) -> list[ImageCheckResult]:
     semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
     state = ProgressState(total=len(all_entries))
     state_lock = asyncio.Lock()
-    tasks = [
-        check_image_with_progress(variable, image_url, semaphore, state, state_lock, rich_table)
-        for variable, image_url in all_entries
-    ]
-    return await asyncio.gather(*tasks)
+    async with RegistryClient(max_connections=MAX_CONCURRENT_CHECKS) as client:
+        tasks = [
+            check_image_with_progress(client, variable, image_url, semaphore, state, state_lock, rich_table, cache)
+            for variable, image_url in all_entries
+        ]
+        return await asyncio.gather(*tasks)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check that images referenced in params env files exist.")
+    parser.add_argument("env_files", nargs="+", metavar="env-file", help="params env file(s) to check")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-check digest-pinned images even when a cached result exists",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=INSPECT_CACHE_MAX_ENTRIES,
+        help=f"Keep at most this many digests in the inspect cache (default: {INSPECT_CACHE_MAX_ENTRIES})",
+    )
+    return parser.parse_args(argv)
 
 
 async def main() -> int:
     pretty_log = make_pretty_log()
 
-    if len(sys.argv) < 2:
-        print(f"Usage: {sys.argv[0]} <env-file> [<env-file> ...]", file=sys.stderr)
-        return 2
-
-    if shutil.which("skopeo") is None:
-        log.error("The 'skopeo' command was not found. Please ensure it is installed and in your PATH.")
-        return 2
+    args = parse_args(sys.argv[1:])
 
     all_entries: list[tuple[str, str]] = []
-    for arg in sys.argv[1:]:
+    for arg in args.env_files:
         path = pathlib.Path(arg)
         if not path.is_file():
             log.error("Env file not found or not a regular file", path=str(path))
@@ -500,19 +600,28 @@ async def main() -> int:
             return 1
         seen_urls[image_url] = variable
 
+    max_age = INSPECT_CACHE_MAX_AGE_CI if os.environ.get("CI") else INSPECT_CACHE_MAX_AGE
+    cache = InspectCache.load(INSPECT_CACHE_FILE, max_entries=args.cache_max_entries, max_age=max_age)
+    lookup_cache = None if args.refresh else cache
+
     rich_table: RichProgressTable | None = None
     if should_use_rich_output():
         rich_table = RichProgressTable(all_entries)
         with rich_table:
-            results = await run_checks(all_entries, rich_table)
+            results = await run_checks(all_entries, rich_table, lookup_cache)
     else:
-        results = await run_checks(all_entries, rich_table)
+        results = await run_checks(all_entries, rich_table, lookup_cache)
+
+    if args.refresh:
+        for result in results:
+            cache.put(result)
+    cache.save()
 
     write_github_step_summary(results)
 
     failed = [result for result in results if not result.available]
 
-    log.info("Check complete", total=len(results), failed=len(failed))
+    log.info("Check complete", total=len(results), failed=len(failed), cached=cache.hits)
 
     if failed:
         pretty_log.error(
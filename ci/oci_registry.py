@@ -0,0 +1,420 @@
+"""Asynchronous client for the OCI distribution (registry v2) API.
+
+Replaces the ``skopeo inspect`` process-per-image pattern in our tooling:
+
+- HTTP connections are kept alive and pooled per registry host, so checking a hundred images
+  from quay.io reuses a handful of TLS sessions instead of opening one per image;
+- bearer tokens are cached per (registry, repository) and shared by all concurrent requests,
+  so the token exchange happens once per repository, not once per image;
+- existence checks are a single ``HEAD`` of the manifest;
+- manifest lists / OCI indexes are resolved to the linux/amd64 image (what skopeo does with
+  ``--override-os=linux --override-arch=amd64``).
+
+Credentials are read from the same files skopeo and podman use
+(``$REGISTRY_AUTH_FILE``, ``$XDG_RUNTIME_DIR/containers/auth.json``,
+``~/.config/containers/auth.json``, ``~/.docker/config.json``).
+
+The HTTP layer is ``http.client`` running on a private thread pool, which keeps this module
+dependency-free; the public API is ``async``.
+
+Usage:
+    async with RegistryClient() as client:
+        ref = ImageReference.parse("quay.io/opendatahub/workbench-images@sha256:...")
+        if await client.exists(ref):
+            config = await client.get_config(ref)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import http.client
+import json
+import os
+import pathlib
+import re
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from email.message import Message
+
+DOCKER_HUB = "docker.io"
+DOCKER_HUB_API_HOST = "registry-1.docker.io"
+
+OCI_INDEX = "application/vnd.oci.image.index.v1+json"
+OCI_MANIFEST = "application/vnd.oci.image.manifest.v1+json"
+DOCKER_MANIFEST_LIST = "application/vnd.docker.distribution.manifest.list.v2+json"
+DOCKER_MANIFEST = "application/vnd.docker.distribution.manifest.v2+json"
+MANIFEST_ACCEPT = f"{OCI_INDEX}, {DOCKER_MANIFEST_LIST}, {OCI_MANIFEST}, {DOCKER_MANIFEST}"
+
+DEFAULT_MAX_CONNECTIONS = 22
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_RETRIES = 3
+MAX_REDIRECTS = 5
+USER_AGENT = "opendatahub-notebooks-ci"
+
+_CHALLENGE_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+class RegistryError(Exception):
+    """A registry request failed; ``status`` is the HTTP status when there was a response."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True, slots=True)
+class ImageReference:
+    """A parsed ``registry/repository[:tag][@digest]`` image reference."""
+
+    registry: str
+    repository: str
+    tag: str | None = None
+    digest: str | None = None
+
+    @classmethod
+    def parse(cls, image_url: str) -> ImageReference:
+        """Parse an image reference the way container tools do.
+
+        >>> ImageReference.parse("quay.io/org/repo:tag@sha256:abc")
+        ImageReference(registry='quay.io', repository='org/repo', tag='tag', digest='sha256:abc')
+        >>> ImageReference.parse("docker://localhost:5000/repo")
+        ImageReference(registry='localhost:5000', repository='repo', tag='latest', digest=None)
+        >>> str(ImageReference.parse("ubi9"))
+        'docker.io/library/ubi9:latest'
+        """
+        name, _, digest = image_url.removeprefix("docker://").partition("@")
+        tag = None
+        if ":" in name.rsplit("/", 1)[-1]:
+            name, tag = name.rsplit(":", 1)
+        first, sep, rest = name.partition("/")
+        if sep and ("." in first or ":" in first or first == "localhost"):
+            registry, repository = first, rest
+        else:
+            registry, repository = DOCKER_HUB, name
+        if registry == DOCKER_HUB and "/" not in repository:
+            repository = f"library/{repository}"
+        if tag is None and not digest:
+            tag = "latest"
+        return cls(registry=registry, repository=repository, tag=tag, digest=digest or None)
+
+    @property
+    def reference(self) -> str:
+        """The manifest reference used in registry URLs: the digest if pinned, else the tag."""
+        return self.digest or self.tag or "latest"
+
+    def with_digest(self, digest: str) -> ImageReference:
+        return dataclasses.replace(self, digest=digest)
+
+    def __str__(self) -> str:
+        text = f"{self.registry}/{self.repository}"
+        if self.tag:
+            text += f":{self.tag}"
+        if self.digest:
+            text += f"@{self.digest}"
+        return text
+
+
+def _registry_host(registry: str) -> str:
+    return DOCKER_HUB_API_HOST if registry == DOCKER_HUB else registry
+
+
+def _auth_key(entry: str) -> str:
+    """Normalize an ``auths`` key (``https://index.docker.io/v1/``, ``quay.io/org``) to a registry name."""
+    host = urllib.parse.urlsplit(entry).netloc if "://" in entry else entry.split("/", 1)[0]
+    return DOCKER_HUB if host in {"index.docker.io", DOCKER_HUB_API_HOST} else host
+
+
+def load_registry_auths() -> dict[str, str]:
+    """Return base64 ``user:password`` credentials per registry from container auth files.
+
+    Files are consulted in skopeo's order; the first file that has an entry for a registry wins.
+    """
+    candidates = []
+    if env_file := os.environ.get("REGISTRY_AUTH_FILE"):
+        candidates.append(pathlib.Path(env_file))
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        candidates.append(pathlib.Path(runtime_dir) / "containers" / "auth.json")
+    candidates += [
+        pathlib.Path.home() / ".config" / "containers" / "auth.json",
+        pathlib.Path.home() / ".docker" / "config.json",
+    ]
+
+    auths: dict[str, str] = {}
+    for path in candidates:
+        try:
+            config = json.loads(path.read_text())
+        except OSError, ValueError:
+            continue
+        for key, entry in (config.get("auths") or {}).items():
+            if isinstance(entry, dict) and entry.get("auth"):
+                auths.setdefault(_auth_key(key), entry["auth"])
+    return auths
+
+
+def _error_message(body: bytes, fallback: str) -> str:
+    """Extract the message from a registry ``{"errors": [...]}`` body."""
+    try:
+        errors = json.loads(body)["errors"]
+        return "; ".join(e.get("message") or e.get("code") for e in errors) or fallback
+    except ValueError, KeyError, TypeError, AttributeError:
+        return fallback
+
+
+@dataclass(slots=True)
+class _Response:
+    status: int
+    headers: Message
+    body: bytes
+
+
+class _ConnectionPool:
+    """Keep-alive ``http.client`` connections, reused per (scheme, host) across worker threads."""
+
+    def __init__(self, timeout: float) -> None:
+        self._timeout = timeout
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme: str, host: str) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get((scheme, host))
+            if idle:
+                return idle.pop(), True
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, timeout=self._timeout), False
+
+    def _release(self, scheme: str, host: str, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault((scheme, host), []).append(conn)
+
+    def request(self, method: str, url: str, headers: dict[str, str]) -> _Response:
+        """Perform one request, following redirects (without credentials when the host changes)."""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            response = self._send(parts.scheme, parts.netloc, method, path, headers)
+            location = response.headers.get("Location")
+            if response.status not in {301, 302, 303, 307, 308} or not location:
+                return response
+            url = urllib.parse.urljoin(url, location)
+            if urllib.parse.urlsplit(url).netloc != parts.netloc:
+                headers = {k: v for k, v in headers.items() if k != "Authorization"}
+        raise RegistryError(f"Too many redirects for {url}")
+
+    def _send(self, scheme: str, host: str, method: str, path: str, headers: dict[str, str]) -> _Response:
+        while True:
+            conn, reused = self._connection(scheme, host)
+            try:
+                conn.request(method, path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except http.client.HTTPException, OSError:
+                conn.close()
+                if reused:
+                    # the server closed an idle keep-alive connection; retry on a fresh one
+                    continue
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(scheme, host, conn)
+            return _Response(resp.status, resp.headers, body)
+
+    def close(self) -> None:
+        with self._lock:
+            for connections in self._idle.values():
+                for conn in connections:
+                    conn.close()
+            self._idle.clear()
+
+
+class RegistryClient:
+    """Async registry v2 client with pooled connections and per-repository token reuse."""
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        retries: int = DEFAULT_RETRIES,
+        auths: dict[str, str] | None = None,
+        platform: tuple[str, str] = ("linux", "amd64"),
+    ) -> None:
+        self.platform = platform
+        self._retries = retries
+        self._auths = load_registry_auths() if auths is None else auths
+        self._pool = _ConnectionPool(timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="registry")
+        self._tokens: dict[tuple[str, str], tuple[str, float]] = {}
+        self._token_locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self.token_requests = 0
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pool.close()
+
+    # region HTTP
+
+    def _url(self, ref: ImageReference, path: str) -> str:
+        host = _registry_host(ref.registry)
+        scheme = "http" if host.split(":")[0] in {"localhost", "127.0.0.1"} else "https"
+        return f"{scheme}://{host}/v2/{ref.repository}/{path}"
+
+    async def _http(self, method: str, url: str, headers: dict[str, str]) -> _Response:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._pool.request, method, url, headers)
+
+    def _cached_token(self, key: tuple[str, str]) -> str | None:
+        token = self._tokens.get(key)
+        if token is None or token[1] < time.monotonic():
+            return None
+        return token[0]
+
+    async def _request(self, ref: ImageReference, method: str, path: str, accept: str | None = None) -> _Response:
+        """Request ``/v2/<repository>/<path>``, authenticating and retrying as needed.
+
+        Returns any response that is not a 401 or a transient failure; callers interpret the status.
+        """
+        key = (ref.registry, ref.repository)
+        url = self._url(ref, path)
+        authenticated = False
+        attempt = 0
+        while True:
+            attempt += 1
+            headers = {"User-Agent": USER_AGENT}
+            if accept:
+                headers["Accept"] = accept
+            sent_token = self._cached_token(key)
+            if sent_token:
+                headers["Authorization"] = sent_token
+            try:
+                response = await self._http(method, url, headers)
+            except (http.client.HTTPException, OSError) as exc:
+                if attempt >= self._retries:
+                    raise RegistryError(f"{method} {url}: {exc}") from exc
+                await asyncio.sleep(0.5 * attempt)
+                continue
+
+            if response.status == 401 and not authenticated:
+                authenticated = True
+                await self._authenticate(key, response.headers.get("WWW-Authenticate", ""), sent_token)
+                continue
+            if (response.status == 429 or response.status >= 500) and attempt < self._retries:
+                await asyncio.sleep(0.5 * attempt)
+                continue
+            return response
+
+    async def _authenticate(self, key: tuple[str, str], challenge: str, sent_token: str | None) -> None:
+        """Obtain credentials for one repository; concurrent callers share a single token exchange."""
+        lock = self._token_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            current = self._cached_token(key)
+            if current is not None and current != sent_token:
+                return  # another request refreshed the token while we waited
+
+            registry = key[0]
+            basic = self._auths.get(registry)
+            scheme, _, params_text = challenge.partition(" ")
+            if scheme.lower() == "basic":
+                if basic is None:
+                    raise RegistryError(f"{registry} requires credentials", status=401)
+                self._tokens[key] = (f"Basic {basic}", float("inf"))
+                return
+            if scheme.lower() != "bearer":
+                raise RegistryError(f"Unsupported auth challenge from {registry}: {challenge!r}", status=401)
+
+            params = dict(_CHALLENGE_PARAM_RE.findall(params_text))
+            query = {"scope": f"repository:{key[1]}:pull"}
+            if "service" in params:
+                query["service"] = params["service"]
+            headers = {"User-Agent": USER_AGENT}
+            if basic is not None:
+                headers["Authorization"] = f"Basic {basic}"
+            self.token_requests += 1
+            response = await self._http("GET", f"{params['realm']}?{urllib.parse.urlencode(query)}", headers)
+            if response.status != 200:
+                message = _error_message(response.body, f"HTTP {response.status}")
+                raise RegistryError(f"Token request for {key[1]} on {registry} failed: {message}", response.status)
+            data = json.loads(response.body)
+            token = data.get("token") or data.get("access_token")
+            expires_in = float(data.get("expires_in") or 60)
+            self._tokens[key] = (f"Bearer {token}", time.monotonic() + max(expires_in - 10, 1))
+
+    # endregion
+
+    async def head_manifest(self, ref: ImageReference) -> str | None:
+        """Return the manifest digest if *ref* exists, or None if the registry says it does not."""
+        response = await self._request(ref, "HEAD", f"manifests/{ref.reference}", MANIFEST_ACCEPT)
+        if response.status == 404:
+            return None
+        if response.status != 200:
+            raise RegistryError(f"{ref}: HTTP {response.status}", response.status)
+        return response.headers.get("Docker-Content-Digest") or ref.digest
+
+    async def exists(self, ref: ImageReference) -> bool:
+        return await self.head_manifest(ref) is not None
+
+    async def get_manifest(self, ref: ImageReference) -> tuple[dict, str]:
+        """Return the raw manifest (or manifest list) of *ref* and its digest."""
+        response = await self._request(ref, "GET", f"manifests/{ref.reference}", MANIFEST_ACCEPT)
+        if response.status != 200:
+            raise RegistryError(f"{ref}: {_error_message(response.body, f'HTTP {response.status}')}", response.status)
+        digest = response.headers.get("Docker-Content-Digest") or f"sha256:{hashlib.sha256(response.body).hexdigest()}"
+        return json.loads(response.body), digest
+
+    async def get_platform_manifest(self, ref: ImageReference) -> tuple[ImageReference, dict]:
+        """Resolve a manifest list to the image for :attr:`platform`.
+
+        Returns the reference pinned to the platform image's digest (unchanged for a
+        single-arch image) together with that image's manifest.
+        """
+        manifest, _ = await self.get_manifest(ref)
+        if "manifests" not in manifest:
+            return ref, manifest
+        os_name, architecture = self.platform
+        digest = next(
+            (
+                m["digest"]
+                for m in manifest["manifests"]
+                if m.get("platform", {}).get("architecture") == architecture
+                and m.get("platform", {}).get("os", os_name) == os_name
+            ),
+            None,
+        )
+        if digest is None:
+            raise RegistryError(f"No {os_name}/{architecture} manifest in {ref}")
+        resolved = ref.with_digest(digest)
+        manifest, _ = await self.get_manifest(resolved)
+        return resolved, manifest
+
+    async def resolve_platform(self, ref: ImageReference) -> ImageReference:
+        resolved, _ = await self.get_platform_manifest(ref)
+        return resolved
+
+    async def get_blob(self, ref: ImageReference, digest: str) -> bytes:
+        response = await self._request(ref, "GET", f"blobs/{digest}")
+        if response.status != 200:
+            raise RegistryError(f"{ref} blob {digest}: {_error_message(response.body, f'HTTP {response.status}')}")
+        algorithm, _, expected = digest.partition(":")
+        if algorithm == "sha256" and hashlib.sha256(response.body).hexdigest() != expected:
+            raise RegistryError(f"{ref} blob {digest}: digest mismatch")
+        return response.body
+
+    async def get_config(self, ref: ImageReference) -> dict:
+        """Return the image config (what ``skopeo inspect --config`` prints) for :attr:`platform`."""
+        resolved, manifest = await self.get_platform_manifest(ref)
+        return json.loads(await self.get_blob(resolved, manifest["config"]["digest"]))
@@ -15,17 +15,22 @@
 #
 from abc import ABC
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import glob
+import hashlib
 import json
 import logging
 import os
 from pathlib import Path
 import subprocess
 import sys
+import tarfile
 from tempfile import TemporaryFile
 import time
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Type
 from typing import TypeVar
@@ -55,6 +60,23 @@ enable_generic_node_script_output_to_s3 = (
 # This is useful in airgapped environments where the image
 # already contains the required packages.
 install_packages = os.getenv("ELYRA_INSTALL_PACKAGES", "true").lower() == "true"
+# Number of concurrent object storage transfers (downloads of inputs, uploads of outputs).
+# minio's connection pool holds 10 connections per host, so larger values only queue.
+cos_transfer_workers = max(1, int(os.getenv("ELYRA_COS_TRANSFER_WORKERS", "8")))
+# Files larger than this are uploaded as multipart uploads, with parts sent in parallel.
+cos_multipart_part_size = max(5, int(os.getenv("ELYRA_COS_MULTIPART_PART_SIZE_MB", "16"))) * 1024 * 1024
+cos_multipart_parallel_uploads = 4
+# Install plan written at image build time by 'bootstrapper.py --write-install-plan'.  When it
+# matches the requirements file and needs no installs, package installation is a no-op.
+install_plan_file = os.getenv("ELYRA_INSTALL_PLAN", "/opt/app-root/bin/utils/elyra-install-plan.json")
+# When NotebookFileOp renders the executed notebook to HTML:
+#  - "concurrent": while the executed notebook and the declared outputs are uploaded (default)
+#  - "lazy": after the executed notebook and the declared outputs have been uploaded
+#  - "skip": not at all
+notebook_html_mode = os.getenv("ELYRA_NOTEBOOK_HTML", "concurrent").lower()
+if notebook_html_mode not in ("concurrent", "lazy", "skip"):
+    logger.warning(f"Unknown ELYRA_NOTEBOOK_HTML value '{notebook_html_mode}', using 'concurrent'")
+    notebook_html_mode = "concurrent"
 
 pipeline_name = None  # global used in formatted logging
 operation_name = None  # global used in formatted logging
@@ -123,7 +145,7 @@ class FileOpBase(ABC):
     def process_dependencies(self) -> None:
         """Process dependencies
 
-        If a dependency archive is present, it will be downloaded from object storage
+        If a dependency archive is present, it will be streamed from object storage
         and expanded into the local directory.
 
         This method can be overridden by subclasses, although overrides should first
@@ -133,15 +155,13 @@ class FileOpBase(ABC):
         t0 = time.time()
         archive_file = self.input_params.get("cos-dependencies-archive")
 
-        self.get_file_from_object_storage(archive_file)
-
         inputs = self.input_params.get("inputs")
         if inputs:
             input_list = inputs.split(INOUT_SEPARATOR)
-            for file in input_list:
-                self.get_file_from_object_storage(file.strip())
+            self.get_files_from_object_storage([file.strip() for file in input_list])
 
-        subprocess.call(["tar", "-zxvf", archive_file])
+        # extracted after the inputs, so archive contents win on name clashes (as with 'tar -zxvf')
+        self.extract_archive_from_object_storage(archive_file)
         duration = time.time() - t0
         OpUtil.log_operation_info("dependencies processed", duration)
 
@@ -158,8 +178,10 @@ class FileOpBase(ABC):
         outputs = self.input_params.get("outputs")
         if outputs:
             output_list = outputs.split(INOUT_SEPARATOR)
+            files_to_upload = []
             for file in output_list:
-                self.process_output_file(file.strip())
+                files_to_upload.extend(self.expand_output_file(file.strip()))
+            self.put_files_to_object_storage(files_to_upload)
         duration = time.time() - t0
         OpUtil.log_operation_info("outputs processed", duration)
 
@@ -293,10 +315,11 @@ class FileOpBase(ABC):
         """
         return os.path.join(self.input_params.get("cos-directory", ""), filename)
 
-    def get_file_from_object_storage(self, file_to_get: str) -> None:
+    def get_file_from_object_storage(self, file_to_get: str) -> int:
         """Utility function to get files from an object storage
 
         :param file_to_get: filename
+        :return: the number of bytes downloaded
         """
 
         object_to_get = self.get_object_storage_filename(file_to_get)
@@ -306,12 +329,50 @@ class FileOpBase(ABC):
         OpUtil.log_operation_info(
             f"downloaded {file_to_get} from bucket: {self.cos_bucket}, object: {object_to_get}", duration
         )
+        return os.path.getsize(file_to_get)
+
+    def extract_archive_from_object_storage(self, archive_file: str) -> None:
+        """Streams a gzipped tar archive from object storage into the local directory
+
+        The archive is not written to disk.  Members go through tarfile's 'data' extraction
+        filter, which rejects absolute paths, paths and links leading outside the local
+        directory, and device files.  Any failure is raised.
+
+        :param archive_file: filename of the archive
+        """
+
+        object_to_get = self.get_object_storage_filename(archive_file)
+        t0 = time.time()
+        members = 0
+        total_bytes = 0
+        response = self.cos_client.get_object(bucket_name=self.cos_bucket, object_name=object_to_get)
+        try:
+            with tarfile.open(fileobj=response, mode="r|gz") as tar:
+                for member in tar:
+                    tar.extract(member, path=".", filter="data")
+                    members += 1
+                    total_bytes += member.size
+        except (tarfile.TarError, OSError) as ex:
+            logger.error(f"Failed to extract {archive_file} from bucket: {self.cos_bucket}, object: {object_to_get}")
+            raise RuntimeError(f"Failed to extract dependency archive '{archive_file}': {ex}") from ex
+        finally:
+            response.close()
+            response.release_conn()
+        duration = time.time() - t0
+        OpUtil.log_operation_info(
+            f"extracted {members} member(s), {total_bytes} bytes from bucket: {self.cos_bucket}, "
+            f"object: {object_to_get}",
+            duration,
+        )
 
-    def put_file_to_object_storage(self, file_to_upload: str, object_name: Optional[str] = None) -> None:
+    def put_file_to_object_storage(self, file_to_upload: str, object_name: Optional[str] = None) -> int:
         """Utility function to put files into an object storage
 
+        Files larger than the multipart part size are uploaded as multipart uploads.
+
         :param file_to_upload: filename
         :param object_name: remote filename (used to rename)
+        :return: the number of bytes uploaded
         """
 
         object_to_upload = object_name
@@ -320,29 +381,82 @@ class FileOpBase(ABC):
 
         object_to_upload = self.get_object_storage_filename(object_to_upload)
         t0 = time.time()
-        self.cos_client.fput_object(bucket_name=self.cos_bucket, object_name=object_to_upload, file_path=file_to_upload)
+        self.cos_client.fput_object(
+            bucket_name=self.cos_bucket,
+            object_name=object_to_upload,
+            file_path=file_to_upload,
+            part_size=cos_multipart_part_size,
+            num_parallel_uploads=cos_multipart_parallel_uploads,
+        )
         duration = time.time() - t0
         OpUtil.log_operation_info(
             f"uploaded {file_to_upload} to bucket: {self.cos_bucket} object: {object_to_upload}", duration
         )
+        return os.path.getsize(file_to_upload)
+
+    def get_files_from_object_storage(self, files_to_get: List[str]) -> None:
+        """Downloads files concurrently; raises the first error, like sequential downloads would.
+
+        :param files_to_get: filenames
+        """
+        self._transfer_all("downloaded", self.get_file_from_object_storage, [(file,) for file in files_to_get])
+
+    def put_files_to_object_storage(self, files_to_upload: List[str]) -> None:
+        """Uploads files concurrently; raises the first error, like sequential uploads would.
+
+        :param files_to_upload: filenames (the object names are the same)
+        """
+        self._transfer_all("uploaded", self.put_file_to_object_storage, [(file,) for file in files_to_upload])
+
+    def _transfer_all(self, verb: str, transfer: Callable[..., int], jobs: List[tuple]) -> None:
+        """Runs transfers on a bounded thread pool and logs the aggregate throughput.
+
+        Errors are re-raised in submission order; transfers that have not started yet are cancelled.
+        """
+        if not jobs:
+            return
+        t0 = time.time()
+        if len(jobs) == 1:
+            total_bytes = transfer(*jobs[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(cos_transfer_workers, len(jobs))) as executor:
+                futures = [executor.submit(transfer, *job) for job in jobs]
+                try:
+                    total_bytes = sum(future.result() for future in futures)
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        duration = time.time() - t0
+        throughput = total_bytes / duration / (1024 * 1024) if duration > 0 else 0.0
+        OpUtil.log_operation_info(
+            f"{verb} {len(jobs)} file(s), {total_bytes} bytes at {throughput:.2f} MiB/s", duration
+        )
 
     def has_wildcard(self, filename):
         wildcards = ["*", "?"]
         return bool(any(c in filename for c in wildcards))
 
-    def process_output_file(self, output_file):
-        """Puts the file to object storage.  Handles wildcards and directories."""
+    def expand_output_file(self, output_file: str) -> List[str]:
+        """Lists the files an output declaration refers to.  Handles wildcards and directories."""
 
         matched_files = [output_file]
         if self.has_wildcard(output_file):  # explode the wildcarded file
             matched_files = glob.glob(output_file)
 
+        files = []
         for matched_file in matched_files:
             if os.path.isdir(matched_file):
                 for file in os.listdir(matched_file):
-                    self.process_output_file(os.path.join(matched_file, file))
+                    files.extend(self.expand_output_file(os.path.join(matched_file, file)))
             else:
-                self.put_file_to_object_storage(matched_file)
+                files.append(matched_file)
+        return files
+
+    def process_output_file(self, output_file):
+        """Puts the file to object storage.  Handles wildcards and directories."""
+
+        self.put_files_to_object_storage(self.expand_output_file(output_file))
 
     def convert_param_str_to_dict(self, pipeline_parameters: Optional[str] = None) -> Dict[str, Any]:
         """Convert INOUT-separated string of pipeline parameters into a dictionary."""
@@ -399,20 +513,45 @@ class NotebookFileOp(FileOpBase):
             duration = time.time() - t0
             OpUtil.log_operation_info("notebook execution completed", duration)
 
-            NotebookFileOp.convert_notebook_to_html(notebook_output, notebook_html)
-            if enable_generic_node_script_output_to_s3:
-                self.put_file_to_object_storage(notebook_output, notebook)
-                self.put_file_to_object_storage(notebook_html)
-            self.process_outputs()
+            self.upload_results(notebook, notebook_output, notebook_html, process_outputs=True)
         except Exception as ex:
             # log in case of errors
             logger.error(f"Unexpected error: {sys.exc_info()[0]}")
 
-            NotebookFileOp.convert_notebook_to_html(notebook_output, notebook_html)
+            self.upload_results(notebook, notebook_output, notebook_html, process_outputs=False)
+            raise ex
+
+    def upload_results(self, notebook: str, notebook_output: str, notebook_html: str, process_outputs: bool) -> None:
+        """Uploads the executed notebook, its HTML rendering and (optionally) the declared outputs
+
+        The HTML rendering runs according to ELYRA_NOTEBOOK_HTML; by default it runs on a
+        worker thread while the other files are uploaded.  A rendering error is raised once
+        the uploads have finished.
+        """
+        t0 = time.time()
+        render_html = notebook_html_mode != "skip"
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            rendering = None
+            if notebook_html_mode == "concurrent":
+                rendering = executor.submit(NotebookFileOp.convert_notebook_to_html, notebook_output, notebook_html)
+
             if enable_generic_node_script_output_to_s3:
                 self.put_file_to_object_storage(notebook_output, notebook)
-                self.put_file_to_object_storage(notebook_html)
-            raise ex
+            if process_outputs:
+                self.process_outputs()
+
+            t1 = time.time()
+            if rendering is not None:
+                rendering.result()
+            elif render_html:
+                NotebookFileOp.convert_notebook_to_html(notebook_output, notebook_html)
+            if render_html:
+                OpUtil.log_operation_info(f"waited for {notebook_html} ({notebook_html_mode})", time.time() - t1)
+
+        if render_html and enable_generic_node_script_output_to_s3:
+            self.put_file_to_object_storage(notebook_html)
+        duration = time.time() - t0
+        OpUtil.log_operation_info("notebook results uploaded", duration)
 
     @staticmethod
     def convert_notebook_to_html(notebook_file: str, html_file: str) -> str:
@@ -589,8 +728,38 @@ class OpUtil(object):
         OpUtil.log_operation_info("Installing packages")
         t0 = time.time()
         requirements_file = cls.determine_elyra_requirements()
+        plan = cls.load_install_plan()
+        if plan is not None and cls.install_plan_satisfies(plan, requirements_file):
+            if user_volume_path:
+                os.environ["PIP_CONFIG_FILE"] = f"{user_volume_path}/pip.conf"
+            duration = time.time() - t0
+            OpUtil.log_operation_info(f"Packages already satisfied by the image (see {install_plan_file})", duration)
+            return
+
         elyra_packages = cls.package_list_to_dict(requirements_file)
-        current_packages = cls.package_list_to_dict("requirements-current.txt")
+        if plan is not None and not os.path.exists("requirements-current.txt"):
+            current_packages = plan["installed"]
+        else:
+            current_packages = cls.package_list_to_dict("requirements-current.txt")
+        to_install_list = cls.packages_to_install(elyra_packages, current_packages)
+
+        if to_install_list:
+            if user_volume_path:
+                to_install_list.insert(0, f"--target={user_volume_path}")
+                to_install_list.append("--no-cache-dir")
+
+            subprocess.run([sys.executable, "-m", "pip", "install"] + to_install_list, check=True)
+
+        if user_volume_path:
+            os.environ["PIP_CONFIG_FILE"] = f"{user_volume_path}/pip.conf"
+
+        subprocess.run([sys.executable, "-m", "pip", "freeze"])
+        duration = time.time() - t0
+        OpUtil.log_operation_info("Packages installed", duration)
+
+    @classmethod
+    def packages_to_install(cls, elyra_packages: dict, current_packages: dict) -> List[str]:
+        """Compares required against installed versions and returns the pip requirements to install."""
         to_install_list = []
 
         for package, ver in elyra_packages.items():
@@ -623,19 +792,64 @@ class OpUtil(object):
                 logger.info(f"Package not found. Installing {package} package with version {ver}...")
                 to_install_list.append(f"{package}=={ver}")
 
-        if to_install_list:
-            if user_volume_path:
-                to_install_list.insert(0, f"--target={user_volume_path}")
-                to_install_list.append("--no-cache-dir")
+        return to_install_list
 
-            subprocess.run([sys.executable, "-m", "pip", "install"] + to_install_list, check=True)
+    @classmethod
+    def write_install_plan(cls, requirements_file: str, plan_file: str) -> None:
+        """Records installed package versions and the resulting install list, at image build time.
 
-        if user_volume_path:
-            os.environ["PIP_CONFIG_FILE"] = f"{user_volume_path}/pip.conf"
+        The installed-version index uses the same names as 'pip freeze', so the plan can stand in
+        for requirements-current.txt at runtime.
+        """
+        import importlib.metadata
+
+        installed = {dist.metadata["Name"]: dist.version for dist in importlib.metadata.distributions()}
+        plan = {
+            "python": f"{sys.version_info.major}.{sys.version_info.minor}",
+            "requirements_sha256": cls._sha256(requirements_file),
+            "installed": dict(sorted(installed.items())),
+            "to_install": cls.packages_to_install(cls.package_list_to_dict(requirements_file), installed),
+        }
+        with open(plan_file, "w") as f:
+            json.dump(plan, f, indent=1)
+        OpUtil.log_operation_info(
+            f"wrote install plan {plan_file}: {len(installed)} installed, {len(plan['to_install'])} to install"
+        )
 
-        subprocess.run([sys.executable, "-m", "pip", "freeze"])
-        duration = time.time() - t0
-        OpUtil.log_operation_info("Packages installed", duration)
+    @classmethod
+    def load_install_plan(cls) -> Optional[dict]:
+        """Returns the image's install plan if it was computed for this Python version."""
+        try:
+            with open(install_plan_file) as f:
+                plan = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Ignoring unreadable install plan {install_plan_file}: {ex}")
+            return None
+        try:
+            if plan["python"] != f"{sys.version_info.major}.{sys.version_info.minor}":
+                return None
+            if not isinstance(plan["installed"], dict) or not isinstance(plan["to_install"], list):
+                return None
+        except (KeyError, TypeError):
+            return None
+        return plan
+
+    @classmethod
+    def install_plan_satisfies(cls, plan: dict, requirements_file: Optional[str]) -> bool:
+        """True when the plan was made for this requirements file and needs nothing installed."""
+        if not requirements_file:
+            return False
+        if plan["requirements_sha256"] != cls._sha256(requirements_file):
+            logger.info(f"{requirements_file} differs from the one the image's install plan was made for")
+            return False
+        return not plan["to_install"]
+
+    @staticmethod
+    def _sha256(filename: str) -> str:
+        with open(filename, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
 
     @classmethod
     def determine_elyra_requirements(cls) -> Any:
@@ -769,6 +983,12 @@ def main():
     logging.basicConfig(
         format="[%(levelname)1.1s %(asctime)s.%(msecs).03d] %(message)s", datefmt="%H:%M:%S", level=logging.DEBUG
     )
+    if sys.argv[1:2] == ["--write-install-plan"]:
+        # image build time: bootstrapper.py --write-install-plan <requirements-elyra.txt> <plan.json>
+        requirements_file, plan_file = sys.argv[2:4]
+        OpUtil.write_install_plan(requirements_file, plan_file)
+        return
+
     # Setup packages and gather arguments
     input_params = OpUtil.parse_arguments(sys.argv[1:])
     OpUtil.log_operation_info("starting operation")
@@ -36,6 +36,7 @@ import urllib.parse
 from dataclasses import dataclass, field
 from typing import Any
 
+from scripts.cve.issue_cache import IssueCache, default_cache_path
 from scripts.cve.jira_auth import JiraAuthError
 from scripts.cve.jira_client import JIRA_DEFAULT_URL, JiraClient
 
@@ -200,11 +201,13 @@ class OrphanCVEsResult:
     issues: list[dict]
 
 
-def find_orphan_cves(client: JiraClient, max_results: int = 1000) -> OrphanCVEsResult:
+def find_orphan_cves(client: JiraClient, max_results: int = 1000,
+                     cache: IssueCache | None = None) -> OrphanCVEsResult:
     """Find CVEs in RHOAIENG that don't have a parent tracker in RHAIENG.
 
     Returns an OrphanCVEsResult containing orphans dict and all fetched issues.
     Issues without a version are grouped under version="" (no version).
+    With a ``cache``, only issues updated since the previous run are fetched.
     """
     print("Searching for CVE issues in RHOAIENG...")
 
@@ -223,7 +226,11 @@ def find_orphan_cves(client: JiraClient, max_results: int = 1000) -> OrphanCVEsR
 
     # Get all RHOAIENG CVE issues
     jql = 'project = RHOAIENG AND issuetype in (Bug, Vulnerability, Weakness) AND resolution = Unresolved AND labels = SecurityTracking AND component = "Notebooks Images" ORDER BY created DESC'
-    issues = client.search_issues(jql, fields=f"key,summary,status,labels,issuelinks,{RHAIENG_TEAM_CUSTOM_FIELD}", max_results=max_results)
+    fields = f"key,summary,status,labels,issuelinks,{RHAIENG_TEAM_CUSTOM_FIELD}"
+    if cache is not None:
+        issues = cache.search(client, jql, fields=fields, max_results=max_results)
+    else:
+        issues = client.search_issues(jql, fields=fields, max_results=max_results)
     print(f"Found {len(issues)} RHOAIENG CVE issues")
 
     # Group by (CVE ID, version)
@@ -250,7 +257,10 @@ def find_orphan_cves(client: JiraClient, max_results: int = 1000) -> OrphanCVEsR
             continue
 
         # Check if this issue has a parent tracker (is blocked by RHAIENG issue)
-        blockers = get_blocking_issues(issue)
+        if cache is not None:
+            blockers = cache.linked_keys(key, "Blocks", inward=True)
+        else:
+            blockers = get_blocking_issues(issue)
         has_rhaieng_blocker = any(b.startswith("RHAIENG-") for b in blockers)
 
         # Extract version from summary
@@ -337,30 +347,35 @@ def create_tracker_issue(client: JiraClient, cve_info: CVEInfo, jira_url: str =
 
 
 def link_issues(client: JiraClient, tracker_key: str, child_keys: list[str], dry_run: bool = False) -> int:
-    """Link tracker issue to child issues (tracker blocks children)."""
-    linked = 0
-    for child_key in child_keys:
-        if dry_run:
+    """Link tracker issue to child issues (tracker blocks children).
+
+    The links are created concurrently (see ``JiraClient.create_issue_links``).
+    """
+    if dry_run:
+        for child_key in child_keys:
             print(f"  [DRY RUN] Would link {tracker_key} blocks {child_key}")
-            linked += 1
-            continue
+        return len(child_keys)
 
-        try:
-            client.create_issue_link("Blocks", tracker_key, child_key)
+    linked = 0
+    for child_key, error in client.create_issue_links("Blocks", tracker_key, child_keys).items():
+        if error is None:
             print(f"  Linked: {tracker_key} blocks {child_key}")
             linked += 1
-        except Exception as e:
-            print(f"  ERROR linking {child_key}: {e}")
+        else:
+            print(f"  ERROR linking {child_key}: {error}")
 
     return linked
 
 
 def update_rhoaieng_teams(client: JiraClient, issues: list[dict], dry_run: bool = False) -> None:
-    """Ensure all fetched RHOAIENG issues have the correct Team assigned."""
+    """Ensure all fetched RHOAIENG issues have the correct Team assigned.
+
+    The updates are sent concurrently (see ``JiraClient.update_issues``).
+    """
     team_extra = build_tracker_team_extra_fields()
     expected_team_id = team_extra[RHAIENG_TEAM_CUSTOM_FIELD]
 
-    updated_count = 0
+    to_update: list[str] = []
     for issue in issues:
         fields = issue.get("fields", {})
         current_team = fields.get(RHAIENG_TEAM_CUSTOM_FIELD)
@@ -376,15 +391,20 @@ def update_rhoaieng_teams(client: JiraClient, issues: list[dict], dry_run: bool
                 print(f"  WARNING: Unexpected type for Team field on {key}: {type(current_team)} ({current_team})")
 
         if team_id != expected_team_id:
-            try:
-                if dry_run:
-                    print(f"  [DRY RUN] Would set Team to AAIET Notebooks on {key}")
-                else:
-                    client.update_issue(key, team_extra)
-                    print(f"  Set Team to AAIET Notebooks on {key}")
+            to_update.append(key)
+
+    updated_count = 0
+    if dry_run:
+        for key in to_update:
+            print(f"  [DRY RUN] Would set Team to AAIET Notebooks on {key}")
+        updated_count = len(to_update)
+    else:
+        for key, error in client.update_issues(dict.fromkeys(to_update, team_extra)).items():
+            if error is None:
+                print(f"  Set Team to AAIET Notebooks on {key}")
                 updated_count += 1
-            except Exception as e:
-                print(f"  ERROR setting Team on {key}: {e}")
+            else:
+                print(f"  ERROR setting Team on {key}: {error}")
 
     if updated_count > 0:
         verb = "Would update" if dry_run else "Updated"
@@ -429,6 +449,10 @@ Environment variables:
                         help="Maximum issues to fetch (default: 1000)")
     parser.add_argument("--no-link", action="store_true",
                         help="Create trackers but don't link to child issues")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Query Jira directly instead of the local issue cache")
+    parser.add_argument("--full-sync", action="store_true",
+                        help="Re-download all issues into the local issue cache")
     return parser.parse_args()
 
 
@@ -445,7 +469,8 @@ def main():
     print(f"Connecting to {client.base_url}...")
 
     # Find orphan CVEs
-    cves_result = find_orphan_cves(client, args.max_results)
+    cache = None if args.no_cache else IssueCache(default_cache_path(client.base_url), full_sync=args.full_sync)
+    cves_result = find_orphan_cves(client, args.max_results, cache)
     orphans = cves_result.orphans
     all_issues = cves_result.issues
 
@@ -34,6 +34,7 @@ import sys
 from dataclasses import dataclass, field
 from datetime import datetime, date
 
+from scripts.cve.issue_cache import IssueCache, default_cache_path
 from scripts.cve.jira_auth import JiraAuthError
 from scripts.cve.jira_client import JiraClient
 
@@ -96,13 +97,18 @@ def get_linked_issue_keys(issue: dict, link_type: str = "Blocks") -> list[str]:
     return linked
 
 
-def find_cve_trackers(client: JiraClient, max_results: int = 500) -> list[TrackerInfo]:
-    """Find CVE tracker issues in RHAIENG."""
+def find_cve_trackers(client: JiraClient, max_results: int = 500,
+                      cache: IssueCache | None = None) -> list[TrackerInfo]:
+    """Find CVE tracker issues in RHAIENG (only recently updated ones are fetched with a ``cache``)."""
     print("Searching for CVE trackers in RHAIENG...")
 
     # Get RHAIENG CVE issues (trackers)
     jql = 'project = RHAIENG AND labels in ("CVE") AND resolution = unresolved ORDER BY duedate ASC'
-    issues = client.search_issues(jql, fields="key,summary,status,labels,duedate,issuelinks", max_results=max_results)
+    fields = "key,summary,status,labels,duedate,issuelinks"
+    if cache is not None:
+        issues = cache.search(client, jql, fields=fields, max_results=max_results)
+    else:
+        issues = client.search_issues(jql, fields=fields, max_results=max_results)
     print(f"Found {len(issues)} RHAIENG CVE tracker issues")
 
     trackers = []
@@ -122,16 +128,19 @@ def find_cve_trackers(client: JiraClient, max_results: int = 500) -> list[Tracke
         )
 
         # Get linked child issues
-        linked_keys = get_linked_issue_keys(issue)
-        tracker.linked_issues = linked_keys
+        if cache is not None:
+            tracker.linked_issues = cache.linked_keys(key, "Blocks")
+        else:
+            tracker.linked_issues = get_linked_issue_keys(issue)
 
         trackers.append(tracker)
 
     return trackers
 
 
-def fetch_child_due_dates(client: JiraClient, trackers: list[TrackerInfo]) -> None:
-    """Fetch due dates from linked child issues and find earliest."""
+def fetch_child_due_dates(client: JiraClient, trackers: list[TrackerInfo],
+                          cache: IssueCache | None = None) -> None:
+    """Fetch due dates from linked child issues and find earliest (cached children are delta-synced)."""
     print("\nFetching due dates from linked child issues...")
 
     # Collect all unique child issue keys
@@ -152,15 +161,16 @@ def fetch_child_due_dates(client: JiraClient, trackers: list[TrackerInfo]) -> No
     keys_list = list(all_child_keys)
     batch_size = 50
 
-    for i in range(0, len(keys_list), batch_size):
-        batch_keys = keys_list[i:i + batch_size]
-        jql = f"key in ({','.join(batch_keys)})"
-        issues = client.search_issues(jql, fields="key,duedate", max_results=len(batch_keys))
-
-        for issue in issues:
-            key = issue["key"]
-            due_date = parse_date(issue.get("fields", {}).get("duedate"))
-            child_due_dates[key] = due_date
+    if cache is not None:
+        for key, issue in cache.get_issues(client, keys_list, fields="key,duedate").items():
+            child_due_dates[key] = parse_date(issue.get("fields", {}).get("duedate"))
+    else:
+        jqls = [f"key in ({','.join(keys_list[i:i + batch_size])})" for i in range(0, len(keys_list), batch_size)]
+        for issues in client.search_issues_many(jqls, fields="key,duedate", max_results=batch_size):
+            for issue in issues:
+                key = issue["key"]
+                due_date = parse_date(issue.get("fields", {}).get("duedate"))
+                child_due_dates[key] = due_date
 
     # Assign earliest due date to each tracker
     for tracker in trackers:
@@ -197,7 +207,7 @@ def sync_due_dates(client: JiraClient, trackers: list[TrackerInfo], dry_run: boo
 
     print(f"\n{'[DRY RUN] ' if dry_run else ''}Syncing due dates for {len(to_sync)} trackers...")
 
-    synced = 0
+    updates: dict[str, dict] = {}
     for tracker in to_sync:
         new_due_date = tracker.earliest_child_due_date
         if not new_due_date:
@@ -205,15 +215,17 @@ def sync_due_dates(client: JiraClient, trackers: list[TrackerInfo], dry_run: boo
 
         date_str = new_due_date.strftime("%Y-%m-%d")
         print(f"  {tracker.key}: Setting due date to {date_str} (from child issues)")
+        updates[tracker.key] = {"duedate": date_str}
 
-        if not dry_run:
-            try:
-                client.update_issue(tracker.key, {"duedate": date_str})
-                synced += 1
-            except Exception as e:
-                print(f"    ERROR: {e}")
-        else:
+    if dry_run:
+        return len(updates)
+
+    synced = 0
+    for key, error in client.update_issues(updates).items():
+        if error is None:
             synced += 1
+        else:
+            print(f"    ERROR updating {key}: {error}")
 
     return synced
 
@@ -306,6 +318,10 @@ Environment variables:
                         help="Show summary statistics")
     parser.add_argument("--max-results", type=int, default=500,
                         help="Maximum trackers to fetch (default: 500)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Query Jira directly instead of the local issue cache")
+    parser.add_argument("--full-sync", action="store_true",
+                        help="Re-download all issues into the local issue cache")
     return parser.parse_args()
 
 
@@ -325,14 +341,15 @@ def main():
     print(f"Connecting to {client.base_url}...")
 
     # Find all CVE trackers
-    trackers = find_cve_trackers(client, args.max_results)
+    cache = None if args.no_cache else IssueCache(default_cache_path(client.base_url), full_sync=args.full_sync)
+    trackers = find_cve_trackers(client, args.max_results, cache)
 
     if not trackers:
         print("\nNo CVE trackers found")
         return
 
     # Fetch child due dates for all trackers
-    fetch_child_due_dates(client, trackers)
+    fetch_child_due_dates(client, trackers, cache)
 
     # Execute requested actions
     if args.list_overdue:
@@ -0,0 +1,296 @@
+"""SQLite cache of Jira issues and their link graph for the CVE scripts.
+
+The first search for a JQL query downloads every matching issue; later runs
+only ask Jira for issues updated since the previous sync (``updated >= "-Nm"``),
+so answering the orphan and due-date questions costs one small delta fetch.
+
+Membership of a cached query is kept current by two delta searches: the query
+itself restricted to recently updated issues (new and changed matches), and
+the cached members restricted to recently updated issues.  A member that
+shows up in the second but not in the first no longer matches and is
+dropped.  Changes that move an issue in or out of a query (resolution,
+labels, components, links) all bump ``updated``.  Deleted issues and
+permission changes are only noticed by a full sync, which happens
+automatically after ``FULL_SYNC_MAX_AGE`` or on request, or when a stale key
+makes a ``key in (...)`` search fail.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from scripts.cve.jira_client import JiraClient
+
+# Re-download everything after a week to forget deleted or hidden issues.
+FULL_SYNC_MAX_AGE = 7 * 24 * 3600
+# Jira's "updated" has minute resolution and clocks drift; overlap the deltas.
+_SYNC_MARGIN = 5 * 60
+# Keys per "key in (...)" search.
+_KEY_BATCH_SIZE = 100
+
+_ORDER_BY_RE = re.compile(r"\s+ORDER\s+BY\s+(?P<field>\w+)(?:\s+(?P<dir>ASC|DESC))?\s*$", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    id INTEGER,
+    updated TEXT,
+    synced_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    type TEXT NOT NULL,
+    PRIMARY KEY (source, target, type)
+);
+CREATE INDEX IF NOT EXISTS links_target ON links (target, type);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    last_sync REAL NOT NULL,
+    last_full_sync REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    query TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (query, key)
+);
+"""
+
+
+def default_cache_path(base_url: str) -> Path:
+    """Cache file for a Jira instance, next to the OAuth token cache naming scheme."""
+    digest = hashlib.sha256(base_url.rstrip("/").encode("utf-8")).hexdigest()[:16]
+    return Path.home() / ".cache" / "jira" / f"issues-{digest}.sqlite3"
+
+
+def _updated_since(since: float) -> str:
+    """JQL clause for issues updated after ``since`` (epoch seconds), timezone independent."""
+    minutes = math.ceil((time.time() - since + _SYNC_MARGIN) / 60)
+    return f'updated >= "-{minutes}m"'
+
+
+def _split_order_by(jql: str) -> tuple[str, str | None, bool]:
+    """Split ``jql`` into the filter and a single ORDER BY field and direction."""
+    match = _ORDER_BY_RE.search(jql)
+    if not match:
+        return jql.strip(), None, False
+    return jql[:match.start()].strip(), match["field"], (match["dir"] or "ASC").upper() == "DESC"
+
+
+def _batches(keys: list[str]) -> list[list[str]]:
+    return [keys[i:i + _KEY_BATCH_SIZE] for i in range(0, len(keys), _KEY_BATCH_SIZE)]
+
+
+def _with_field(fields: str, name: str) -> str:
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    return ",".join([*names, name] if name not in names else names)
+
+
+class IssueCache:
+    """Jira issues cached in SQLite, with an index of their issue links.
+
+    Use ``search`` in place of ``JiraClient.search_issues`` and ``get_issues``
+    to look up issues by key.  Both return plain issue dicts in the REST
+    format, so existing helpers that read ``fields.issuelinks`` keep working.
+    """
+
+    def __init__(self, path: Path, *, full_sync: bool = False):
+        """Open (or create) the cache at ``path``.
+
+        ``full_sync`` ignores the sync state and re-downloads every query once.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.full_sync = full_sync
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> IssueCache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # -- storage -----------------------------------------------------------
+
+    def _store(self, issues: list[dict], synced_at: float) -> None:
+        """Insert or refresh issues and re-index the links they report."""
+        for issue in issues:
+            key = issue["key"]
+            fields = issue.get("fields", {})
+            row = self.db.execute("SELECT updated, data FROM issues WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] == fields.get("updated"):
+                # Unchanged issue fetched with other fields: keep both sets.
+                merged = json.loads(row[1])
+                merged.setdefault("fields", {}).update(fields)
+                issue = merged
+            self.db.execute(
+                "INSERT OR REPLACE INTO issues (key, id, updated, synced_at, data) VALUES (?, ?, ?, ?, ?)",
+                (key, int(issue.get("id") or 0), fields.get("updated"), synced_at, json.dumps(issue)),
+            )
+            if "issuelinks" not in fields:
+                continue
+            # An issue lists all of its links, so it is authoritative for every edge touching it.
+            self.db.execute("DELETE FROM links WHERE source = ? OR target = ?", (key, key))
+            for link in fields["issuelinks"]:
+                link_type = link.get("type", {}).get("name", "")
+                if "outwardIssue" in link:
+                    edge = (key, link["outwardIssue"]["key"], link_type)
+                elif "inwardIssue" in link:
+                    edge = (link["inwardIssue"]["key"], key, link_type)
+                else:
+                    continue
+                self.db.execute("INSERT OR IGNORE INTO links (source, target, type) VALUES (?, ?, ?)", edge)
+
+    def _load(self, keys: list[str]) -> dict[str, tuple[dict, float]]:
+        """Cached issues and their sync time, by key."""
+        found: dict[str, tuple[dict, float]] = {}
+        for batch in _batches(keys):
+            marks = ",".join("?" * len(batch))
+            for key, data, synced_at in self.db.execute(
+                f"SELECT key, data, synced_at FROM issues WHERE key IN ({marks})", batch
+            ):
+                found[key] = (json.loads(data), synced_at)
+        return found
+
+    # -- queries -----------------------------------------------------------
+
+    def search(self, client: JiraClient, jql: str, fields: str, max_results: int = 500) -> list[dict]:
+        """Cached equivalent of ``client.search_issues(jql, fields, max_results)``.
+
+        A single-field ``ORDER BY`` is applied locally (``created`` sorts by
+        issue id); any other ordering falls back to issue key order.
+        """
+        query, order_field, descending = _split_order_by(jql)
+        fields = _with_field(fields, "updated")
+        state_key = f"{query}\n{fields}"
+        state = self.db.execute(
+            "SELECT last_sync, last_full_sync FROM queries WHERE query = ?", (state_key,)
+        ).fetchone()
+        started = time.time()
+
+        synced = False
+        if state is not None and not self.full_sync and started - state[1] <= FULL_SYNC_MAX_AGE:
+            try:
+                self._delta_sync(client, state_key, query, fields, max_results, state[0], started)
+                synced = True
+            except OSError as e:
+                # e.g. a deleted member key makes "key in (...)" invalid
+                print(f"Issue cache: delta sync failed ({e}), doing a full sync")
+        if not synced:
+            issues = client.search_issues(jql, fields=fields, max_results=max_results)
+            with self.db:
+                self._store(issues, started)
+                self.db.execute("DELETE FROM members WHERE query = ?", (state_key,))
+                self.db.executemany("INSERT INTO members (query, key) VALUES (?, ?)",
+                                    [(state_key, issue["key"]) for issue in issues])
+                self.db.execute("INSERT OR REPLACE INTO queries VALUES (?, ?, ?)", (state_key, started, started))
+            print(f"Issue cache: full sync of {len(issues)} issues")
+
+        keys = [key for (key,) in self.db.execute("SELECT key FROM members WHERE query = ?", (state_key,))]
+        issues = [issue for issue, _ in self._load(keys).values()]
+        return self._sorted(issues, order_field, descending)[:max_results]
+
+    def _delta_sync(self, client: JiraClient, state_key: str, query: str, fields: str,
+                    max_results: int, last_sync: float, started: float) -> None:
+        """Fetch what changed in a cached query since ``last_sync`` and update its members."""
+        since = _updated_since(last_sync)
+        members = [key for (key,) in self.db.execute("SELECT key FROM members WHERE query = ?", (state_key,))]
+        jqls = [f"({query}) AND {since}"]
+        jqls += [f"key in ({','.join(batch)}) AND {since}" for batch in _batches(members)]
+        results = client.search_issues_many(jqls, fields=fields, max_results=max_results)
+        matching = {issue["key"] for issue in results[0]}
+        changed = [issue for result in results for issue in result]
+        dropped = {issue["key"] for issue in changed} - matching
+        with self.db:
+            self._store(changed, started)
+            self.db.executemany("INSERT OR IGNORE INTO members (query, key) VALUES (?, ?)",
+                                [(state_key, key) for key in matching])
+            self.db.executemany("DELETE FROM members WHERE query = ? AND key = ?",
+                                [(state_key, key) for key in dropped])
+            self.db.execute("UPDATE queries SET last_sync = ? WHERE query = ?", (started, state_key))
+        print(f"Issue cache: {len(matching)} new or updated, {len(dropped)} no longer matching")
+
+    def get_issues(self, client: JiraClient, keys: list[str], fields: str) -> dict[str, dict]:
+        """Issues by key, downloading missing ones and refreshing cached ones with a delta search."""
+        fields = _with_field(fields, "updated")
+        wanted = [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "key"]
+        started = time.time()
+        cached = self._load(list(dict.fromkeys(keys)))
+
+        stale: list[str] = []
+        fresh: list[str] = []
+        for key in dict.fromkeys(keys):
+            issue, synced_at = cached.get(key, ({}, 0.0))
+            has_fields = all(name in issue.get("fields", {}) for name in wanted)
+            if not has_fields or self.full_sync or started - synced_at > FULL_SYNC_MAX_AGE:
+                stale.append(key)
+            else:
+                fresh.append(key)
+
+        jqls = [f"key in ({','.join(batch)})" for batch in _batches(stale)]
+        for batch in _batches(fresh):
+            oldest = min(cached[key][1] for key in batch)
+            jqls.append(f"key in ({','.join(batch)}) AND {_updated_since(oldest)}")
+        try:
+            results = client.search_issues_many(jqls, fields=fields, max_results=_KEY_BATCH_SIZE)
+        except OSError as e:
+            # e.g. a deleted or moved key makes the whole "key in (...)" batch invalid
+            print(f"Issue cache: batch fetch failed ({e}), fetching issues one by one")
+            results = [self._fetch_each(client, [*stale, *fresh], fields)]
+        with self.db:
+            self._store([issue for result in results for issue in result], started)
+            for batch in _batches(fresh):
+                marks = ",".join("?" * len(batch))
+                self.db.execute(f"UPDATE issues SET synced_at = ? WHERE key IN ({marks})", [started, *batch])
+        return {key: issue for key, (issue, _) in self._load(keys).items()}
+
+    def _fetch_each(self, client: JiraClient, keys: list[str], fields: str) -> list[dict]:
+        """Download issues one key at a time, forgetting cached issues that Jira no longer returns."""
+        issues: list[dict] = []
+        missing: list[str] = []
+        for key in keys:
+            try:
+                found = client.search_issues(f"key = {key}", fields=fields, max_results=1)
+            except OSError:
+                found = []
+            issues.extend(found)
+            if not found:
+                missing.append(key)
+        if missing:
+            print(f"Issue cache: {len(missing)} issues no longer found: {', '.join(missing)}")
+            with self.db:
+                self.db.executemany("DELETE FROM issues WHERE key = ?", [(key,) for key in missing])
+                self.db.executemany("DELETE FROM links WHERE source = ? OR target = ?",
+                                    [(key, key) for key in missing])
+        return issues
+
+    def linked_keys(self, key: str, link_type: str = "Blocks", *, inward: bool = False) -> list[str]:
+        """Keys linked from ``key`` (``key`` blocks them), or to it with ``inward=True``."""
+        if inward:
+            sql = "SELECT source FROM links WHERE target = ? AND type = ? ORDER BY source"
+        else:
+            sql = "SELECT target FROM links WHERE source = ? AND type = ? ORDER BY target"
+        return [k for (k,) in self.db.execute(sql, (key, link_type))]
+
+    @staticmethod
+    def _sorted(issues: list[dict], field: str | None, descending: bool) -> list[dict]:
+        if field is None:
+            return sorted(issues, key=lambda i: i["key"])
+        if field.lower() == "created":
+            return sorted(issues, key=lambda i: int(i.get("id") or 0), reverse=descending)
+        present = [i for i in issues if i.get("fields", {}).get(field) is not None]
+        missing = [i for i in issues if i.get("fields", {}).get(field) is None]
+        return sorted(present, key=lambda i: str(i["fields"][field]), reverse=descending) + missing
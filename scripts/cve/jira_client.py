@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import http.client
+import io
 import json
 import os
+import random
+import threading
+import time
+import urllib.error
 import urllib.parse
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 from scripts.cve import create_ssl_context
 from scripts.cve.jira_auth import (
@@ -16,10 +23,9 @@ from scripts.cve.jira_auth import (
 
 try:
     import requests
+    import requests.adapters
     HAS_REQUESTS = True
 except ImportError:
-    import urllib.request
-
     HAS_REQUESTS = False
 
 
@@ -27,25 +33,87 @@ _SSL_CONTEXT = create_ssl_context() if not HAS_REQUESTS else None
 
 JIRA_DEFAULT_URL = "https://redhat.atlassian.net"
 
+# Concurrency and pacing of bulk operations; Jira Cloud rate-limits per user.
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+# 429 is always retried (the request was not processed); 5xx only for
+# idempotent methods, so a retried POST cannot create a duplicate issue.
+_MAX_ATTEMPTS = 5
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+# Raised on a reused keep-alive connection that the server had already closed,
+# before any response arrived: the request was not processed and can be resent.
+_STALE_CONNECTION_ERRORS = (BrokenPipeError, ConnectionResetError)  # incl. http.client.RemoteDisconnected
+
 # Keys set explicitly by create_issue(); extra_fields may not override these.
 _CREATE_ISSUE_PROTECTED_FIELD_KEYS = frozenset({
     "project", "summary", "issuetype", "description", "labels", "components", "security",
 })
 
 
+class _RateLimiter:
+    """Space out request starts across threads to at most ``rate`` per second."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def _retry_delay(retry_after: str | None, attempt: int) -> float:
+    """Seconds to wait before retry number ``attempt`` (honours ``Retry-After``)."""
+    if retry_after and retry_after.strip().isdigit():
+        return min(float(retry_after), 60.0)
+    return min(0.5 * 2 ** attempt, 30.0) + random.uniform(0, 0.5)
+
+
 class JiraClient:
     """Simple Jira REST API v3 client.
 
     Supports both the ``requests`` library (preferred) and stdlib ``urllib``
     as a fallback for environments without ``requests`` installed.
+
+    Connections are kept alive and reused: one pooled ``requests.Session``,
+    or one ``http.client`` connection per thread for the fallback.  Requests
+    answered with 429 or 5xx are retried with exponential backoff, and all
+    requests are paced by a shared rate limit, so the bulk helpers
+    (``update_issues``, ``create_issue_links``, ``search_issues_many``) can
+    run independent calls concurrently.
     """
 
-    def __init__(self, base_url: str, auth_headers: dict | None = None):
+    def __init__(self, base_url: str, auth_headers: dict | None = None, *,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND):
         """Direct constructor — testable, no env var dependencies."""
         self.base_url = base_url.rstrip("/")
         self.headers: dict[str, str] = {"Content-Type": "application/json"}
         if auth_headers:
             self.headers.update(auth_headers)
+        self.max_workers = max(1, max_workers)
+        self._rate_limiter = _RateLimiter(requests_per_second)
+        self._local = threading.local()
+        self._session = None
+        if HAS_REQUESTS:
+            self._session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        if self._session is not None:
+            self._session.close()
+        for conn in getattr(self._local, "connections", {}).values():
+            conn.close()
 
     @classmethod
     def from_env(cls) -> JiraClient:
@@ -73,37 +141,90 @@ class JiraClient:
 
         return cls(base_url, auth_headers)
 
+    def _urllib_send(self, method: str, url: str, body: bytes | None) -> tuple[int, Any, bytes]:
+        """Send a request on this thread's keep-alive connection (fallback without ``requests``)."""
+        parts = urllib.parse.urlsplit(url)
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        connections = self._local.__dict__.setdefault("connections", {})
+        key = (parts.scheme, parts.netloc)
+        reused = key in connections
+        if not reused:
+            if parts.scheme == "https":
+                connections[key] = http.client.HTTPSConnection(parts.netloc, timeout=30, context=_SSL_CONTEXT)
+            else:
+                connections[key] = http.client.HTTPConnection(parts.netloc, timeout=30)
+        conn = connections[key]
+        response = None
+        try:
+            conn.request(method, path, body=body, headers=self.headers)
+            response = conn.getresponse()
+            return response.status, response.headers, response.read()
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            del connections[key]
+            # The server may have closed the idle connection; resend on a fresh one.
+            # A timeout or a broken response could come after Jira processed the
+            # request, so only idempotent methods are resent then.
+            stale = response is None and isinstance(e, _STALE_CONNECTION_ERRORS)
+            if reused and (stale or method in _IDEMPOTENT_METHODS):
+                return self._urllib_send(method, url, body)
+            raise
+
     def _request(self, method: str, endpoint: str, params: dict | None = None, data: dict | None = None) -> dict:
-        """Make a request to the Jira API."""
+        """Make a request to the Jira API, retrying on 429 and 5xx responses."""
         url = f"{self.base_url}{endpoint}"
+        if params and not HAS_REQUESTS:
+            url = f"{url}?{urllib.parse.urlencode(params)}"
+        body = json.dumps(data).encode("utf-8") if data else None
+
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            self._rate_limiter.wait()
+            try:
+                if HAS_REQUESTS:
+                    response = self._session.request(method, url, params=params, data=body,
+                                                     headers=self.headers, timeout=30)
+                    status, headers = response.status_code, response.headers
+                else:
+                    status, headers, content = self._urllib_send(method, url, body)
+            except (OSError, http.client.HTTPException):
+                if attempt == _MAX_ATTEMPTS or method not in _IDEMPOTENT_METHODS:
+                    raise
+                time.sleep(_retry_delay(None, attempt))
+                continue
+            retryable = status == 429 or (status in _RETRY_STATUSES and method in _IDEMPOTENT_METHODS)
+            if not retryable or attempt == _MAX_ATTEMPTS:
+                break
+            time.sleep(_retry_delay(headers.get("Retry-After"), attempt))
 
         if HAS_REQUESTS:
-            response = requests.request(
-                method,
-                url,
-                params=params,
-                json=data,
-                headers=self.headers,
-                timeout=30,
-            )
             response.raise_for_status()
             if response.text:
                 return response.json()
             return {}
 
-        if params:
-            query_string = "&".join(f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items())
-            url = f"{url}?{query_string}"
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, http.client.responses.get(status, ""), headers,
+                                         io.BytesIO(content))
+        if content:
+            return json.loads(content)
+        return {}
 
-        req = urllib.request.Request(url, headers=self.headers, method=method)
-        if data:
-            req.data = json.dumps(data).encode("utf-8")
+    def _run_concurrently(self, func: Callable[..., Any], calls: list[tuple]) -> list[Exception | None]:
+        """Call ``func(*args)`` for each args tuple on up to ``max_workers`` threads.
 
-        with urllib.request.urlopen(req, context=_SSL_CONTEXT, timeout=30) as resp:
-            content = resp.read().decode()
-            if content:
-                return json.loads(content)
-            return {}
+        Returns the exception raised by each call (or None), in input order.
+        """
+        def call(args: tuple) -> Exception | None:
+            try:
+                func(*args)
+            except Exception as e:
+                return e
+            return None
+
+        if len(calls) <= 1 or self.max_workers == 1:
+            return [call(args) for args in calls]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(call, calls))
 
     def search_issues(self, jql: str, fields: str,
                       max_results: int = 500) -> list[dict]:
@@ -133,6 +254,14 @@ class JiraClient:
 
         return all_issues
 
+    def search_issues_many(self, jqls: list[str], fields: str,
+                           max_results: int = 500) -> list[list[dict]]:
+        """Run independent JQL searches concurrently; results are in ``jqls`` order."""
+        if len(jqls) <= 1:
+            return [self.search_issues(jql, fields, max_results) for jql in jqls]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jqls))) as pool:
+            return list(pool.map(lambda jql: self.search_issues(jql, fields, max_results), jqls))
+
     def get_issue(self, issue_key: str, fields: str) -> dict:
         """Get a single issue."""
         params = {"fields": fields}
@@ -189,3 +318,21 @@ class JiraClient:
     def update_issue(self, issue_key: str, fields: dict) -> None:
         """Update fields on an existing issue."""
         self._request("PUT", f"/rest/api/3/issue/{issue_key}", data={"fields": fields})
+
+    def update_issues(self, updates: dict[str, dict]) -> dict[str, Exception | None]:
+        """Update fields on many issues concurrently.
+
+        Returns the error of each update (None on success), keyed by issue key.
+        """
+        errors = self._run_concurrently(self.update_issue, list(updates.items()))
+        return dict(zip(updates, errors))
+
+    def create_issue_links(self, link_type: str, inward_key: str,
+                           outward_keys: list[str]) -> dict[str, Exception | None]:
+        """Link one issue to many issues concurrently.
+
+        Returns the error of each link (None on success), keyed by outward issue key.
+        """
+        errors = self._run_concurrently(self.create_issue_link,
+                                        [(link_type, inward_key, key) for key in outward_keys])
+        return dict(zip(outward_keys, errors))
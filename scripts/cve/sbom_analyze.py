@@ -9,10 +9,16 @@ Supports both:
 - Syft native JSON format
 - SPDX JSON format (used by manifest-box)
 
+Large SBOMs are read in one streaming pass when the optional ``ijson``
+package is installed (otherwise with ``json.load``).  With ``--index`` the
+components are stored once in an SQLite index next to the SBOM, and repeated
+queries against the same SBOM are answered from the index.
+
 Usage:
     python sbom_analyze.py <sbom.json> <package_name>
     python sbom_analyze.py <sbom.json> --info
     python sbom_analyze.py <sbom.json> --summary
+    python sbom_analyze.py <sbom.json> --index <package_name>
 
 Examples:
     # Find a specific package
@@ -26,15 +32,47 @@ Examples:
 
     # Find all packages at a specific path
     python sbom_analyze.py workbench-sbom.json --path /jupyter/
+
+    # Build (or reuse) workbench-sbom.json.index.sqlite3 and query it
+    python sbom_analyze.py workbench-sbom.json --index lodash
 """
 
 import argparse
 import json
+import os
 import re
+import sqlite3
 import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import Any
 
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# Where each format keeps its component array, as an ijson prefix
+_COMPONENT_PREFIXES = {
+    "syft": "artifacts.item",
+    "spdx-manifest-box": "build_manifest.manifest.components.item",
+    "spdx": "packages.item",
+}
+# Scalar fields reported by get_sbom_info, as ijson prefixes
+_INFO_PREFIXES = frozenset({
+    "source.name", "source.version", "source.type", "distro.name", "distro.version",
+    "descriptor.version", "schema.version", "build_component", "build_completed_at",
+    "spdxVersion", "name",
+})
+
+_JSON_ERRORS: tuple[type[Exception], ...] = (json.JSONDecodeError,)
+if HAS_IJSON:
+    _JSON_ERRORS += (ijson.JSONError,)
+
+INDEX_VERSION = "2"
+_INDEX_BATCH_SIZE = 5000
+
 
 def detect_sbom_format(sbom: dict) -> str:
     """Detect whether this is syft native or SPDX format."""
@@ -123,44 +161,34 @@ def normalize_component(component: dict, fmt: str) -> dict:
         }
 
 
+def name_matches(normalized: dict, package_name: str, case_insensitive: bool = True) -> bool:
+    """Whether a normalized component matches a package name query."""
+    name = normalized.get("name", "")
+    if case_insensitive:
+        return package_name.lower() in name.lower()
+    return package_name == name
+
+
+def path_matches(normalized: dict, path_pattern: str) -> bool:
+    """Whether a normalized component is installed at a path matching the pattern."""
+    locations = normalized.get("locations", [])
+    source_info = normalized.get("sourceInfo", "") or ""
+    # Check both locations and sourceInfo
+    return any(path_pattern in loc for loc in locations) or path_pattern in source_info
+
+
 def find_package(sbom: dict, package_name: str, case_insensitive: bool = True) -> list[dict]:
     """Find a package in the SBOM and return its details."""
     fmt = detect_sbom_format(sbom)
-    components = get_components_from_sbom(sbom)
-    
-    results = []
-    for component in components:
-        normalized = normalize_component(component, fmt)
-        name = normalized.get("name", "")
-        
-        if case_insensitive:
-            match = package_name.lower() in name.lower()
-        else:
-            match = package_name == name
-
-        if match:
-            results.append(normalized)
-    return results
+    normalized = (normalize_component(c, fmt) for c in get_components_from_sbom(sbom))
+    return [n for n in normalized if name_matches(n, package_name, case_insensitive)]
 
 
 def find_packages_at_path(sbom: dict, path_pattern: str) -> list[dict]:
     """Find all packages installed at a path matching the pattern."""
     fmt = detect_sbom_format(sbom)
-    components = get_components_from_sbom(sbom)
-    
-    results = []
-    for component in components:
-        normalized = normalize_component(component, fmt)
-        locations = normalized.get("locations", [])
-        source_info = normalized.get("sourceInfo", "") or ""
-        
-        # Check both locations and sourceInfo
-        matching_locations = [loc for loc in locations if path_pattern in loc]
-        source_match = path_pattern in source_info
-
-        if matching_locations or source_match:
-            results.append(normalized)
-    return results
+    normalized = (normalize_component(c, fmt) for c in get_components_from_sbom(sbom))
+    return [n for n in normalized if path_matches(n, path_pattern)]
 
 
 def get_sbom_info(sbom: dict) -> dict:
@@ -199,26 +227,326 @@ def get_sbom_info(sbom: dict) -> dict:
         return {"format": "unknown"}
 
 
-def summarize_by_type(sbom: dict) -> dict[str, int]:
-    """Summarize packages by ecosystem type."""
-    fmt = detect_sbom_format(sbom)
-    components = get_components_from_sbom(sbom)
-    
+def count_by_type(normalized: Iterable[dict]) -> dict[str, int]:
+    """Count normalized components by ecosystem type, most common first."""
     counts: dict[str, int] = {}
-    for component in components:
-        normalized = normalize_component(component, fmt)
-        pkg_type = normalized.get("type", "unknown")
+    for component in normalized:
+        pkg_type = component.get("type", "unknown")
         counts[pkg_type] = counts.get(pkg_type, 0) + 1
 
     return dict(sorted(counts.items(), key=lambda x: -x[1]))
 
 
+def summarize_by_type(sbom: dict) -> dict[str, int]:
+    """Summarize packages by ecosystem type."""
+    fmt = detect_sbom_format(sbom)
+    return count_by_type(normalize_component(c, fmt) for c in get_components_from_sbom(sbom))
+
+
 def load_sbom(sbom_path: str) -> dict:
     """Load and parse SBOM JSON file."""
     with open(sbom_path) as f:
         return json.load(f)
 
 
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+def _detect_sbom_format_streaming(sbom_path: str) -> str:
+    """Detect the format like ``detect_sbom_format``, without loading the whole file.
+
+    The checks have a priority order and JSON objects have none, so all
+    top-level keys are collected first; only ``artifacts``, which wins
+    regardless of the other keys, ends the scan early.
+    """
+    skeleton: dict[str, dict] = {}
+    with open(sbom_path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if event != "map_key":
+                continue
+            if prefix == "" and value == "artifacts":
+                return "syft"
+            if prefix == "":
+                skeleton.setdefault(value, {})
+            elif prefix == "build_manifest" and value == "manifest":
+                skeleton.setdefault("build_manifest", {})["manifest"] = {}
+    return detect_sbom_format(skeleton)
+
+
+class SbomStream:
+    """Streaming access to an SBOM file.
+
+    ``components()`` yields normalized components one at a time, so memory
+    stays bounded by the largest single component; ``info()`` collects the
+    metadata in a separate streaming pass.  Without ``ijson`` the file is
+    loaded with ``json.load`` instead.
+    """
+
+    def __init__(self, sbom_path: str):
+        self.sbom_path = sbom_path
+        self._sbom: dict | None = None
+        if HAS_IJSON:
+            self.format = _detect_sbom_format_streaming(sbom_path)
+        else:
+            self._sbom = load_sbom(sbom_path)
+            self.format = detect_sbom_format(self._sbom)
+
+    def components(self) -> Iterator[dict]:
+        """Yield every normalized component, in SBOM order."""
+        if self._sbom is not None:
+            for component in get_components_from_sbom(self._sbom):
+                yield normalize_component(component, self.format)
+            return
+        item_prefix = _COMPONENT_PREFIXES.get(self.format)
+        if item_prefix is None:
+            return
+        with open(self.sbom_path, "rb") as f:
+            for component in ijson.items(f, item_prefix, use_float=True):
+                yield normalize_component(component, self.format)
+
+    def info(self) -> dict:
+        """SBOM metadata, as ``get_sbom_info`` returns it."""
+        if self._sbom is not None:
+            return get_sbom_info(self._sbom)
+
+        item_prefix = _COMPONENT_PREFIXES.get(self.format)
+        metadata: dict[str, Any] = {}
+        component_count = file_count = 0
+        with open(self.sbom_path, "rb") as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if event == "start_map":
+                    if prefix == item_prefix:
+                        component_count += 1
+                    elif prefix == "files.item":
+                        file_count += 1
+                elif prefix in _INFO_PREFIXES and event in ("string", "number", "boolean", "null"):
+                    metadata[prefix] = value
+
+        meta = metadata.get
+        if self.format == "syft":
+            return {
+                "format": "syft",
+                "source_name": meta("source.name"),
+                "source_version": meta("source.version"),
+                "source_type": meta("source.type"),
+                "distro": meta("distro.name"),
+                "distro_version": meta("distro.version"),
+                "syft_version": meta("descriptor.version"),
+                "schema_version": meta("schema.version"),
+                "artifact_count": component_count,
+                "file_count": file_count,
+            }
+        elif self.format == "spdx-manifest-box":
+            return {
+                "format": "spdx (manifest-box)",
+                "build_component": meta("build_component"),
+                "build_completed_at": meta("build_completed_at"),
+                "component_count": component_count,
+            }
+        elif self.format == "spdx":
+            return {
+                "format": "spdx",
+                "spdx_version": meta("spdxVersion"),
+                "name": meta("name"),
+                "package_count": component_count,
+            }
+        else:
+            return {"format": "unknown"}
+
+
+def query_sbom(sbom_path: str, *, info: bool = False, summary: bool = False, path: str | None = None,
+               package_name: str | None = None, case_insensitive: bool = True) -> dict[str, Any]:
+    """Answer all requested queries in one streaming pass over the SBOM's components.
+
+    Returns a dict with the keys ``info``, ``summary``, ``path`` and
+    ``search``, for the queries that were requested.
+    """
+    stream = SbomStream(sbom_path)
+    counts: dict[str, int] = {}
+    path_results: list[dict] = []
+    search_results: list[dict] = []
+    for component in stream.components():
+        if summary:
+            pkg_type = component.get("type", "unknown")
+            counts[pkg_type] = counts.get(pkg_type, 0) + 1
+        if path and path_matches(component, path):
+            path_results.append(component)
+        if package_name and name_matches(component, package_name, case_insensitive):
+            search_results.append(component)
+
+    result: dict[str, Any] = {}
+    if info:
+        result["info"] = stream.info()
+    if summary:
+        result["summary"] = dict(sorted(counts.items(), key=lambda x: -x[1]))
+    if path:
+        result["path"] = path_results
+    if package_name:
+        result["search"] = search_results
+    return result
+
+
+# ---------------------------------------------------------------------------
+# On-disk index
+# ---------------------------------------------------------------------------
+
+_INDEX_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE components (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    version TEXT,
+    type TEXT NOT NULL,
+    found_by TEXT,
+    purl TEXT,
+    source_info TEXT
+);
+CREATE TABLE locations (component_id INTEGER NOT NULL, path TEXT NOT NULL);
+"""
+# Created after the bulk insert, which is faster than maintaining them row by row
+_INDEX_INDEXES = """
+CREATE INDEX components_name ON components (name);
+CREATE INDEX components_name_lower ON components (name_lower);
+CREATE INDEX components_type ON components (type);
+CREATE INDEX locations_component ON locations (component_id);
+"""
+
+
+def default_index_path(sbom_path: str) -> Path:
+    return Path(f"{sbom_path}.index.sqlite3")
+
+
+class SbomIndex:
+    """SQLite index of an SBOM's components by name, purl type and location path.
+
+    The index records the size and modification time of the SBOM it was
+    built from and is rebuilt automatically when they change.
+    """
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    @staticmethod
+    def _fingerprint(sbom_path: str) -> str:
+        st = os.stat(sbom_path)
+        return f"{INDEX_VERSION}:{st.st_size}:{st.st_mtime_ns}"
+
+    @classmethod
+    def open(cls, sbom_path: str, index_path: Path | None = None) -> "SbomIndex":
+        """Open the index for ``sbom_path``, building it first if missing or stale."""
+        index_path = index_path or default_index_path(sbom_path)
+        fingerprint = cls._fingerprint(sbom_path)
+        if index_path.exists():
+            db = sqlite3.connect(index_path)
+            try:
+                row = db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            except sqlite3.DatabaseError:
+                row = None
+            if row is not None and row[0] == fingerprint:
+                return cls(db)
+            db.close()
+        return cls.build(sbom_path, index_path, fingerprint)
+
+    @classmethod
+    def build(cls, sbom_path: str, index_path: Path, fingerprint: str) -> "SbomIndex":
+        """Stream the SBOM into a new index file, replacing any previous one atomically."""
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        db = sqlite3.connect(tmp_path)
+        try:
+            db.executescript(_INDEX_SCHEMA)
+            stream = SbomStream(sbom_path)
+            rows: list[tuple] = []
+            locations: list[tuple[int, str]] = []
+            with db:
+                for component_id, c in enumerate(stream.components(), 1):
+                    rows.append((component_id, c["name"], c["name"].lower(), c["version"], c["type"],
+                                 c["foundBy"], c["purl"], c["sourceInfo"]))
+                    locations.extend((component_id, loc) for loc in c["locations"])
+                    if len(rows) >= _INDEX_BATCH_SIZE:
+                        cls._flush(db, rows, locations)
+                cls._flush(db, rows, locations)
+                db.executescript(_INDEX_INDEXES)
+                db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                               [("fingerprint", fingerprint), ("info", json.dumps(stream.info()))])
+        except BaseException:
+            db.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        db.close()
+        os.replace(tmp_path, index_path)
+        return cls(sqlite3.connect(index_path))
+
+    @staticmethod
+    def _flush(db: sqlite3.Connection, rows: list[tuple], locations: list[tuple[int, str]]) -> None:
+        db.executemany("INSERT INTO components VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        db.executemany("INSERT INTO locations (component_id, path) VALUES (?, ?)", locations)
+        rows.clear()
+        locations.clear()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _components(self, where: str, params: tuple) -> list[dict]:
+        """Normalized components matching an SQL condition, in SBOM order."""
+        rows = self.db.execute(
+            "SELECT id, name, version, type, found_by, purl, source_info FROM components c"
+            f" WHERE {where} ORDER BY id", params,
+        ).fetchall()
+        results = []
+        for component_id, name, version, pkg_type, found_by, purl, source_info in rows:
+            locs = self.db.execute(
+                "SELECT path FROM locations WHERE component_id = ? ORDER BY rowid", (component_id,)
+            ).fetchall()
+            results.append({
+                "name": name,
+                "version": version,
+                "type": pkg_type,
+                "foundBy": found_by,
+                "locations": [loc for (loc,) in locs],
+                "purl": purl,
+                "sourceInfo": source_info,
+            })
+        return results
+
+    def info(self) -> dict:
+        return json.loads(self.db.execute("SELECT value FROM meta WHERE key = 'info'").fetchone()[0])
+
+    def summarize_by_type(self) -> dict[str, int]:
+        rows = self.db.execute(
+            "SELECT type, COUNT(*) FROM components GROUP BY type ORDER BY COUNT(*) DESC, MIN(id)"
+        )
+        return dict(rows.fetchall())
+
+    def find_package(self, package_name: str, case_insensitive: bool = True) -> list[dict]:
+        if case_insensitive:
+            return self._components("instr(name_lower, ?) > 0", (package_name.lower(),))
+        return self._components("name = ?", (package_name,))
+
+    def find_packages_at_path(self, path_pattern: str) -> list[dict]:
+        return self._components(
+            "instr(coalesce(source_info, ''), ?) > 0"
+            " OR EXISTS (SELECT 1 FROM locations l WHERE l.component_id = c.id AND instr(l.path, ?) > 0)",
+            (path_pattern, path_pattern),
+        )
+
+    def query(self, *, info: bool = False, summary: bool = False, path: str | None = None,
+              package_name: str | None = None, case_insensitive: bool = True) -> dict[str, Any]:
+        """Same as ``query_sbom``, answered from the index."""
+        result: dict[str, Any] = {}
+        if info:
+            result["info"] = self.info()
+        if summary:
+            result["summary"] = self.summarize_by_type()
+        if path:
+            result["path"] = self.find_packages_at_path(path)
+        if package_name:
+            result["search"] = self.find_package(package_name, case_insensitive)
+        return result
+
+
 def print_package_results(results: list[dict], package_name: str) -> None:
     """Pretty-print package search results."""
     if not results:
@@ -288,6 +616,10 @@ Location patterns help determine remediation:
     parser.add_argument("--path", help="Find packages at a specific path")
     parser.add_argument("--exact", action="store_true", help="Exact package name match")
     parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    parser.add_argument("--index", action="store_true",
+                        help="Answer from an SQLite index of the SBOM, building it if missing or stale")
+    parser.add_argument("--index-file", type=Path,
+                        help="Index location for --index (default: <sbom_file>.index.sqlite3)")
 
     args = parser.parse_args()
 
@@ -295,57 +627,52 @@ Location patterns help determine remediation:
     if not args.info and not args.summary and not args.path and not args.package_name:
         parser.error("Must specify package_name, --info, --summary, or --path")
 
-    # Load SBOM
+    queries = {
+        "info": args.info,
+        "summary": args.summary,
+        "path": args.path,
+        "package_name": args.package_name,
+        "case_insensitive": not args.exact,
+    }
+
+    # Load SBOM (one streaming pass, or the index)
     try:
-        sbom = load_sbom(args.sbom_file)
+        if args.index or args.index_file:
+            index = SbomIndex.open(args.sbom_file, args.index_file)
+            result = index.query(**queries)
+            index.close()
+        else:
+            result = query_sbom(args.sbom_file, **queries)
     except FileNotFoundError:
         print(f"Error: File not found: {args.sbom_file}", file=sys.stderr)
         return 1
-    except json.JSONDecodeError as e:
+    except _JSON_ERRORS as e:
         print(f"Error: Invalid JSON in {args.sbom_file}: {e}", file=sys.stderr)
         return 1
 
     # Process commands
     if args.json:
-        # JSON mode: collect all outputs into a single dict
-        result: dict[str, Any] = {}
-        
-        if args.info:
-            result["info"] = get_sbom_info(sbom)
-        
-        if args.summary:
-            result["summary"] = summarize_by_type(sbom)
-        
-        if args.path:
-            result["path"] = find_packages_at_path(sbom, args.path)
-        
-        if args.package_name:
-            result["search"] = find_package(sbom, args.package_name, case_insensitive=not args.exact)
-        
+        # JSON mode: all outputs in a single dict
         print(json.dumps(result, indent=2))
     else:
         # Human-readable mode
         if args.info:
             print("=== SBOM Info ===")
-            info = get_sbom_info(sbom)
-            for k, v in info.items():
+            for k, v in result["info"].items():
                 print(f"  {k}: {v}")
 
         if args.summary:
             print("\n=== Package Summary by Type ===")
-            summary = summarize_by_type(sbom)
-            for pkg_type, count in summary.items():
+            for pkg_type, count in result["summary"].items():
                 print(f"  {pkg_type}: {count}")
 
         if args.path:
             print(f"\n=== Packages at path matching '{args.path}' ===")
-            results = find_packages_at_path(sbom, args.path)
-            print_path_results(results, args.path)
+            print_path_results(result["path"], args.path)
 
         if args.package_name:
             print(f"\n=== Searching for '{args.package_name}' ===")
-            results = find_package(sbom, args.package_name, case_insensitive=not args.exact)
-            print_package_results(results, args.package_name)
+            print_package_results(result["search"], args.package_name)
 
     return 0
 
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+
+"""Local caching proxy for PEP 691 simple-index pages and wheel METADATA.
+
+``pylocks_generator.py`` runs several ``uv pip compile`` processes in parallel, and every
+one of them fetches the same project pages and ``.metadata`` files from the Red Hat index
+on its own.  The index sends no HTTP cache headers (see ``ensure_json_format_param`` in
+pylocks_generator.py), so uv's own cache barely helps.  This proxy is started once per
+run; lock subprocesses are pointed at it and share one set of upstream round-trips.
+
+What is cached:
+  - Project pages (PEP 691 JSON).  A page is reused while it is younger than the TTL, or
+    for as long as it was fetched after the ``--exclude-newer`` cutoff registered with
+    the index: such a page already lists every file the resolver is allowed to see.
+  - PEP 658 ``.metadata`` files.  These are immutable and kept until pruned by age.
+  - Everything else (wheels, range requests) is streamed through uncached.
+
+File URLs in proxied pages are rewritten to go through the proxy too, so that metadata
+lookups hit the cache.  ``IndexProxy.restore`` rewrites a generated lockfile back to the
+upstream URLs, so lockfiles never mention the proxy.
+
+Usage (standalone, mostly for debugging)::
+
+    python scripts/index_proxy.py https://console.redhat.com/api/pypi/public-rhai/rhoai/3.4/cpu-ubi9/simple/
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import shutil
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Self
+from urllib.parse import quote, unquote, urljoin, urlparse, urlunparse
+
+DEFAULT_TTL = 600
+# Cache entries older than this are deleted when the proxy starts.
+MAX_ENTRY_AGE = 7 * 24 * 3600
+UPSTREAM_TIMEOUT = 60
+CHUNK_SIZE = 1024 * 1024
+
+PEP691_JSON = "application/vnd.pypi.simple.v1+json"
+_PASSTHROUGH_HEADERS = ("Content-Type", "Content-Length", "Content-Range", "Accept-Ranges", "Last-Modified", "ETag")
+_FORWARDED_REQUEST_HEADERS = ("Accept", "Range", "User-Agent")
+
+
+def parse_timestamp(value: str | None) -> float | None:
+    """Parse a uv ``--exclude-newer`` timestamp (``2025-06-01T12:30:45Z`` or with offset).
+
+    >>> parse_timestamp("1970-01-01T00:01:00Z")
+    60.0
+    >>> parse_timestamp("not a date") is None
+    True
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    content_type: str
+    fetched: float
+
+
+@dataclass
+class ProxyStats:
+    hits: int = 0
+    misses: int = 0
+    passthrough: int = 0
+    upstream_bytes: int = 0
+    # handlers run on ThreadingHTTPServer threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def count(self, **increments: int) -> None:
+        with self._lock:
+            for name, n in increments.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        ratio = f"{100 * self.hits / total:.0f}%" if total else "n/a"
+        return (
+            f"{self.hits} cache hits, {self.misses} upstream fetches ({ratio} hit rate), "
+            f"{self.passthrough} pass-through requests, {self.upstream_bytes / 1e6:.1f} MB cached from upstream"
+        )
+
+
+@dataclass
+class _Registration:
+    upstream: str  # upstream index base URL without query and trailing "/"
+    cutoff: float | None
+
+
+@dataclass
+class DiskCache:
+    """Content stored as ``<sha256(url)>`` plus a ``.json`` sidecar with url/type/fetch time."""
+
+    root: Path
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        base = self.root / key[:2] / key
+        return base, base.with_suffix(".json")
+
+    def get(self, url: str) -> CacheEntry | None:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except OSError, ValueError:
+            return None
+        if meta.get("url") != url:
+            return None
+        return CacheEntry(body, meta.get("content_type", ""), float(meta.get("fetched", 0)))
+
+    def put(self, url: str, entry: CacheEntry) -> None:
+        body_path, meta_path = self._paths(url)
+        meta = {"url": url, "content_type": entry.content_type, "fetched": entry.fetched}
+        with self._lock:
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = body_path.with_suffix(".part")
+            tmp.write_bytes(entry.body)
+            tmp.replace(body_path)
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    def prune(self, max_age: float) -> int:
+        """Delete entries fetched more than ``max_age`` seconds ago. Returns the count."""
+        removed = 0
+        cutoff = time.time() - max_age
+        for meta_path in self.root.glob("*/*.json"):
+            try:
+                fetched = float(json.loads(meta_path.read_text(encoding="utf-8")).get("fetched", 0))
+            except OSError, ValueError:
+                fetched = 0
+            if fetched < cutoff:
+                meta_path.with_suffix("").unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class IndexProxy:
+    """Caching reverse proxy for one or more upstream simple indexes.
+
+    ``register(url, exclude_newer)`` returns the local URL to pass to uv instead of ``url``;
+    ``restore(lockfile)`` undoes the rewrite in uv's output.
+    """
+
+    def __init__(self, cache_dir: Path, ttl: float = DEFAULT_TTL, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.ttl = ttl
+        self.stats = ProxyStats()
+        self._disk = DiskCache(cache_dir)
+        self._registrations: list[_Registration] = []
+        self._lock = threading.Lock()
+        self._inflight: dict[str, threading.Lock] = {}
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> Self:
+        self._disk.prune(MAX_ENTRY_AGE)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="index-proxy", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    # region URL mapping
+    def register(self, index_url: str, exclude_newer: str | None = None) -> str:
+        """Return the proxied equivalent of ``index_url``; its query string is kept as is."""
+        parsed = urlparse(index_url)
+        upstream = urlunparse(parsed._replace(path=parsed.path.rstrip("/"), query="", fragment=""))
+        reg = _Registration(upstream, parse_timestamp(exclude_newer))
+        with self._lock:
+            if reg in self._registrations:
+                number = self._registrations.index(reg)
+            else:
+                self._registrations.append(reg)
+                number = len(self._registrations) - 1
+        local = f"{self.base_url}/idx/{number}" + ("/" if parsed.path.endswith("/") else "")
+        return f"{local}?{parsed.query}" if parsed.query else local
+
+    def proxy_index_flags(self, flags: list[str], exclude_newer: str | None) -> list[str]:
+        """Rewrite ``--default-index=``/``--index=`` flags that point at PEP 691 JSON indexes.
+
+        HTML indexes (public PyPI) are left alone; the proxy only understands JSON pages.
+        """
+        out = []
+        for flag in flags:
+            name, sep, url = flag.partition("=")
+            if sep and name in ("--default-index", "--index") and "format=json" in urlparse(url).query:
+                flag = f"{name}={self.register(url, exclude_newer)}"
+            out.append(flag)
+        return out
+
+    def restore_text(self, text: str) -> str:
+        """Replace proxy URLs in ``text`` with the upstream URLs they stand for."""
+        files_re = re.compile(re.escape(self.base_url) + r"/files/([^\s\"'\]]+)")
+        text = files_re.sub(lambda m: unquote(m.group(1)), text)
+        # one pass, so that restoring /idx/1 cannot rewrite the start of /idx/10
+        idx_re = re.compile(re.escape(self.base_url) + r"/idx/(\d+)")
+        return idx_re.sub(lambda m: self._registrations[int(m.group(1))].upstream, text)
+
+    def restore(self, lockfile: Path) -> None:
+        if not lockfile.is_file():
+            return
+        text = lockfile.read_text(encoding="utf-8")
+        restored = self.restore_text(text)
+        if restored != text:
+            lockfile.write_text(restored, encoding="utf-8")
+
+    def _file_url(self, upstream_url: str) -> str:
+        return f"{self.base_url}/files/{quote(upstream_url, safe='')}"
+
+    def rewrite_page(self, body: bytes, page_url: str) -> bytes:
+        """Point ``files[].url`` of a PEP 691 page at the proxy; non-JSON bodies pass unchanged."""
+        try:
+            page = json.loads(body)
+        except ValueError:
+            return body
+        for entry in page.get("files", []) if isinstance(page, dict) else []:
+            if isinstance(entry, dict) and isinstance(entry.get("url"), str):
+                entry["url"] = self._file_url(urljoin(page_url, entry["url"]))
+        return json.dumps(page).encode()
+
+    # endregion
+
+    # region Fetching
+    def _is_fresh(self, entry: CacheEntry, cutoff: float | None, immutable: bool) -> bool:
+        if immutable:
+            return True
+        if time.time() - entry.fetched < self.ttl:
+            return True
+        # a page fetched after the cutoff lists every file uv may pick under --exclude-newer
+        return cutoff is not None and entry.fetched >= cutoff
+
+    def fetch_cached(self, url: str, headers: dict[str, str], cutoff: float | None, immutable: bool) -> CacheEntry:
+        """Return ``url`` from cache, or fetch it once even if many callers ask concurrently."""
+        with self._lock:
+            gate = self._inflight.setdefault(url, threading.Lock())
+        with gate:
+            entry = self._disk.get(url)
+            if entry is not None and self._is_fresh(entry, cutoff, immutable):
+                self.stats.count(hits=1)
+                return entry
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=UPSTREAM_TIMEOUT) as response:
+                body = response.read()
+                entry = CacheEntry(body, response.headers.get("Content-Type", ""), time.time())
+            self.stats.count(misses=1, upstream_bytes=len(body))
+            self._disk.put(url, entry)
+            return entry
+
+    def resolve(self, path: str) -> tuple[str, _Registration | None, bool]:
+        """Map a request path to (upstream URL, registration for index pages, is_metadata)."""
+        if path.startswith("/files/"):
+            upstream = unquote(path.removeprefix("/files/"))
+            return upstream, None, upstream.endswith(".metadata")
+        m = re.match(r"^/idx/(\d+)/(.*)$", path)
+        if not m or int(m.group(1)) >= len(self._registrations):
+            raise LookupError(path)
+        reg = self._registrations[int(m.group(1))]
+        rest, _, query = m.group(2).partition("?")
+        url = f"{reg.upstream}/{rest}" + (f"?{query}" if query else "")
+        return url, reg, False
+
+    # endregion
+
+
+def _make_handler(proxy: IndexProxy) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass  # keep uv's output readable; see ProxyStats for a summary
+
+        def _forward_headers(self) -> dict[str, str]:
+            return {h: v for h in _FORWARDED_REQUEST_HEADERS if (v := self.headers.get(h))}
+
+        def _send(self, status: int, headers: dict[str, str], body: bytes, head_only: bool) -> None:
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head_only:
+                self.wfile.write(body)
+
+        def _handle(self, head_only: bool) -> None:
+            try:
+                upstream, reg, is_metadata = proxy.resolve(self.path)
+            except LookupError:
+                self._send(404, {"Content-Type": "text/plain"}, b"unknown index\n", head_only)
+                return
+            try:
+                if not head_only and (reg is not None or is_metadata):
+                    self._serve_cached(upstream, reg, is_metadata)
+                else:
+                    self._stream(upstream, head_only)
+            except urllib.error.HTTPError as exc:
+                self._send(
+                    exc.code, {"Content-Type": exc.headers.get("Content-Type", "text/plain")}, exc.read(), head_only
+                )
+            except (urllib.error.URLError, TimeoutError, OSError) as exc:
+                self._send(502, {"Content-Type": "text/plain"}, f"upstream error: {exc}\n".encode(), head_only)
+
+        def _serve_cached(self, upstream: str, reg: _Registration | None, is_metadata: bool) -> None:
+            headers = self._forward_headers()
+            if reg is not None:
+                headers["Accept"] = PEP691_JSON
+            entry = proxy.fetch_cached(upstream, headers, reg.cutoff if reg else None, immutable=is_metadata)
+            body = proxy.rewrite_page(entry.body, upstream) if reg is not None else entry.body
+            max_age = "31536000, immutable" if is_metadata else str(int(proxy.ttl))
+            self._send(200, {"Content-Type": entry.content_type, "Cache-Control": f"max-age={max_age}"}, body, False)
+
+        def _stream(self, upstream: str, head_only: bool) -> None:
+            proxy.stats.count(passthrough=1)
+            request = urllib.request.Request(
+                upstream, headers=self._forward_headers(), method="HEAD" if head_only else "GET"
+            )
+            with urllib.request.urlopen(request, timeout=UPSTREAM_TIMEOUT) as response:
+                self.send_response(response.status)
+                for h in _PASSTHROUGH_HEADERS:
+                    if (v := response.headers.get(h)) is not None:
+                        self.send_header(h, v)
+                if response.headers.get("Content-Length") is None:
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                self.end_headers()
+                if head_only:
+                    return
+                try:
+                    shutil.copyfileobj(response, self.wfile, CHUNK_SIZE)
+                except OSError:
+                    # headers are already out; all we can do is drop the connection
+                    self.close_connection = True
+
+        def do_GET(self) -> None:
+            self._handle(head_only=False)
+
+        def do_HEAD(self) -> None:
+            self._handle(head_only=True)
+
+    return Handler
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <index-url> [<index-url> ...]", file=sys.stderr)
+        sys.exit(1)
+    cache_dir = Path(__file__).resolve().parent.parent / ".cache" / "pylocks_generator" / "index-proxy"
+    with IndexProxy(cache_dir) as proxy:
+        for url in sys.argv[1:]:
+            print(f"{url} -> {proxy.register(url)}", flush=True)
+        try:
+            while True:
+                time.sleep(60)
+                print(proxy.stats.summary(), flush=True)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
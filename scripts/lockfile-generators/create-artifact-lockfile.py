@@ -12,6 +12,11 @@ artifacts.lock.yaml in the same directory.  The lock file is consumed by
 cachi2 in Konflux CI; locally, the cached files under
 cachi2/output/deps/generic/ are bind-mounted into the build.
 
+Artifacts are downloaded in parallel (--jobs) and hashed while they stream.
+The digest of every cached file is remembered in a sidecar under
+cachi2/output/deps/generic/.checksums/, keyed by the file's size and mtime,
+so unchanged cached files are not read again on the next run.
+
 Input format (artifacts.in.yaml):
   Each entry can have:
     - url:      (required) The URL to download
@@ -22,12 +27,16 @@ Output: artifacts.lock.yaml with download_url, checksum, and filename per artifa
 
 Usage:
   python3 scripts/lockfile-generators/create-artifact-lockfile.py \\
-      --artifact-input path/to/artifacts.in.yaml
+      --artifact-input path/to/artifacts.in.yaml [--jobs N]
 """
 import argparse
 import hashlib
-import subprocess
+import json
 import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Optional
 
@@ -35,8 +44,12 @@ import yaml
 
 # Constants
 CACHE_BASE_DIR = Path("cachi2/output/deps/generic")
+CHECKSUM_SIDECAR_DIR = CACHE_BASE_DIR / ".checksums"
 METADATA_VERSION = "1.0"
-CHUNK_SIZE = 8192
+CHUNK_SIZE = 1 << 20
+DEFAULT_JOBS = 8
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_TRIES = 3
 
 
 def get_default_filename(url: str) -> str:
@@ -53,17 +66,65 @@ def compute_sha256(file_path: Path) -> str:
     return sha256_hash.hexdigest()
 
 
-def download_file(url: str, target_path: Path) -> None:
-    """Download URL using wget to target_path."""
-    target_path.parent.mkdir(parents=True, exist_ok=True)
-    cmd = ["wget", "--timeout=60", "--tries=3", "-q", "-O", str(target_path), url]
+def _sidecar_path(file_path: Path) -> Path:
+    relative = file_path.relative_to(CACHE_BASE_DIR.resolve())
+    return CHECKSUM_SIDECAR_DIR.resolve() / relative.with_name(f"{relative.name}.json")
+
+
+def _write_sidecar(file_path: Path, checksum: str) -> None:
+    st = file_path.stat()
+    sidecar = _sidecar_path(file_path)
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    sidecar.write_text(json.dumps({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": checksum}))
 
+
+def cached_sha256(file_path: Path) -> tuple[str, bool]:
+    """SHA256 of a cached file, from its sidecar when size and mtime still match.
+
+    Returns (checksum, whether it came from the sidecar).
+    """
+    st = file_path.stat()
     try:
-        subprocess.run(cmd, check=True)
-    except FileNotFoundError:
-        raise RuntimeError("wget not found: please install wget")
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"wget failed for {url}: exit code {e.returncode}")
+        recorded = json.loads(_sidecar_path(file_path).read_text())
+        if recorded["size"] == st.st_size and recorded["mtime_ns"] == st.st_mtime_ns:
+            return recorded["sha256"], True
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    checksum = compute_sha256(file_path)
+    _write_sidecar(file_path, checksum)
+    return checksum, False
+
+
+def download_file(url: str, target_path: Path) -> str:
+    """Download URL to target_path, hashing while streaming. Returns the SHA256.
+
+    Data goes to ``<target>.part`` first, so an interrupted download never
+    looks like a cached artifact.
+    """
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    part = target_path.with_name(target_path.name + ".part")
+    request = urllib.request.Request(url, headers={"User-Agent": "create-artifact-lockfile"})
+    for attempt in range(1, DOWNLOAD_TRIES + 1):
+        sha256_hash = hashlib.sha256()
+        try:
+            with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response, open(part, "wb") as f:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    sha256_hash.update(chunk)
+                    f.write(chunk)
+            break
+        except urllib.error.HTTPError as e:
+            part.unlink(missing_ok=True)
+            if e.code < 500 or attempt == DOWNLOAD_TRIES:
+                raise RuntimeError(f"download failed for {url}: HTTP {e.code} {e.reason}") from e
+        except (urllib.error.URLError, OSError) as e:
+            part.unlink(missing_ok=True)
+            if attempt == DOWNLOAD_TRIES:
+                raise RuntimeError(f"download failed for {url}: {e}") from e
+        time.sleep(attempt)
+    part.replace(target_path)
+    checksum = sha256_hash.hexdigest()
+    _write_sidecar(target_path, checksum)
+    return checksum
 
 
 def normalize_checksum(checksum: str) -> str:
@@ -99,8 +160,8 @@ def load_artifact_input(input_path: Path) -> list[Any]:
     return items
 
 
-def process_artifact(item: dict[str, Any], seen_filenames: set[str]) -> Optional[dict[str, Any]]:
-    """Process a single artifact item. Skips duplicate filenames."""
+def plan_artifact(item: dict[str, Any], seen_filenames: set[str]) -> Optional[tuple[str, str, Path]]:
+    """Validate one artifact item. Returns (url, filename, cache file), or None to skip it."""
     url = item.get("url")
     if not url:
         print(f"Warning: Skipping item without 'url': {item}", file=sys.stderr)
@@ -118,34 +179,48 @@ def process_artifact(item: dict[str, Any], seen_filenames: set[str]) -> Optional
         print(f"Error: filename '{filename}' escapes cache directory — skipping", file=sys.stderr)
         return None
 
+    return url, filename, cache_file
+
+
+def process_artifact(
+    item: dict[str, Any], url: str, filename: str, cache_file: Path
+) -> tuple[dict[str, Any], list[tuple[str, bool]]]:
+    """Fetch or reuse one artifact and checksum it.
+
+    Runs on a worker thread, so output is returned as (message, to_stderr) pairs
+    for the caller to print in input order.
+    """
+    messages: list[tuple[str, bool]] = []
     if cache_file.exists():
-        print(f"  ✓ Using existing file: {filename}")
-        checksum = compute_sha256(cache_file)
+        checksum, from_sidecar = cached_sha256(cache_file)
+        note = " (checksum cached)" if from_sidecar else ""
+        messages.append((f"  ✓ Using existing file: {filename}{note}", False))
     else:
-        print(f"  ↓ Downloading: {url}")
-        print(f"    → Saving to: {filename}")
-        download_file(url, cache_file)
-        checksum = compute_sha256(cache_file)
-        print(f"    ✓ Downloaded (sha256: {checksum[:16]}...)")
+        messages.append((f"  ↓ Downloading: {url}", False))
+        messages.append((f"    → Saving to: {filename}", False))
+        checksum = download_file(url, cache_file)
+        messages.append((f"    ✓ Downloaded (sha256: {checksum[:16]}...)", False))
 
     provided_checksum = item.get("checksum")
     if provided_checksum:
         expected = normalize_checksum(provided_checksum)
         if checksum.lower() != expected:
-            print(f"    ⚠ Warning: Checksum mismatch for {filename}", file=sys.stderr)
-            print(f"      Expected: {expected[:16]}...", file=sys.stderr)
-            print(f"      Got:      {checksum[:16]}...", file=sys.stderr)
+            messages.append((f"    ⚠ Warning: Checksum mismatch for {filename}", True))
+            messages.append((f"      Expected: {expected[:16]}...", True))
+            messages.append((f"      Got:      {checksum[:16]}...", True))
 
     return {
         "download_url": url,
         "checksum": f"sha256:{checksum}",
         "filename": filename,
-    }
+    }, messages
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate artifacts lockfile.")
     parser.add_argument("--artifact-input", required=True, help="Path to input artifacts.in.yaml")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Parallel downloads (default: {DEFAULT_JOBS})")
     args = parser.parse_args()
 
     input_path = Path(args.artifact_input)
@@ -158,7 +233,7 @@ def main():
     items = load_artifact_input(input_path)
     print(f"Found {len(items)} artifact(s) to process\n")
 
-    artifacts = []
+    planned = []
     seen_filenames: set[str] = set()
     for item in items:
         if isinstance(item, str):
@@ -167,8 +242,18 @@ def main():
             print(f"Warning: Skipping invalid item (not a dict or string): {item}", file=sys.stderr)
             continue
 
-        result = process_artifact(item, seen_filenames)
-        if result:
+        plan = plan_artifact(item, seen_filenames)
+        if plan:
+            planned.append((item, *plan))
+
+    artifacts = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(process_artifact, *plan) for plan in planned]
+        # report in input order; the lock file keeps that order too
+        for future in futures:
+            result, messages = future.result()
+            for message, to_stderr in messages:
+                print(message, file=sys.stderr if to_stderr else sys.stdout)
             artifacts.append(result)
 
     if not artifacts:
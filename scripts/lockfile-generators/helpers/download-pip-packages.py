@@ -10,37 +10,58 @@ packages with --no-index --find-links /cachi2/output/deps/pip.
 Supports two index backends:
   • PyPI (default) — uses the JSON API (https://pypi.org/pypi/{name}/{ver}/json)
     to resolve download URLs for each hash.
-  • PEP 503 simple indexes — auto-detected when the requirements file contains
-    an --index-url that is not pypi.org (e.g. the RHOAI index).  Parses the
-    simple HTML page to match hashes to download URLs.
+  • Simple indexes — auto-detected when the requirements file contains
+    an --index-url that is not pypi.org (e.g. the RHOAI index).  Asks for the
+    PEP 691 JSON page and matches hashes to download URLs; a PEP 503 HTML page
+    is parsed as a fallback.  Each project page is fetched once and reused for
+    every version of that project in the file.
 
 Steps:
   1. Parse the requirements file for (name, version, sha256 hashes).
   2. Detect --index-url (if present) to choose PyPI JSON vs. simple index.
   3. For each package, resolve download URLs that match the requested hashes.
-  4. Skip files that already exist locally; download missing ones with wget.
+     Lookups run concurrently (-j workers).
+  4. Skip files that already exist locally; download missing ones concurrently
+     (-j workers sharing a pool of keep-alive connections).  Downloads go to
+     <file>.part first and an interrupted .part is resumed with an HTTP Range
+     request on the next run.
   5. Verify every file's sha256 checksum (whether freshly downloaded or cached).
+     Downloads are hashed while they stream, so they are never read back.
 
 Usage:
   python3 scripts/lockfile-generators/download-pip-packages.py \\
-      [-o OUTPUT_DIR] <requirements.txt>
+      [-o OUTPUT_DIR] [-j JOBS] <requirements.txt>
 
 Can be invoked standalone or by create-requirements-lockfile.sh (which has
 its own inline download step for pylock.toml-based workflows).
 """
 import argparse
+import contextlib
 import hashlib
+import http.client
 import json
 import re
-import subprocess
 import sys
+import threading
+import time
+import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
+from urllib.parse import urljoin, urlsplit, urlunsplit
 
 import packaging.utils
 
 OUT_DIR = Path("cachi2/output/deps/pip")
 PYPI_JSON = "https://pypi.org/pypi/{name}/{version}/json"
+PEP691_JSON = "application/vnd.pypi.simple.v1+json"
+METADATA_TIMEOUT = 30
+DEFAULT_JOBS = 8
+CHUNK_SIZE = 1 << 20
+HTTP_TIMEOUT = 60
+MAX_REDIRECTS = 5
+DOWNLOAD_ATTEMPTS = 3
 
 
 def get_and_validate_args():
@@ -49,6 +70,10 @@ def get_and_validate_args():
     parser.add_argument(
         "-o", "--output-dir", type=Path, default=OUT_DIR, help=f"Output directory (default: {OUT_DIR})",
     )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_JOBS,
+        help=f"Concurrent downloads, also the connection limit per host (default: {DEFAULT_JOBS})",
+    )
     args = parser.parse_args()
     req_path = args.requirements.resolve()
     out_dir = args.output_dir.resolve()
@@ -56,7 +81,7 @@ def get_and_validate_args():
         print(f"Error: not a file: {req_path}", file=sys.stderr)
         sys.exit(1)
     out_dir.mkdir(parents=True, exist_ok=True)
-    return req_path, out_dir
+    return req_path, out_dir, max(1, args.jobs)
 
 
 def detect_index_url(req_path: Path):
@@ -106,7 +131,7 @@ def fetch_pypi_urls(name: str, version: str, wanted_hashes: set):
     """Return list of (url, filename, sha256) for urls whose sha256 is in wanted_hashes."""
     url = PYPI_JSON.format(name=name, version=version)
     try:
-        with urllib.request.urlopen(url, timeout=30) as r:
+        with urllib.request.urlopen(url, timeout=METADATA_TIMEOUT) as r:
             data = json.load(r)
     except Exception as e:
         print(f"Error fetching {url}: {e}", file=sys.stderr)
@@ -128,28 +153,99 @@ def fetch_pypi_urls(name: str, version: str, wanted_hashes: set):
     return out
 
 
-def fetch_simple_index_urls(index_url: str, name: str, version: str, wanted_hashes: set):
-    """Return list of (url, filename, sha256) from a PEP 503 simple index page.
+def project_page_url(index_url: str, name: str) -> str:
+    """URL of a project's simple-index page; a query string on the index URL is kept.
 
-    Used for RHOAI and other custom indexes that don't provide a JSON API.
+    >>> project_page_url("https://example.com/simple/?format=json", "Foo_Bar")
+    'https://example.com/simple/foo-bar/?format=json'
     """
     # Normalize name for URL: PEP 503 uses lowercase with hyphens
     normalized = packaging.utils.canonicalize_name(name)
-    page_url = f"{index_url.rstrip('/')}/{normalized}/"
-    try:
-        req = urllib.request.Request(page_url, headers={"Accept": "text/html"})
-        with urllib.request.urlopen(req, timeout=30) as r:
-            html = r.read().decode()
-    except Exception as e:
-        print(f"Error fetching {page_url}: {e}", file=sys.stderr)
+    parts = urlsplit(index_url)
+    return urlunsplit(parts._replace(path=f"{parts.path.rstrip('/')}/{normalized}/"))
+
+
+def parse_simple_page(body: bytes, content_type: str, page_url: str):
+    """Return [(url, filename, sha256)] from a PEP 691 JSON or PEP 503 HTML page."""
+    text = body.decode()
+    if "json" in content_type or text.lstrip().startswith("{"):
+        out = []
+        for entry in json.loads(text).get("files", []):
+            sha = (entry.get("hashes") or {}).get("sha256")
+            if sha:
+                out.append((urljoin(page_url, entry["url"]), entry["filename"], sha))
+        return out
+    return [
+        (urljoin(page_url, m.group(1)), m.group(3).strip(), m.group(2))
+        for m in re.finditer(r'<a\s+href="([^"]*?)#sha256=([a-f0-9]+)"[^>]*>([^<]+)</a>', text)
+    ]
+
+
+class SimpleIndexPages:
+    """Per-project page cache: one request per project, however many versions ask for it.
+
+    Concurrent lookups of the same project wait for the first one instead of fetching again.
+    """
+
+    def __init__(self, index_url: str):
+        self.index_url = index_url
+        self._lock = threading.Lock()
+        self._pages: dict[str, list] = {}
+        self._gates: dict[str, threading.Lock] = {}
+
+    def _fetch(self, page_url: str) -> list:
+        # Ask for JSON only: Pulp ignores q-values and answers with HTML whenever
+        # text/html is acceptable (AIPCC-12921).  Servers without PEP 691 fall back to HTML.
+        for accept in (PEP691_JSON, "text/html"):
+            req = urllib.request.Request(page_url, headers={"Accept": accept})
+            try:
+                with urllib.request.urlopen(req, timeout=METADATA_TIMEOUT) as r:
+                    return parse_simple_page(r.read(), r.headers.get("Content-Type", ""), page_url)
+            except urllib.error.HTTPError as e:
+                if e.code != 406:
+                    raise
         return []
 
-    out = []
-    for m in re.finditer(r'<a\s+href="([^"]*?)#sha256=([a-f0-9]+)"[^>]*>([^<]+)</a>', html):
-        download_url, sha, filename = m.group(1), m.group(2), m.group(3).strip()
-        if sha in wanted_hashes:
-            out.append((download_url, filename, sha))
-    return out
+    def files(self, name: str):
+        """All (url, filename, sha256) of a project, or [] if the page cannot be fetched."""
+        page_url = project_page_url(self.index_url, name)
+        with self._lock:
+            gate = self._gates.setdefault(page_url, threading.Lock())
+        with gate:
+            if page_url not in self._pages:
+                try:
+                    self._pages[page_url] = self._fetch(page_url)
+                except Exception as e:
+                    print(f"Error fetching {page_url}: {e}", file=sys.stderr)
+                    self._pages[page_url] = []
+            return self._pages[page_url]
+
+
+def fetch_simple_index_urls(pages: SimpleIndexPages, name: str, version: str, wanted_hashes: set):
+    """Return list of (url, filename, sha256) from a simple index page.
+
+    Used for RHOAI and other custom indexes that don't provide the PyPI JSON API.
+    """
+    return [(url, filename, sha) for url, filename, sha in pages.files(name) if sha in wanted_hashes]
+
+
+def resolve_all(blocks, index_url, use_simple_index: bool, workers: int):
+    """Resolve download URLs of all requirement blocks concurrently, keeping file order.
+
+    Returns [(name, version, [(url, filename, sha256), ...])].
+    """
+    pages = SimpleIndexPages(index_url) if use_simple_index else None
+
+    def _resolve(block):
+        name, version, hashes = block_to_name_version_hashes(block)
+        if not name or not version or not hashes:
+            return None
+        if pages is not None:
+            return name, version, fetch_simple_index_urls(pages, name, version, set(hashes))
+        return name, version, fetch_pypi_urls(name, version, set(hashes))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [r for r in executor.map(_resolve, blocks) if r is not None]
 
 
 def file_sha256(path: Path) -> str:
@@ -160,49 +256,210 @@ def file_sha256(path: Path) -> str:
     return h.hexdigest()
 
 
-def wget(url: str, path: Path):
-    subprocess.run(["wget", "-q", "-O", str(path), url], check=True)
+class DownloadError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, at most ``size`` open per host, shared by worker threads."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._slots: dict[tuple[str, str], threading.BoundedSemaphore] = {}
+
+    @contextlib.contextmanager
+    def connection(self, scheme: str, netloc: str):
+        key = (scheme, netloc)
+        with self._lock:
+            slot = self._slots.setdefault(key, threading.BoundedSemaphore(self._size))
+        with slot:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                conn = idle.pop() if idle else None
+            if conn is None:
+                cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+                conn = cls(netloc, timeout=HTTP_TIMEOUT)
+            try:
+                yield conn
+            except BaseException:
+                conn.close()
+                raise
+            with self._lock:
+                self._idle[key].append(conn)
+
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+
+def stream_to_file(pool: ConnectionPool, url: str, part: Path, hasher) -> tuple[int, bool]:
+    """Download ``url`` into ``part``, feeding every byte to ``hasher``.
+
+    An existing ``part`` is resumed with a Range request; its bytes are hashed first.
+    If the server ignores the Range header, the download restarts from scratch.
+    Returns (bytes transferred, resumed).
+    """
+    offset = part.stat().st_size if part.exists() else 0
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = {"User-Agent": "download-pip-packages", "Accept-Encoding": "identity"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        with pool.connection(parts.scheme, parts.netloc) as conn:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+            if resp.status in (301, 302, 303, 307, 308):
+                resp.read()
+                url = urljoin(url, resp.getheader("Location", ""))
+                continue
+            if resp.status == 416 and offset:
+                # Range not satisfiable: the .part file already holds the whole file.
+                resp.read()
+                with open(part, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+                return 0, True
+            if resp.status not in (200, 206):
+                resp.read()
+                raise DownloadError(f"HTTP {resp.status} {resp.reason} for {url}")
+            resumed = resp.status == 206
+            if resumed:
+                with open(part, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+            transferred = 0
+            with open(part, "ab" if resumed else "wb") as f:
+                for chunk in iter(lambda: resp.read(CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    transferred += len(chunk)
+            return transferred, resumed
+    raise DownloadError(f"Too many redirects for {url}")
+
+
+@dataclass
+class FetchJob:
+    path: Path
+    expected_hash: str
+    url: str
+    name: str
+    version: str
+    filename: str
+
+
+@dataclass
+class FetchResult:
+    job: FetchJob
+    status: str  # "cached", "downloaded", "resumed" or "failed"
+    transferred: int = 0
+    actual_hash: str = ""
+    error: str = ""
+
+
+def fetch_one(pool: ConnectionPool, job: FetchJob) -> FetchResult:
+    """Make sure ``job.path`` exists and matches ``job.expected_hash``."""
+    if job.path.exists():
+        actual = file_sha256(job.path)
+        status = "cached"
+        transferred = 0
+    else:
+        part = job.path.with_name(job.path.name + ".part")
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            # every attempt resumes from whatever the previous one left in the .part file
+            hasher = hashlib.sha256()
+            try:
+                transferred, resumed = stream_to_file(pool, job.url, part, hasher)
+                break
+            except DownloadError as e:
+                return FetchResult(job, "failed", error=str(e))
+            except (OSError, http.client.HTTPException) as e:
+                # dropped keep-alive connections and network hiccups are worth another try
+                if attempt == DOWNLOAD_ATTEMPTS:
+                    return FetchResult(job, "failed", error=str(e))
+        actual = hasher.hexdigest()
+        if actual != job.expected_hash:
+            # do not keep (or resume from) a corrupt download
+            part.unlink(missing_ok=True)
+        else:
+            part.replace(job.path)
+        status = "resumed" if resumed else "downloaded"
+    if actual != job.expected_hash:
+        return FetchResult(job, "failed", transferred, actual,
+                           f"checksum mismatch (got {actual}, expected {job.expected_hash})")
+    return FetchResult(job, status, transferred, actual)
+
+
+def fetch_all(jobs: list[FetchJob], workers: int) -> list[FetchResult]:
+    """Fetch and verify all files concurrently, printing one line per finished file."""
+    pool = ConnectionPool(workers)
+    results = []
+    started = time.monotonic()
+    total = len(jobs)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(fetch_one, pool, job) for job in jobs]
+            for idx, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                job = result.job
+                print(f"[{idx}/{total}] {job.name}=={job.version}  {job.filename}")
+                if result.status == "failed":
+                    print(f"  Error: {job.filename}: {result.error}", file=sys.stderr)
+                    continue
+                if result.status == "cached":
+                    print("  Already exists, skipping download.")
+                else:
+                    print(f"  {result.status.capitalize()}: {result.transferred / 1e6:.1f} MB from {job.url}")
+                print(f"  Checksum OK (sha256:{result.actual_hash[:16]}...)")
+    finally:
+        pool.close()
+
+    elapsed = time.monotonic() - started
+    transferred = sum(r.transferred for r in results)
+    counts = {status: sum(r.status == status for r in results)
+              for status in ("downloaded", "resumed", "cached", "failed")}
+    rate = transferred / elapsed / 1e6 if elapsed else 0.0
+    print(
+        f"Summary: {counts['downloaded']} downloaded, {counts['resumed']} resumed, "
+        f"{counts['cached']} already present, {counts['failed']} failed; "
+        f"{transferred / 1e6:.1f} MB in {elapsed:.1f}s ({rate:.1f} MB/s, {workers} workers)"
+    )
+    return results
 
 
 def main():
-    req_path, out_dir = get_and_validate_args()
+    req_path, out_dir, jobs = get_and_validate_args()
 
     # Detect --index-url in requirements file (e.g. RHOAI)
     index_url = detect_index_url(req_path)
     use_simple_index = index_url is not None and "pypi.org" not in index_url
     if use_simple_index:
         print(f"Detected custom index: {index_url}")
-        print(f"Using PEP 503 simple index for downloads.\n")
+        print(f"Using simple index (PEP 691 JSON, PEP 503 HTML fallback) for downloads.\n")
 
-    # Build list of (path, expected_sha256, url, name, version, filename) per file to have
+    # Build one FetchJob per file to have
+    started = time.monotonic()
+    blocks = list(get_packages_and_checksums(req_path))
     to_fetch = []
-    for block in get_packages_and_checksums(req_path):
-        name, version, hashes = block_to_name_version_hashes(block)
-        if not name or not version or not hashes:
-            continue
-
-        if use_simple_index:
-            results = fetch_simple_index_urls(index_url, name, version, set(hashes))
-        else:
-            results = fetch_pypi_urls(name, version, set(hashes))
-
+    for name, version, results in resolve_all(blocks, index_url, use_simple_index, jobs):
         for url, filename, expected_hash in results:
-            to_fetch.append((out_dir / filename, expected_hash, url, name, version, filename))
-
-    total = len(to_fetch)
-    for idx, (path, expected_hash, url, name, version, filename) in enumerate(to_fetch, 1):
-        print(f"[{idx}/{total}] {name}=={version}  {filename}")
-        if not path.exists():
-            print(f"  Downloading: {url}")
-            wget(url, path)
-        else:
-            print(f"  Already exists, skipping download.")
-        actual = file_sha256(path)
-        if actual != expected_hash:
-            print(f"Error: {path.name} checksum mismatch (got {actual}, expected {expected_hash})", file=sys.stderr)
-            sys.exit(1)
-        print(f"  Checksum OK (sha256:{actual[:16]}...)")
-    print(f"Done: {total} file(s) present and validated.")
+            to_fetch.append(FetchJob(out_dir / filename, expected_hash, url, name, version, filename))
+    print(f"Resolved {len(to_fetch)} file(s) for {len(blocks)} requirement(s) in {time.monotonic() - started:.1f}s.\n")
+
+    results = fetch_all(to_fetch, jobs)
+    failed = [r for r in results if r.status == "failed"]
+    if failed:
+        print(f"Error: {len(failed)} of {len(results)} file(s) failed:", file=sys.stderr)
+        for r in failed:
+            print(f"  {r.job.filename}: {r.error}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Done: {len(results)} file(s) present and validated.")
 
 
 if __name__ == "__main__":
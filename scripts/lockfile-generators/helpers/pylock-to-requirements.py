@@ -13,6 +13,12 @@ Why not just use pylock.toml directly?
 
 Usage:
     python3 pylock-to-requirements.py <pylock.toml> <requirements.txt> [index-url]
+    python3 pylock-to-requirements.py --batch <manifest | ->
+
+    --batch converts many lock files in one process.  The manifest (or stdin, for "-")
+    holds one job per line: <pylock.toml> TAB <requirements.txt> [TAB <index-url>].
+
+    pylocks_generator.py loads this file and calls ``convert()`` directly instead.
 
 Arguments:
     pylock.toml       Input lock file (PEP 751 format, generated by uv pip compile)
@@ -47,33 +53,21 @@ from pathlib import Path
 _DEFAULT_INDEX_RE = re.compile(r"--default-index=(https?://\S+)")
 
 
+def _default_index_from_text(text: str) -> str:
+    m = _DEFAULT_INDEX_RE.search(text[:8192])
+    return m.group(1).rstrip("'\"") if m else ""
+
+
 def extract_default_index_from_pylock(pylock_path: Path) -> str:
     """Return --default-index URL from the uv autogeneration comment, or ""."""
     try:
-        head = pylock_path.read_text(encoding="utf-8", errors="replace")[:8192]
+        return _default_index_from_text(pylock_path.read_text(encoding="utf-8", errors="replace"))
     except OSError:
         return ""
-    m = _DEFAULT_INDEX_RE.search(head)
-    return m.group(1).rstrip("'\"") if m else ""
-
-
-def main():
-    if len(sys.argv) < 3:
-        print(f"Usage: {sys.argv[0]} <pylock.toml> <requirements.txt> [index-url]",
-              file=sys.stderr)
-        sys.exit(1)
-
-    pylock_path = Path(sys.argv[1])
-    output_path = Path(sys.argv[2])
-    if len(sys.argv) > 3 and sys.argv[3].strip():
-        index_url = sys.argv[3].strip()
-    else:
-        index_url = extract_default_index_from_pylock(pylock_path)
 
-    # Parse the pylock.toml (PEP 751 format, requires Python 3.11+ for tomllib)
-    with open(pylock_path, "rb") as f:
-        data = tomllib.load(f)
 
+def render_requirements(data: dict, index_url: str) -> tuple[str, int]:
+    """Render parsed pylock data as requirements.txt text. Returns (text, package count)."""
     lines = []
 
     # Emit --index-url as the first line so pip/uv know where to find packages
@@ -119,11 +113,70 @@ def main():
 
         lines.append(entry)
 
+    pkg_count = len(lines) - (1 if index_url else 0)
+    return "\n".join(lines) + "\n", pkg_count
+
+
+def convert(pylock_path: Path, output_path: Path, index_url: str = "") -> int:
+    """Convert one pylock.toml into a requirements.txt. Returns the number of packages.
+
+    The lock file is read and parsed once; ``index_url`` defaults to the
+    ``--default-index`` recorded in its uv header comment.
+    """
+    text = Path(pylock_path).read_text(encoding="utf-8")
+    if not index_url:
+        index_url = _default_index_from_text(text)
+
+    # Parse the pylock.toml (PEP 751 format, requires Python 3.11+ for tomllib)
+    data = tomllib.loads(text)
+    requirements, pkg_count = render_requirements(data, index_url)
+
     # Write the output file
+    output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(lines) + "\n")
+    output_path.write_text(requirements)
+    return pkg_count
 
-    pkg_count = len(lines) - (1 if index_url else 0)
+
+def convert_batch(lines) -> int:
+    """Convert every ``pylock<TAB>requirements[<TAB>index-url]`` line. Returns the failure count."""
+    failures = 0
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        pylock, output, *rest = line.rstrip("\n").split("\t")
+        index_url = rest[0].strip() if rest else ""
+        try:
+            pkg_count = convert(Path(pylock), Path(output), index_url)
+        except (OSError, KeyError, tomllib.TOMLDecodeError) as exc:
+            print(f"  Failed to convert {pylock}: {exc}", file=sys.stderr)
+            failures += 1
+            continue
+        print(f"  Generated {output} ({pkg_count} packages)")
+    return failures
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--batch":
+        # Many lock files in one process; the manifest has one tab-separated job per line.
+        if sys.argv[2] == "-":
+            failures = convert_batch(sys.stdin)
+        else:
+            with open(sys.argv[2], encoding="utf-8") as f:
+                failures = convert_batch(f)
+        sys.exit(1 if failures else 0)
+
+    if len(sys.argv) < 3:
+        print(f"Usage: {sys.argv[0]} <pylock.toml> <requirements.txt> [index-url]",
+              file=sys.stderr)
+        print(f"       {sys.argv[0]} --batch <manifest | ->", file=sys.stderr)
+        sys.exit(1)
+
+    pylock_path = Path(sys.argv[1])
+    output_path = Path(sys.argv[2])
+    index_url = sys.argv[3].strip() if len(sys.argv) > 3 else ""
+
+    pkg_count = convert(pylock_path, output_path, index_url)
     print(f"  Generated {output_path} ({pkg_count} packages)")
 
 
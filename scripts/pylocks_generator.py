@@ -11,6 +11,8 @@ Features:
   - Validates Python version extracted from directory name (expects format .../ubi9-python-X.Y).
   - Generates per-flavor locks in 'uv.lock.d/' for rh-index mode.
   - Overwrites existing pylock.toml in-place for public PyPI index mode.
+  - Runs each (directory, flavor) pair as its own job, longest expected job first, using
+    durations recorded in .cache/pylocks_generator/timings.json by earlier runs.
 
 Index Modes:
   auto (default) -- Uses rh-index if uv.lock.d/ exists, public-index otherwise.
@@ -39,6 +41,25 @@ Usage:
        python pylocks_generator.py --requirements-only
        python pylocks_generator.py rh-index jupyter/minimal/ubi9-python-3.12 --requirements-only
 
+  6. Re-lock everything even if the recorded input fingerprints still match::
+
+       python pylocks_generator.py --no-cache
+
+  7. Share index round-trips between the parallel lock jobs through a local caching proxy::
+
+       python pylocks_generator.py --index-proxy
+
+Incremental regeneration:
+  After a successful lock, a sha256 fingerprint of everything that feeds ``uv pip compile``
+  (pyproject.toml, the local meta-package pyprojects it pulls in through ``[tool.uv.sources]``,
+  ``dependencies/cve-constraints.txt``, the index URLs, the Python and pinned uv versions and
+  the ``--exclude-newer`` cutoff from the lockfile header) is recorded in
+  ``.cache/pylocks_generator/fingerprints/``, together with a hash of the lockfile written.
+  On the next run, a flavor whose fingerprint still matches and whose lockfile was not changed
+  since is skipped entirely, since ``uv pip compile`` without ``--upgrade`` would keep the
+  existing pins anyway.  ``FORCE_LOCKFILES_UPGRADE=1``, ``--no-cache`` and
+  ``PYLOCKS_CI_CHECK=1`` always re-lock.
+
 Reproducible CI checks (PYLOCKS_CI_CHECK):
   When ``PYLOCKS_CI_CHECK=1`` (set only by ``check-generated-code`` in CI),
   ``uv pip compile`` always passes ``--exclude-newer`` parsed from the existing
@@ -60,24 +81,40 @@ Notes:
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import json
 import os
 import re
 import subprocess
 import sys
+import threading
+import time
+import tomllib
 from datetime import datetime, timezone
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from enum import StrEnum
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import typer
 
+from scripts.index_proxy import DEFAULT_TTL as INDEX_PROXY_DEFAULT_TTL
+from scripts.index_proxy import IndexProxy
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import ModuleType
+
 # region Configuration
 ROOT_DIR = Path(__file__).resolve().parent.parent
 UV = ROOT_DIR / "uv"
 CVE_CONSTRAINTS_FILE = ROOT_DIR / "dependencies" / "cve-constraints.txt"
+CACHE_DIR = ROOT_DIR / ".cache" / "pylocks_generator"
 PYLOCK_TO_REQUIREMENTS = ROOT_DIR / "scripts" / "lockfile-generators" / "helpers" / "pylock-to-requirements.py"
 PUBLIC_INDEX = "--default-index=https://pypi.org/simple"
 MAIN_DIRS = ("jupyter", "runtimes", "rstudio", "codeserver")
@@ -95,6 +132,11 @@ NO_EMIT_PACKAGES = (
 
 FLAVORS = ("cpu", "cuda", "rocm")
 
+# Bump when the shape of the ``uv pip compile`` command changes in a way that should
+# invalidate every recorded fingerprint (new flags, different NO_EMIT_PACKAGES handling, ...).
+FINGERPRINT_VERSION = 2
+FINGERPRINTS_DIR = CACHE_DIR / "fingerprints"
+
 # Optimal concurrency is 5-6 based on benchmarks (macOS 12-core, RH PyPI index with
 # no HTTP cache headers).  Each uv process internally uses UV_CONCURRENT_DOWNLOADS
 # (default 50) connections and UV_CONCURRENT_BUILDS (default cpu_count) build workers.
@@ -108,11 +150,37 @@ FLAVORS = ("cpu", "cuda", "rocm")
 # scheduling jitter without reducing wall time.
 MAX_WORKERS = 6
 
+# Work is scheduled per (directory, flavor) job, longest expected job first, so that a
+# slow rocm lock starts early instead of becoming the tail of the run.  Durations of
+# jobs that actually ran ``uv pip compile`` are remembered here for the next run.
+TIMINGS_FILE = CACHE_DIR / "timings.json"
+# Guesses (seconds) for jobs without a recorded duration; the accelerator indexes carry
+# the largest wheels and resolutions.
+DEFAULT_FLAVOR_COST = {"cpu": 60.0, "cuda": 90.0, "rocm": 120.0}
+
+
+# MAX_WORKERS above is only the starting point: ConcurrencyController adjusts the number of
+# concurrently running ``uv pip compile`` jobs while the run progresses (additive increase
+# while jobs are fast and the CPU has headroom, multiplicative decrease when the index
+# throttles or jobs time out).  On large CI runners it may grow up to this ceiling.
+MAX_WORKERS_CEILING = 16
+REPORT_FILE = CACHE_DIR / "concurrency-report.json"
+
+# uv surfaces HTTP errors from the index in its stderr; these mean "slow down".
+_THROTTLED_RE = re.compile(r"\b(429|503)\b|Too Many Requests|Service Unavailable")
+
 
 class IndexMode(StrEnum):
     auto = "auto"
     rh_index = "rh-index"
     public_index = "public-index"
+
+
+class LockStatus(StrEnum):
+    ok = "ok"
+    failed = "failed"
+    throttled = "throttled"
+    timeout = "timeout"
 # endregion
 
 
@@ -301,6 +369,124 @@ def resolve_exclude_newer(
 # endregion
 
 
+# region Input fingerprints
+def local_source_pyprojects(pyproject: Path) -> list[Path]:
+    """Return pyproject.toml files of local ``path`` sources in ``[tool.uv.sources]``, transitively.
+
+    These are the ``dependencies/odh-notebooks-meta-*`` packages; editing one of them
+    changes the resolution of every image that depends on it.
+    """
+    seen: set[Path] = set()
+    pending = [pyproject.resolve()]
+    while pending:
+        current = pending.pop()
+        try:
+            data = tomllib.loads(current.read_text(encoding="utf-8"))
+        except (OSError, tomllib.TOMLDecodeError):
+            continue
+        sources = data.get("tool", {}).get("uv", {}).get("sources", {})
+        for source in sources.values():
+            if not isinstance(source, dict) or "path" not in source:
+                continue
+            candidate = (current.parent / source["path"]).resolve()
+            if candidate.is_dir():
+                candidate /= "pyproject.toml"
+            if candidate.is_file() and candidate not in seen:
+                seen.add(candidate)
+                pending.append(candidate)
+    return sorted(seen)
+
+
+def compute_input_fingerprint(
+    project_dir: Path,
+    index_flags: list[str],
+    python_version: str,
+    exclude_newer: str | None,
+) -> str:
+    """Hash every input that influences ``uv pip compile`` output for one lockfile."""
+    digest = hashlib.sha256()
+
+    def _add(label: str, payload: bytes) -> None:
+        digest.update(f"{label}\0{len(payload)}\0".encode())
+        digest.update(payload)
+
+    _add("version", str(FINGERPRINT_VERSION).encode())
+    _add("uv", pinned_uv_version().encode())
+    _add("python", python_version.encode())
+    _add("no-emit", "\n".join(NO_EMIT_PACKAGES).encode())
+    _add("index", "\n".join([*index_flags, *lock_extra_index_flags_from_env()]).encode())
+    _add("exclude-newer", (exclude_newer or "").encode())
+
+    pyproject = project_dir / "pyproject.toml"
+    _add("pyproject", pyproject.read_bytes())
+    for meta in local_source_pyprojects(pyproject):
+        _add(f"source:{os.path.relpath(meta, ROOT_DIR)}", meta.read_bytes())
+    if CVE_CONSTRAINTS_FILE.is_file():
+        _add("constraints", CVE_CONSTRAINTS_FILE.read_bytes())
+
+    return f"sha256:{digest.hexdigest()}"
+
+
+def lockfile_fingerprint(project_dir: Path, lockfile: Path, index_flags: list[str], python_version: str) -> str:
+    """Fingerprint of the inputs for ``lockfile``, using the cutoff recorded in its header."""
+    return compute_input_fingerprint(
+        project_dir, index_flags, python_version, parse_exclude_newer_from_lockfile(lockfile)
+    )
+
+
+@functools.cache
+def pinned_uv_version() -> str:
+    """The uv version the ``./uv`` wrapper runs, from ``[tool.uv] required-version`` in the root pyproject.toml."""
+    try:
+        data = tomllib.loads((ROOT_DIR / "pyproject.toml").read_text(encoding="utf-8"))
+    except (OSError, tomllib.TOMLDecodeError):
+        return ""
+    return str(data.get("tool", {}).get("uv", {}).get("required-version", ""))
+
+
+def fingerprint_record_path(lockfile: Path) -> Path:
+    """Sidecar file in the local cache holding the fingerprint for ``lockfile``.
+
+    Fingerprints are kept out of the committed lockfiles, so that recording them does not
+    change what ``check-generated-code`` compares.
+    """
+    key = hashlib.sha256(str(lockfile.resolve()).encode()).hexdigest()[:32]
+    return FINGERPRINTS_DIR / f"{key}.json"
+
+
+def read_recorded_fingerprint(lockfile: Path) -> str | None:
+    """Return the fingerprint recorded for ``lockfile``, unless the lockfile changed since."""
+    try:
+        record = json.loads(fingerprint_record_path(lockfile).read_text(encoding="utf-8"))
+        content = hashlib.sha256(lockfile.read_bytes()).hexdigest()
+    except (OSError, ValueError):
+        return None
+    if not isinstance(record, dict) or record.get("lockfile") != content:
+        return None
+    return record.get("inputs")
+
+
+def record_fingerprint(lockfile: Path, fingerprint: str) -> None:
+    """Record ``fingerprint`` as the inputs that produced the current content of ``lockfile``."""
+    path = fingerprint_record_path(lockfile)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = {
+        "lockfile": hashlib.sha256(lockfile.read_bytes()).hexdigest(),
+        "path": str(lockfile.resolve()),
+        "inputs": fingerprint,
+    }
+    path.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+
+
+def is_lock_up_to_date(project_dir: Path, lockfile: Path, index_flags: list[str], python_version: str) -> bool:
+    """True if ``lockfile`` records a fingerprint matching the current inputs."""
+    recorded = read_recorded_fingerprint(lockfile)
+    if recorded is None:
+        return False
+    return recorded == lockfile_fingerprint(project_dir, lockfile, index_flags, python_version)
+# endregion
+
+
 # region Lock generation
 def get_index_flags(project_dir: Path, flavor: str, log: LogBuffer) -> list[str] | None:
     """Build uv index flags from build-args/<flavor>.conf.
@@ -356,8 +542,13 @@ def run_lock(
     ci_check: bool,
     live_timestamp: str,
     log: LogBuffer,
-) -> bool:
-    """Run uv pip compile to generate a lock file. Returns True on success."""
+    proxy: IndexProxy | None = None,
+) -> LockStatus:
+    """Run uv pip compile to generate a lock file.
+
+    Returns ``LockStatus.ok`` on success; failures are further told apart into timeouts
+    and index throttling so that ConcurrencyController can react to them.
+    """
     if mode == IndexMode.public_index:
         output = "pylock.toml"
         desc = "pylock.toml (public index)"
@@ -412,10 +603,12 @@ def run_lock(
     )
     cmd.append(f"--exclude-newer={exclude_newer}")
 
-    cmd.extend(index_flags)
     extra_idx = lock_extra_index_flags_from_env()
+    if proxy is not None:
+        cmd.extend(proxy.proxy_index_flags([*index_flags, *extra_idx], exclude_newer))
+    else:
+        cmd.extend([*index_flags, *extra_idx])
     if extra_idx:
-        cmd.extend(extra_idx)
         log.print(
             "  📎 Extra lock indexes from UV_LOCK_EXTRA_INDEX_URL / PIP_LOCK_EXTRA_INDEX_URL"
         )
@@ -439,7 +632,7 @@ def run_lock(
     except subprocess.TimeoutExpired:
         log.warning(f"Timed out generating {desc} in {project_dir}")
         (project_dir / output).unlink(missing_ok=True)
-        return False
+        return LockStatus.timeout
 
     if result.stdout:
         log.print(result.stdout)
@@ -449,10 +642,25 @@ def run_lock(
     if result.returncode != 0:
         log.warning(f"Failed to generate {desc} in {project_dir}")
         (project_dir / output).unlink(missing_ok=True)
-        return False
-
+        if _THROTTLED_RE.search(result.stderr or ""):
+            return LockStatus.throttled
+        return LockStatus.failed
+
+    if proxy is not None:
+        # the lockfile must name the real index and wheel URLs, not the proxy
+        proxy.restore(lock_path)
+    record_fingerprint(lock_path, lockfile_fingerprint(project_dir, lock_path, index_flags, python_version))
     log.ok(f"{desc} generated successfully.")
-    return True
+    return LockStatus.ok
+
+
+@functools.cache
+def load_pylock_to_requirements() -> ModuleType:
+    """Import the pylock-to-requirements.py helper (its file name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location("pylock_to_requirements", PYLOCK_TO_REQUIREMENTS)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
 
 def generate_requirements_txt(
@@ -460,37 +668,51 @@ def generate_requirements_txt(
     flavor: str,
     log: LogBuffer,
 ) -> bool:
-    """Convert pylock.<flavor>.toml → requirements.<flavor>.txt via helper script."""
+    """Convert pylock.<flavor>.toml → requirements.<flavor>.txt in-process, via the helper's ``convert``."""
     pylock_path = project_dir / "uv.lock.d" / f"pylock.{flavor}.toml"
     requirements_path = project_dir / f"requirements.{flavor}.txt"
 
     index_url = read_conf_value(project_dir / "build-args" / f"{flavor}.conf", "INDEX_URL") or ""
 
-    cmd = [sys.executable, str(PYLOCK_TO_REQUIREMENTS), str(pylock_path), str(requirements_path)]
-    if index_url:
-        cmd.append(index_url)
-
-    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-    if result.stdout:
-        log.print(result.stdout.rstrip())
-    if result.stderr:
-        log.print(result.stderr.rstrip())
-    if result.returncode != 0:
+    try:
+        pkg_count = load_pylock_to_requirements().convert(pylock_path, requirements_path, index_url)
+    except (OSError, KeyError, tomllib.TOMLDecodeError) as exc:
+        log.print(f"  {exc}")
         log.warning(f"Failed to generate {requirements_path}")
         return False
+    log.print(f"  Generated {requirements_path} ({pkg_count} packages)")
     log.ok(f"requirements.{flavor}.txt generated.")
     return True
 
 
-def process_directory(
-    tdir: Path,
-    index_mode: IndexMode,
-    upgrade: bool,
-    ci_check: bool,
-    live_timestamp: str,
-    requirements_only: bool = False,
-) -> tuple[Path, bool, LogBuffer]:
-    """Process one directory. Returns (path, success, log)."""
+@dataclass
+class DirectoryPlan:
+    """What to lock in one project directory; ``log`` holds its grouped header output."""
+
+    path: Path
+    python_version: str
+    mode: IndexMode
+    flavors: list[str]
+    log: LogBuffer
+
+
+@dataclass
+class FlavorResult:
+    """Outcome of one (directory, flavor) job."""
+
+    success: bool
+    log: LogBuffer
+    elapsed: float = 0.0
+    # set only when ``uv pip compile`` actually ran
+    status: LockStatus | None = None
+
+    @property
+    def locked(self) -> bool:
+        return self.status is not None
+
+
+def plan_directory(tdir: Path, index_mode: IndexMode) -> tuple[DirectoryPlan | None, LogBuffer]:
+    """Validate one directory and decide which flavors to lock. Returns (plan or None, log)."""
     log = LogBuffer(buffered=True)
 
     log.print("")
@@ -502,12 +724,12 @@ def process_directory(
     if python_version is None:
         log.warning(f"Could not extract valid Python version from directory name: {tdir}")
         log.warning("Expected directory format: .../ubi9-python-X.Y")
-        return tdir, False, log
+        return None, log
 
     flavors = detect_flavors(tdir)
     if not flavors:
         log.warning(f"No Dockerfiles found in {tdir} (cpu/cuda/rocm). Skipping.")
-        return tdir, False, log
+        return None, log
 
     log.print(f"📦 Python version: {python_version}")
     log.print("🧩 Detected flavors:")
@@ -521,55 +743,235 @@ def process_directory(
         effective_mode = index_mode
     log.info(f"Effective mode for this directory: {effective_mode.value}")
 
-    dir_success = True
-
-    if effective_mode == IndexMode.public_index:
-        if not requirements_only:
-            if not run_lock(
-                tdir,
-                "cpu",
-                [PUBLIC_INDEX],
-                effective_mode,
-                python_version,
-                upgrade,
-                ci_check,
-                live_timestamp,
-                log,
-            ):
-                dir_success = False
-    else:
-        for flavor in ("cpu", "cuda", "rocm"):
-            if flavor not in flavors:
-                continue
-            if requirements_only:
-                pylock_path = tdir / "uv.lock.d" / f"pylock.{flavor}.toml"
-                if not pylock_path.is_file():
-                    log.warning(f"No {pylock_path} found, skipping {flavor}.")
-                    dir_success = False
-                    continue
-                if not generate_requirements_txt(tdir, flavor, log):
-                    dir_success = False
-                continue
-            flags = get_index_flags(tdir, flavor, log)
-            if flags is None:
-                dir_success = False
-                continue
-            if not run_lock(
-                tdir,
-                flavor,
-                flags,
-                effective_mode,
-                python_version,
-                upgrade,
-                ci_check,
-                live_timestamp,
-                log,
-            ):
-                dir_success = False
-            elif not generate_requirements_txt(tdir, flavor, log):
-                dir_success = False
-
-    return tdir, dir_success, log
+    # public-index mode produces a single pylock.toml, locked once under the "cpu" name
+    planned = ["cpu"] if effective_mode == IndexMode.public_index else [f for f in FLAVORS if f in flavors]
+    return DirectoryPlan(tdir, python_version, effective_mode, planned, log), log
+
+
+def process_flavor(
+    plan: DirectoryPlan,
+    flavor: str,
+    upgrade: bool,
+    ci_check: bool,
+    live_timestamp: str,
+    requirements_only: bool = False,
+    use_cache: bool = True,
+    proxy: IndexProxy | None = None,
+) -> FlavorResult:
+    """Lock one flavor of one directory and convert it to requirements.txt.
+
+    With ``use_cache``, a flavor whose recorded input fingerprint still matches is skipped.
+    """
+    log = LogBuffer(buffered=True)
+    tdir = plan.path
+    started = time.monotonic()
+
+    if plan.mode == IndexMode.public_index:
+        if requirements_only:
+            return FlavorResult(True, log)
+        if use_cache and is_lock_up_to_date(tdir, tdir / "pylock.toml", [PUBLIC_INDEX], plan.python_version):
+            log.ok("pylock.toml (public index) is up to date, inputs unchanged. Skipping.")
+            return FlavorResult(True, log)
+        status = run_lock(
+            tdir,
+            flavor,
+            [PUBLIC_INDEX],
+            plan.mode,
+            plan.python_version,
+            upgrade,
+            ci_check,
+            live_timestamp,
+            log,
+            proxy,
+        )
+        return FlavorResult(status == LockStatus.ok, log, time.monotonic() - started, status)
+
+    if requirements_only:
+        pylock_path = tdir / "uv.lock.d" / f"pylock.{flavor}.toml"
+        if not pylock_path.is_file():
+            log.warning(f"No {pylock_path} found, skipping {flavor}.")
+            return FlavorResult(False, log)
+        return FlavorResult(generate_requirements_txt(tdir, flavor, log), log)
+
+    flags = get_index_flags(tdir, flavor, log)
+    if flags is None:
+        return FlavorResult(False, log)
+    pylock_path = tdir / "uv.lock.d" / f"pylock.{flavor}.toml"
+    if (
+        use_cache
+        and (tdir / f"requirements.{flavor}.txt").is_file()
+        and is_lock_up_to_date(tdir, pylock_path, flags, plan.python_version)
+    ):
+        log.ok(f"{flavor.upper()} lock file is up to date, inputs unchanged. Skipping.")
+        return FlavorResult(True, log)
+    status = run_lock(
+        tdir,
+        flavor,
+        flags,
+        plan.mode,
+        plan.python_version,
+        upgrade,
+        ci_check,
+        live_timestamp,
+        log,
+        proxy,
+    )
+    elapsed = time.monotonic() - started
+    ok = status == LockStatus.ok and generate_requirements_txt(tdir, flavor, log)
+    return FlavorResult(ok, log, elapsed, status)
+# endregion
+
+
+# region Scheduling
+def job_key(tdir: Path, flavor: str) -> str:
+    """Stable key for one (directory, flavor) job, e.g. ``jupyter/minimal/ubi9-python-3.12:cpu``."""
+    try:
+        rel = tdir.resolve().relative_to(ROOT_DIR)
+    except ValueError:
+        rel = tdir
+    return f"{rel.as_posix()}:{flavor}"
+
+
+def load_job_timings(path: Path = TIMINGS_FILE) -> dict[str, float]:
+    """Load recorded job durations; a missing or unreadable file means no history."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {k: float(v) for k, v in data.items() if isinstance(v, int | float)}
+
+
+def save_job_timings(timings: dict[str, float], path: Path = TIMINGS_FILE) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dict(sorted(timings.items())), indent=2) + "\n", encoding="utf-8")
+
+
+def estimate_job_cost(tdir: Path, flavor: str, timings: dict[str, float]) -> float:
+    """Recorded duration of a job, else the mean for its flavor, else ``DEFAULT_FLAVOR_COST``."""
+    if (known := timings.get(job_key(tdir, flavor))) is not None:
+        return known
+    same_flavor = [v for k, v in timings.items() if k.endswith(f":{flavor}")]
+    if same_flavor:
+        return sum(same_flavor) / len(same_flavor)
+    return DEFAULT_FLAVOR_COST.get(flavor, max(DEFAULT_FLAVOR_COST.values()))
+
+
+def order_jobs(jobs: list[tuple[Path, str]], timings: dict[str, float]) -> list[tuple[Path, str]]:
+    """Longest-job-first ordering; ties keep the input order."""
+    return sorted(jobs, key=lambda job: -estimate_job_cost(*job, timings))
+
+
+def cpu_saturated() -> bool:
+    """True when the 1-minute load average exceeds the number of CPUs."""
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        return False
+    return load > (os.cpu_count() or 1)
+
+
+def default_max_workers() -> int:
+    """Upper bound for the controller: half the CPUs (uv spawns its own build workers), capped."""
+    return max(MAX_WORKERS, min((os.cpu_count() or 1) // 2, MAX_WORKERS_CEILING))
+
+
+class ConcurrencyController:
+    """AIMD limit on the number of lock jobs running at the same time.
+
+    Pool threads call ``acquire`` before starting a job and ``release`` with its outcome
+    afterwards.  Waiters are admitted in arrival order, so the longest-job-first ordering
+    of the submitted jobs is preserved.
+
+    * timeout or throttled index -> halve the limit
+    * failed job, saturated CPU, or a job much slower than its recorded duration -> limit - 1
+    * job at most slightly slower than its recorded duration with CPU headroom -> limit + 1
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        is_cpu_saturated: Callable[[], bool] = cpu_saturated,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = min(max(initial, minimum), self.maximum)
+        self.peak = self.limit
+        self.adjustments: list[dict[str, object]] = []
+        self._is_cpu_saturated = is_cpu_saturated
+        self._cond = threading.Condition()
+        self._running = 0
+        self._next_ticket = 0
+        self._serving = 0
+        self._started = time.monotonic()
+
+    def acquire(self) -> int:
+        """Block until a slot is free; returns the limit in effect when the job starts."""
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._cond.wait_for(lambda: self._serving == ticket and self._running < self.limit)
+            self._serving += 1
+            self._running += 1
+            self._cond.notify_all()
+            return self.limit
+
+    def release(self, status: LockStatus | None, elapsed: float, expected: float | None) -> None:
+        """Free a slot and adapt the limit to the outcome of the finished job.
+
+        ``status`` is None for jobs that did not run ``uv pip compile`` (cache hits);
+        ``expected`` is the recorded duration of the job, if any.
+        """
+        with self._cond:
+            self._running -= 1
+            if status in (LockStatus.timeout, LockStatus.throttled):
+                self._set_limit(self.limit // 2, f"{status.value} after {elapsed:.0f}s")
+            elif status == LockStatus.failed:
+                self._set_limit(self.limit - 1, "job failed")
+            elif status == LockStatus.ok:
+                if self._is_cpu_saturated():
+                    self._set_limit(self.limit - 1, "CPU saturated")
+                elif expected and elapsed > 2 * expected:
+                    self._set_limit(self.limit - 1, f"job took {elapsed:.0f}s, expected {expected:.0f}s")
+                elif not expected or elapsed <= 1.2 * expected:
+                    self._set_limit(self.limit + 1, "job on time, CPU headroom")
+            self._cond.notify_all()
+
+    def _set_limit(self, value: int, reason: str) -> None:
+        value = min(max(value, self.minimum), self.maximum)
+        if value == self.limit:
+            return
+        self.limit = value
+        self.peak = max(self.peak, value)
+        self.adjustments.append(
+            {"at": round(time.monotonic() - self._started, 1), "limit": value, "reason": reason}
+        )
+
+
+def write_concurrency_report(
+    path: Path,
+    controller: ConcurrencyController,
+    initial: int,
+    jobs: list[dict[str, object]],
+    wall_time: float,
+) -> None:
+    """Write the chosen concurrency and per-job timings as JSON, for tracking across runs."""
+    report = {
+        "generated": utc_now_iso(),
+        "cpu_count": os.cpu_count(),
+        "wall_time": round(wall_time, 1),
+        "initial_workers": initial,
+        "max_workers": controller.maximum,
+        "final_workers": controller.limit,
+        "peak_workers": controller.peak,
+        "adjustments": controller.adjustments,
+        "jobs": jobs,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
 # endregion
 
 
@@ -587,6 +989,18 @@ def main(
     requirements_only: Annotated[
         bool, typer.Option("--requirements-only", help="Only regenerate requirements.txt from existing pylock files, skip lock generation")
     ] = False,
+    no_cache: Annotated[
+        bool, typer.Option("--no-cache", help="Re-lock even when the input fingerprint recorded for a lock file still matches")
+    ] = False,
+    report: Annotated[
+        Path, typer.Option("--report", help="Where to write the JSON report of chosen concurrency and per-job timings")
+    ] = REPORT_FILE,
+    index_proxy: Annotated[
+        bool, typer.Option("--index-proxy", help="Route PEP 691 index requests of all lock jobs through one local caching proxy")
+    ] = False,
+    index_proxy_ttl: Annotated[
+        float, typer.Option("--index-proxy-ttl", help="Seconds a cached index page is reused before it is fetched again")
+    ] = INDEX_PROXY_DEFAULT_TTL,
 ) -> None:
     """Generate pylock.toml lock files for Python project directories."""
     log = LogBuffer(buffered=False)
@@ -603,10 +1017,15 @@ def main(
     if upgrade and not requirements_only:
         log.info("FORCE_LOCKFILES_UPGRADE=1 detected. Will upgrade all packages to latest versions.")
 
+    # CI must regenerate every lockfile, or a hand-edited pin would pass the check
+    ci_check = os.environ.get("PYLOCKS_CI_CHECK", "") == "1"
+    use_cache = not (upgrade or no_cache or ci_check)
+    if not use_cache and not requirements_only:
+        log.info("Ignoring recorded input fingerprints, every lock file will be regenerated.")
+
     if not requirements_only:
         log.info(f"Using index mode: {index_mode.value}")
 
-    ci_check = os.environ.get("PYLOCKS_CI_CHECK", "") == "1"
     live_ts = utc_now_iso()
     if ci_check and not requirements_only:
         log.info("PYLOCKS_CI_CHECK=1: using pinned --exclude-newer from each lockfile header when present.")
@@ -621,28 +1040,94 @@ def main(
     success_dirs: list[Path] = []
     failed_dirs: list[Path] = []
 
+    plans: dict[Path, DirectoryPlan] = {}
     for tdir in target_dirs:
+        plan, dir_log = plan_directory(tdir, index_mode)
+        if plan is None:
+            dir_log.flush()
+            failed_dirs.append(tdir)
+            continue
+        plans[tdir] = plan
         flavor_names = ", ".join(f.upper() for f in sorted(detect_flavors(tdir)))
         log.info(f"Scheduled: {tdir} [{flavor_names}]")
 
-    def _run(directory: Path) -> tuple[Path, bool, LogBuffer]:
+    timings = load_job_timings()
+    history = dict(timings)
+    jobs = order_jobs([(tdir, flavor) for tdir, plan in plans.items() for flavor in plan.flavors], timings)
+
+    controller = ConcurrencyController(initial=MAX_WORKERS, maximum=default_max_workers())
+    job_reports: list[dict[str, object]] = []
+    run_started = time.monotonic()
+
+    # One proxy for the whole run, so that parallel lock jobs share index round-trips.
+    proxy_context = (
+        IndexProxy(CACHE_DIR / "index-proxy", ttl=index_proxy_ttl)
+        if index_proxy and not requirements_only
+        else contextlib.nullcontext()
+    )
+
+    def _run(directory: Path, flavor: str) -> FlavorResult:
+        concurrency = controller.acquire()
+        result = FlavorResult(False, LogBuffer(buffered=True))
         try:
-            return process_directory(directory, index_mode, upgrade, ci_check, live_ts, requirements_only)
+            result = process_flavor(
+                plans[directory], flavor, upgrade, ci_check, live_ts, requirements_only, use_cache, proxy
+            )
         except Exception as exc:
-            err_log = LogBuffer(buffered=True)
-            err_log.error(f"Unexpected error processing {directory}: {exc}")
-            return directory, False, err_log
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
-        futures = {pool.submit(_run, tdir): tdir for tdir in target_dirs}
+            result.log.error(f"Unexpected error processing {directory} ({flavor}): {exc}")
+        finally:
+            controller.release(result.status, result.elapsed, history.get(job_key(directory, flavor)))
+        if result.locked:
+            result.log.print(f"⏱️ {flavor.upper()} locked in {result.elapsed:.0f}s at concurrency {concurrency}")
+        job_reports.append({
+            "job": job_key(directory, flavor),
+            "status": result.status.value if result.status else "skipped",
+            "success": result.success,
+            "elapsed": round(result.elapsed, 1),
+            "concurrency": concurrency,
+        })
+        return result
+
+    # Flavor jobs of one directory finish in any order; their output is held back and
+    # flushed together, in flavor order, once the directory's last job completes.
+    results: dict[Path, dict[str, FlavorResult]] = {tdir: {} for tdir in plans}
+    # The pool is sized for the controller's ceiling; the controller decides how many run.
+    with proxy_context as proxy, ThreadPoolExecutor(max_workers=controller.maximum) as pool:
+        if proxy is not None:
+            log.info(f"Index proxy listening on {proxy.base_url} (page TTL {index_proxy_ttl:.0f}s)")
+        futures = {pool.submit(_run, tdir, flavor): (tdir, flavor) for tdir, flavor in jobs}
         for future in as_completed(futures):
-            tdir, success, dir_log = future.result()
-            dir_log.flush()
-            if success:
+            tdir, flavor = futures[future]
+            result = future.result()
+            results[tdir][flavor] = result
+            if result.locked:
+                timings[job_key(tdir, flavor)] = round(result.elapsed, 1)
+
+            plan = plans[tdir]
+            if len(results[tdir]) < len(plan.flavors):
+                continue
+            plan.log.flush()
+            for f in plan.flavors:
+                results[tdir][f].log.flush()
+            if all(r.success for r in results[tdir].values()):
                 success_dirs.append(tdir)
             else:
                 failed_dirs.append(tdir)
 
+    if proxy is not None:
+        log.info(f"Index proxy: {proxy.stats.summary()}")
+
+    if any(r.locked for per_dir in results.values() for r in per_dir.values()):
+        try:
+            save_job_timings(timings)
+            write_concurrency_report(report, controller, MAX_WORKERS, job_reports, time.monotonic() - run_started)
+        except OSError as exc:
+            log.warning(f"Could not record job timings in {CACHE_DIR}: {exc}")
+        log.info(
+            f"Concurrency: started at {MAX_WORKERS}, peaked at {controller.peak}, "
+            f"ended at {controller.limit} (max {controller.maximum}); report in {report}"
+        )
+
     # SUMMARY
     log.print("")
     log.print("=" * 67)
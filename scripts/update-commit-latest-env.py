@@ -11,18 +11,20 @@ import typing
 import structlog
 
 from ci.logging_config import configure_logging
+from ci.oci_registry import ImageReference, RegistryClient, RegistryError
 
 PROJECT_ROOT = pathlib.Path(__file__).parent.parent
 
 log = structlog.get_logger()
 
 
-async def get_image_vcs_ref(image_url: str, semaphore: asyncio.Semaphore) -> tuple[str, str | None]:
+async def get_image_vcs_ref(client: RegistryClient, image_url: str) -> tuple[str, str | None]:
     """
-    Asynchronously inspects a container image's configuration using skopeo
+    Asynchronously fetches a container image's configuration from the registry
     and extracts the 'vcs-ref' label.
 
     Args:
+        client: The shared registry client (pooled connections, cached tokens).
         image_url: The full URL of the image to inspect
                    (e.g., 'quay.io/opendatahub/workbench-images@sha256:...').
 
@@ -30,45 +32,14 @@ async def get_image_vcs_ref(image_url: str, semaphore: asyncio.Semaphore) -> tup
         A tuple containing the original image_url and the value of the 'vcs-ref'
         label if found, otherwise None.
     """
-    # Using 'docker://' prefix is required for skopeo to identify the transport.
-    full_image_url = f"docker://{image_url}"
-
-    # Use 'inspect --config' which is much faster as it only fetches the config blob.
-    command = ["skopeo", "inspect", "--override-os=linux", "--override-arch=amd64", "--retry-times=5", "--config", full_image_url]
-
     log.info(f"Starting config inspection for: {image_url}")
 
-    stdout, stderr, returncode = None, None, None
     try:
-        async with semaphore:
-            log.info(f"Semaphore acquired, starting skopeo inspect for: {image_url}")
-            # Create an asynchronous subprocess
-            process = await asyncio.create_subprocess_exec(
-                *command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            # Wait for the command to complete and capture output
-            stdout, stderr = await process.communicate()
-            returncode = process.returncode
-
-        # Process the results outside the semaphore block
-        if returncode != 0:
-            log.error(f"Skopeo command failed for {image_url} with exit code {returncode}.")
-            if stderr:
-                log.error(f"Stderr: {stderr.decode().strip()}")
-            return image_url, None
-
-        if not stdout:
-            log.error(f"Skopeo command returned success but stdout was empty for {image_url}.")
-            return image_url, None
-
-        # Decode and parse the JSON output from stdout
-        # The output of 'inspect --config' is the image config JSON directly.
-        image_config = json.loads(stdout.decode())
+        # Only the (linux/amd64) config blob is fetched, same as 'skopeo inspect --config'.
+        image_config = await client.get_config(ImageReference.parse(image_url))
 
         # Safely extract the 'vcs-ref' label from the config's 'Labels'
-        vcs_ref = image_config.get("config", {}).get("Labels", {}).get("vcs-ref")
+        vcs_ref = (image_config.get("config", {}).get("Labels") or {}).get("vcs-ref")
 
         if vcs_ref:
             log.info(f"Successfully found 'vcs-ref' for {image_url}: {vcs_ref}")
@@ -77,14 +48,11 @@ async def get_image_vcs_ref(image_url: str, semaphore: asyncio.Semaphore) -> tup
 
         return image_url, vcs_ref
 
-    except FileNotFoundError:
-        log.error("The 'skopeo' command was not found. Please ensure it is installed and in your PATH.")
+    except RegistryError as e:
+        log.error(f"Registry request failed for {image_url}: {e}")
         return image_url, None
     except json.JSONDecodeError:
-        # This error can now also happen if stdout is None or not valid JSON
-        log.error(f"Failed to parse skopeo output as JSON for {image_url}.")
-        if stdout:
-            log.debug(f"Stdout from skopeo for {image_url}: {stdout.decode(errors='replace')}")
+        log.error(f"Failed to parse image config as JSON for {image_url}.")
         return image_url, None
     except Exception as e:
         log.error("Unexpected error while processing image", image_url=image_url, exc_info=True)
@@ -95,9 +63,9 @@ async def inspect(images_to_inspect: typing.Iterable[str]) -> list[tuple[str, st
     """
     Main function to orchestrate the concurrent inspection of multiple images.
     """
-    semaphore = asyncio.Semaphore(22)  # Limit concurrent skopeo processes
-    tasks = [get_image_vcs_ref(image, semaphore) for image in images_to_inspect]
-    return await asyncio.gather(*tasks)
+    async with RegistryClient(max_connections=22, retries=5) as client:
+        tasks = [get_image_vcs_ref(client, image) for image in images_to_inspect]
+        return await asyncio.gather(*tasks)
 
 
 async def main():
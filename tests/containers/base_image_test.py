@@ -1,29 +1,26 @@
 from __future__ import annotations
 
-import binascii
-import contextlib
-import inspect
 import json
 import logging
 import pathlib
 import platform
 import re
 import tempfile
-import textwrap
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 import allure
 import pytest
 import testcontainers.core.container
 
 import ntb
-from tests.containers import conftest, docker_utils, skopeo_utils, utils
+from tests.containers import conftest, container_pool, docker_utils, elf_linkage, utils
 
 logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Generator
+    import contextlib
+    from collections.abc import Callable
 
     import pytest_subtests
 
@@ -36,12 +33,10 @@ class TestBaseImage:
         image_metadata = conftest.get_image_metadata(image)
         source_location = image_metadata.labels.get("io.openshift.build.source-location", "")
 
-        # Dockerfile.konflux does not have source-location label. Use skopeo or local image env.
+        # Dockerfile.konflux does not have source-location label. Use the image env
+        # (from local inspect, or from skopeo when the image was not pulled).
         if not source_location:
-            image_info = skopeo_utils.get_image_info(image)
-            # When skopeo fails (e.g. "manifest unknown" for ephemeral tags), use env from
-            # local image inspect (image is already pulled earlier in the test run).
-            env = image_info.env if image_info is not None else image_metadata.env
+            env = image_metadata.env
             if not env:
                 # No env from skopeo or local inspect; assume non-AIPCC so PyPI checks run.
                 return False
@@ -56,79 +51,39 @@ class TestBaseImage:
         workspace_root = pathlib.Path(__file__).parent.parent.parent
         return source_dir is not None and (workspace_root / source_dir / "uv.lock.d").is_dir()
 
-    def _run_test(self, image: str, test_fn: Callable[[testcontainers.core.container.DockerContainer], None]) -> None:
-        with self._test_container(image) as container:
+    def _run_test(
+        self,
+        image: str,
+        test_fn: Callable[[testcontainers.core.container.DockerContainer], None],
+        *,
+        reuse: bool = True,
+    ) -> None:
+        with self._test_container(image, reuse=reuse) as container:
             test_fn(container)
 
-    @contextlib.contextmanager
-    def _test_container(self, image: str) -> Generator[testcontainers.core.container.DockerContainer]:
-        """Context manager that starts a test container and yields it."""
-        container = testcontainers.core.container.DockerContainer(image=image, user=23456, group_add=[0])
-        container.with_command("/bin/sh -c 'sleep infinity'")
-        try:
-            container.start()
-            yield container
-        finally:
-            docker_utils.NotebookContainer(container).stop(timeout=0)
+    def _test_container(
+        self, image: str, *, reuse: bool = True
+    ) -> contextlib.AbstractContextManager[testcontainers.core.container.DockerContainer]:
+        """Context manager that leases a test container from the container pool and yields it.
+
+        Pass `reuse=False` when the test modifies the container filesystem."""
+        return container_pool.lease(image, user=23456, reuse=reuse)
 
     def test_elf_files_can_link_runtime_libs(self, subtests: pytest_subtests.SubTests, image):
         def test_fn(container: testcontainers.core.container.DockerContainer):
-            def check_elf_file():
-                """This python function will be executed on the image itself.
-                That's why it has to have here all imports it needs."""
-                # ruff: noqa: PLC0415 `import` should be at the top-level of a file
-                import glob
-                import json
-                import os
-                import stat
-                import subprocess
-
-                dirs = ["/bin", "/lib", "/lib64", "/opt/app-root"]
-                for path in dirs:
-                    count_scanned = 0
-                    unsatisfied_deps: list[tuple[str, str]] = []
-                    for dlib in glob.glob(os.path.join(path, "**"), recursive=True):
-                        # we will visit all files eventually, no need to bother with symlinks
-                        s = os.stat(dlib, follow_symlinks=False)
-                        isdirectory = stat.S_ISDIR(s.st_mode)
-                        isfile = stat.S_ISREG(s.st_mode)
-                        executable = bool(s.st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH))
-                        if isdirectory or not executable or not isfile:
-                            continue
-                        with open(dlib, mode="rb") as fp:
-                            magic = fp.read(4)
-                        if magic != b"\x7fELF":
-                            continue
-
-                        count_scanned += 1
-
-                        ld_library_path = os.path.pathsep.join(
-                            (
-                                os.environ.get("LD_LIBRARY_PATH", ""),
-                                # $ORIGIN
-                                os.path.dirname(dlib),
-                                # torchvision needs libtorch_cpu.so, libc10_cuda.so from torch
-                                "/opt/app-root/lib/python3.12/site-packages/torch/lib/",
-                            )
-                        )
-                        output = subprocess.check_output(
-                            ["ldd", dlib],
-                            # search the $ORIGIN, essentially; most python libs expect this
-                            env={**os.environ, "LD_LIBRARY_PATH": ld_library_path},
-                            text=True,
-                        )
-                        for line in output.splitlines():
-                            if "not found" in line:
-                                unsatisfied_deps.append((dlib, line.strip()))
-                        assert output
-                    print(
-                        "OUTPUT>",
-                        json.dumps({"dir": path, "count_scanned": count_scanned, "unsatisfied": unsatisfied_deps}),
-                    )
-
-            _ecode, output = container.exec(
-                encode_python_function_execution_command_interpreter("/usr/bin/python3", check_elf_file)
+            ecode, output = container.exec(
+                encode_python_script_execution_command(
+                    "/usr/bin/python3",
+                    pathlib.Path(elf_linkage.__file__),
+                    # torchvision needs libtorch_cpu.so, libc10_cuda.so from torch
+                    "--library-path=/opt/app-root/lib/python3.12/site-packages/torch/lib/",
+                    "/bin",
+                    "/lib",
+                    "/lib64",
+                    "/opt/app-root",
+                )
             )
+            assert ecode == 0, output.decode()
 
             for line in output.decode().splitlines():
                 logging.debug(line)
@@ -215,7 +170,8 @@ class TestBaseImage:
             logging.debug(output.decode())
             assert ecode == 0
 
-        self._run_test(image=image, test_fn=test_fn)
+        # pip install changes the venv, don't hand the container to other tests
+        self._run_test(image=image, test_fn=test_fn, reuse=False)
 
     # @pytest.mark.environmentss("docker")
     def test_oc_command_runs_fake_fips(self, image: str, subtests: pytest_subtests.SubTests):
@@ -366,19 +322,7 @@ class TestBaseImage:
                 self._check_pypi_env_vars(actual, subtests)
 
 
-def encode_python_function_execution_command_interpreter(
-    python: str, function: Callable[..., Any], *args: list[Any]
-) -> list[str]:
-    """Returns a cli command that will run the given Python function encoded inline.
-    All dependencies (imports, ...) must be part of function body."""
-    code = textwrap.dedent(inspect.getsource(function))
-    ccode = binascii.b2a_base64(code.encode())
-    name = function.__name__
-    parameters = ", ".join(repr(arg) for arg in args)
-    program = textwrap.dedent(f"""
-        import binascii;
-        s=binascii.a2b_base64("{ccode.decode("ascii").strip()}");
-        exec(s.decode());
-        print({name}({parameters}));""")
-    int_cmd = [python, "-c", program]
-    return int_cmd
+def encode_python_script_execution_command(python: str, script: pathlib.Path, *args: str) -> list[str]:
+    """Returns a cli command that will run the given Python script passed inline.
+    The script can only import the standard library of the interpreter in the image."""
+    return [python, "-c", script.read_text(), *args]
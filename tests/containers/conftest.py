@@ -13,13 +13,20 @@ import testcontainers.core.config
 import testcontainers.core.container
 import testcontainers.core.docker_client
 
-from tests.containers import docker_utils, skopeo_utils, utils
+from tests.containers import (
+    container_pool,
+    docker_utils,
+    image_metadata_cache,
+    image_scheduling,
+    skopeo_utils,
+    utils,
+)
 from tests.containers.kubernetes_utils import TestFrame
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Generator
 
-    from pytest import ExitCode, Metafunc, Parser, Session
+    from pytest import Config, ExitCode, Metafunc, Parser, Session
 
 SECURITY_OPTION_ROOTLESS = "name=rootless"
 TESTCONTAINERS_DOCKER_SOCKET_OVERRIDE = "TESTCONTAINERS_DOCKER_SOCKET_OVERRIDE"
@@ -92,6 +99,26 @@ def pytest_addoption(parser: Parser) -> None:
         default=False,
         help="Don't remove images pulled during manifest validation tests",
     )
+    parser.addoption(
+        "--container-pool-size",
+        type=int,
+        default=container_pool.DEFAULT_POOL_SIZE,
+        help="Number of idle test containers kept running for reuse between tests (0 disables reuse)",
+    )
+    parser.addoption(
+        "--no-image-prefetch",
+        action="store_false",
+        dest="image_prefetch",
+        default=True,
+        help="Don't pull the image of the next group of tests in the background",
+    )
+
+
+# https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_configure
+def pytest_configure(config: Config) -> None:
+    container_pool.register(config)
+    image_metadata_cache.register(config)
+    image_scheduling.register(config)
 
 
 # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_generate_tests
@@ -101,6 +128,14 @@ def pytest_generate_tests(metafunc: Metafunc) -> None:
 
 
 def get_image_metadata(image: str) -> Image:
+    """Labels and env of `image`, inspected once per test run (see `image_metadata_cache`)."""
+    metadata = image_metadata_cache.get(image, lambda: dataclasses.asdict(_inspect_image(image)))
+    # entries written by other versions of `Image` may have other fields
+    fields = {field.name for field in dataclasses.fields(Image)}
+    return Image(**{**{key: value for key, value in metadata.items() if key in fields}, "name": image})
+
+
+def _inspect_image(image: str) -> Image:
     client = testcontainers.core.container.DockerClient()
     try:
         # docker inspect
@@ -0,0 +1,243 @@
+"""Pytest plugin that keeps idle test containers warm and hands them out to tests.
+
+Most image tests only need *a* running container of the image under test to
+`exec` commands in.  Starting (and stopping) a container of a multi-GB CUDA or
+ROCm image costs far more than the commands themselves, so instead of one
+container per test, the pool keeps containers keyed by (image, user, env) and
+leases them out:
+
+>>> from tests.containers import container_pool
+>>> with container_pool.lease("quay.io/...", user=23456) as container:  # doctest: +SKIP
+...     container.exec(["oc", "version"])
+
+A returned container is reset before it is leased again (stray processes are
+killed and `/tmp` is emptied; the probe agent, if any, is kept running).  The reset cannot undo changes to the image
+filesystem, so tests that modify it (e.g. `pip install`) lease with
+`reuse=False`, and a container whose test raised is never reused either.
+
+The plugin is registered from `tests/containers/conftest.py`; the number of
+idle containers kept is set with `--container-pool-size` (0 disables pooling).
+Outside a pytest session, `lease` starts and stops a fresh container.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import dataclasses
+import logging
+import time
+from typing import TYPE_CHECKING, ClassVar
+
+import docker.errors
+import pytest
+import testcontainers.core.container
+
+from tests.containers import docker_utils, probe_agent
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+    from pytest import Config, TerminalReporter
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+
+# PID 1 is `sleep infinity`; anything else was left behind by a previous test,
+# except the probe agent (`docker_utils.ProbeAgent`), which is meant to outlive tests.
+# `$$` is the shell running this script, `grep` and `rm` are not in the expanded list.
+RESET_SCRIPT = rf"""
+for p in /proc/[0-9]*; do
+    pid=${{p#/proc/}}
+    if [ "$pid" -eq 1 ] || [ "$pid" -eq $$ ]; then continue; fi
+    if grep -q -- {probe_agent.MARKER} "$p/cmdline" 2>/dev/null; then continue; fi
+    kill -9 "$pid" 2>/dev/null
+done
+rm -rf /tmp/* /tmp/.[!.]* 2>/dev/null
+exit 0
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class ContainerKey:
+    image: str
+    user: int
+    env: tuple[tuple[str, str], ...] = ()
+
+    @classmethod
+    def of(cls, image: str, user: int, env: Mapping[str, str] | None) -> ContainerKey:
+        return cls(image=image, user=user, env=tuple(sorted((env or {}).items())))
+
+
+@dataclasses.dataclass
+class PoolStats:
+    leases: int = 0
+    started: int = 0
+    reused: int = 0
+    discarded: int = 0
+    evicted: int = 0
+    start_seconds: float = 0.0
+    reset_seconds: float = 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimated container start time avoided by reuse, net of the resets."""
+        if not self.started:
+            return 0.0
+        return self.reused * self.start_seconds / self.started - self.reset_seconds
+
+
+class ContainerPool:
+    """Warm `sleep infinity` containers, keyed by (image, user, env).
+
+    At most `size` containers are kept idle; the least recently returned one
+    is stopped when the pool is full.  Leased containers do not count.
+    """
+
+    # the pool of the running pytest session, used by the module-level `lease`
+    session: ClassVar[ContainerPool | None] = None
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE) -> None:
+        self.size = size
+        self.stats = PoolStats()
+        # insertion order is return order, oldest first
+        self._idle: collections.OrderedDict[int, tuple[ContainerKey, testcontainers.core.container.DockerContainer]]
+        self._idle = collections.OrderedDict()
+
+    @contextlib.contextmanager
+    def lease(
+        self, image: str, *, user: int = 23456, env: Mapping[str, str] | None = None, reuse: bool = True
+    ) -> Generator[testcontainers.core.container.DockerContainer]:
+        """Lease a running container of `image` for the duration of the `with` block.
+
+        With `reuse=False` the container is stopped afterwards instead of being
+        returned to the pool; it may still be a warm one taken from the pool.
+        """
+        key = ContainerKey.of(image, user, env)
+        self.stats.leases += 1
+        container = self._take(key) or self._start(key)
+        healthy = False
+        try:
+            yield container
+            healthy = True
+        except pytest.skip.Exception:
+            healthy = True
+            raise
+        finally:
+            if healthy and reuse and self.size > 0:
+                self._give_back(key, container)
+            else:
+                self.stats.discarded += 1
+                _stop(container)
+
+    def close(self) -> None:
+        """Stop all idle containers."""
+        while self._idle:
+            _, (_, container) = self._idle.popitem(last=False)
+            _stop(container)
+
+    def _take(self, key: ContainerKey) -> testcontainers.core.container.DockerContainer | None:
+        for ident, (idle_key, container) in list(self._idle.items()):
+            if idle_key != key:
+                continue
+            del self._idle[ident]
+            if self._reset(container):
+                self.stats.reused += 1
+                return container
+            self.stats.discarded += 1
+            _stop(container)
+        return None
+
+    def _start(self, key: ContainerKey) -> testcontainers.core.container.DockerContainer:
+        container = testcontainers.core.container.DockerContainer(image=key.image, user=key.user, group_add=[0])
+        container.with_command("sleep infinity")
+        for name, value in key.env:
+            container.with_env(name, value)
+        started = time.monotonic()
+        try:
+            container.start()
+        except Exception:
+            _stop(container)
+            raise
+        self.stats.started += 1
+        self.stats.start_seconds += time.monotonic() - started
+        return container
+
+    def _reset(self, container: testcontainers.core.container.DockerContainer) -> bool:
+        """Clean up after the previous lease; False if the container is unusable."""
+        started = time.monotonic()
+        try:
+            wrapped = container.get_wrapped_container()
+            wrapped.reload()
+            if wrapped.status != "running":
+                return False
+            ecode, output = container.exec(["/bin/sh", "-c", RESET_SCRIPT])
+        except docker.errors.APIError as e:
+            LOGGER.warning(f"Failed to reset pooled container of {container.image}: {e}")
+            return False
+        finally:
+            self.stats.reset_seconds += time.monotonic() - started
+        if ecode != 0:
+            LOGGER.warning(f"Failed to reset pooled container of {container.image}: {output.decode()}")
+            return False
+        return True
+
+    def _give_back(self, key: ContainerKey, container: testcontainers.core.container.DockerContainer) -> None:
+        self._idle[id(container)] = (key, container)
+        while len(self._idle) > self.size:
+            _, (_, oldest) = self._idle.popitem(last=False)
+            self.stats.evicted += 1
+            _stop(oldest)
+
+
+def _stop(container: testcontainers.core.container.DockerContainer) -> None:
+    try:
+        docker_utils.NotebookContainer(container).stop(timeout=0)
+    except docker.errors.APIError as e:
+        LOGGER.warning(f"Failed to stop container of {container.image}: {e}")
+
+
+def lease(
+    image: str, *, user: int = 23456, env: Mapping[str, str] | None = None, reuse: bool = True
+) -> contextlib.AbstractContextManager[testcontainers.core.container.DockerContainer]:
+    """Lease a container from the session pool, see `ContainerPool.lease`."""
+    pool = ContainerPool.session if ContainerPool.session is not None else ContainerPool(size=0)
+    return pool.lease(image, user=user, env=env, reuse=reuse)
+
+
+class ContainerPoolPlugin:
+    def __init__(self, size: int) -> None:
+        self.pool = ContainerPool(size=size)
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_sessionstart
+    def pytest_sessionstart(self) -> None:
+        ContainerPool.session = self.pool
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_sessionfinish
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self) -> None:
+        ContainerPool.session = None
+        self.pool.close()
+        LOGGER.info(f"Container pool: {self.pool.stats}")
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_terminal_summary
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        stats = self.pool.stats
+        if not stats.leases:
+            return
+        terminalreporter.write_sep("=", "container pool")
+        terminalreporter.write_line(
+            f"{stats.leases} leases: {stats.started} containers started ({stats.start_seconds:.1f}s), "
+            f"{stats.reused} reused ({stats.reset_seconds:.1f}s resetting), "
+            f"{stats.discarded} discarded, {stats.evicted} evicted"
+        )
+        terminalreporter.write_line(f"estimated time saved: {stats.saved_seconds:.1f}s (pool size {self.pool.size})")
+
+    @pytest.fixture(scope="session")
+    def container_pool(self) -> ContainerPool:
+        return self.pool
+
+
+def register(config: Config) -> None:
+    config.pluginmanager.register(ContainerPoolPlugin(config.getoption("--container-pool-size")), "container_pool")
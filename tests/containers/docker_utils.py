@@ -1,21 +1,28 @@
 from __future__ import annotations
 
+import dataclasses
+import inspect
 import io
+import json
 import logging
 import os.path
+import pathlib
 import socket as pysocket
+import struct
 import sys
 import tarfile
+import textwrap
 import time
 from os import PathLike
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import podman
 
 import tests.containers.pydantic_schemas
+from tests.containers import probe_agent
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable
 
     import docker.client
     import testcontainers.core.container
@@ -36,6 +43,7 @@ class NotebookContainer:
         DockerContainer.stop() has unchangeable 10s timeout between SIGSTOP and SIGKILL."""
         wrapped = self.testcontainer.get_wrapped_container()
         if wrapped is not None:
+            close_probe_agents(wrapped)
             wrapped.stop(timeout=timeout)
         self.testcontainer.stop()
 
@@ -201,17 +209,7 @@ def container_exec_with_stdin(
     # file-like methods (write, read) instead of raw socket methods.
     stream = container.client.api.exec_start(exec_id, socket=True, tty=True)
 
-    # The stream object can be a raw socket or a file-like wrapper which might
-    # be incorrectly marked as read-only. We need to find the underlying raw
-    # socket to reliably write to stdin.
-    raw_sock = None
-    if isinstance(stream, pysocket.socket):
-        raw_sock = stream
-    else:
-        # Try to unwrap a file-like object (e.g., BufferedReader -> SocketIO -> socket)
-        raw_io = getattr(stream, "raw", stream)
-        if hasattr(raw_io, "_sock"):
-            raw_sock = raw_io._sock
+    raw_sock = _exec_socket(stream)
 
     if raw_sock:
         raw_sock.sendall(stdin_data)
@@ -268,6 +266,165 @@ def container_exec_with_stdin(
     return exit_code, output
 
 
+def _exec_socket(stream: Any) -> pysocket.socket | None:
+    """Find the raw socket under the stream returned by `exec_start(socket=True)`.
+
+    The stream object can be a raw socket or a file-like wrapper which might
+    be incorrectly marked as read-only. We need to find the underlying raw
+    socket to reliably write to stdin."""
+    if isinstance(stream, pysocket.socket):
+        return stream
+    # Try to unwrap a file-like object (e.g., BufferedReader -> SocketIO -> socket)
+    raw_io = getattr(stream, "raw", stream)
+    return getattr(raw_io, "_sock", None)
+
+
+class ProbeError(RuntimeError):
+    """The probe agent died, timed out, or could not be started."""
+
+
+@dataclasses.dataclass
+class ProbeResult:
+    ok: bool
+    # return value of the probe function (its repr if it is not JSON serializable)
+    value: Any
+    # what the probe printed
+    stdout: str
+    # traceback if the probe raised
+    error: str | None
+
+
+class ProbeAgent:
+    """Runs Python functions in a container through one long-lived `probe_agent.py` process.
+
+    Each probe is sent as source code over the stdin of a single `exec`, so the
+    interpreter and the modules the probes import are shared between probes.
+    Probes must therefore be self-contained (all imports in the function body)
+    and should not rely on running in a fresh process.
+    """
+
+    # bytes of agent stderr kept for error messages
+    STDERR_TAIL = 8192
+
+    def __init__(self, container: Container, python: str = "python3", timeout: float = 600.0) -> None:
+        self.container = container
+        self.python = python
+        self.timeout = timeout
+        self._sock: pysocket.socket | None = None
+        self._stdout = bytearray()
+        self._stderr = bytearray()
+        self._requests = 0
+
+    def start(self) -> None:
+        source = pathlib.Path(probe_agent.__file__).read_text()
+        # tty=False: stdout and stderr arrive multiplexed, and the tty does not echo the requests back
+        exec_id = self.container.client.api.exec_create(
+            self.container.id,
+            [self.python, "-u", "-c", source, probe_agent.MARKER],
+            stdin=True,
+            stdout=True,
+            stderr=True,
+            tty=False,
+        )["Id"]
+        stream = self.container.client.api.exec_start(exec_id, socket=True, tty=False)
+        self._sock = _exec_socket(stream)
+        if self._sock is None:
+            raise ProbeError(f"Could not get the socket of the probe agent exec from {type(stream)}")
+        self._stdout.clear()
+        self._stderr.clear()
+
+    def close(self) -> None:
+        """Stop the agent (it exits when its stdin is closed)."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def run(self, function: Callable[..., Any], *args: Any) -> ProbeResult:
+        """Run `function(*args)` in the agent, starting the agent if needed.
+
+        Raises:
+            ProbeError: if the agent does not answer, e.g. because the probe crashed the interpreter.
+        """
+        if self._sock is None:
+            self.start()
+        self._requests += 1
+        request = {
+            "id": self._requests,
+            "source": textwrap.dedent(inspect.getsource(function)),
+            "name": function.__name__,
+            "args": list(args),
+        }
+        try:
+            self._sock.settimeout(self.timeout)
+            self._sock.sendall(json.dumps(request).encode() + b"\n")
+            response = json.loads(self._read_line())
+        except (OSError, ProbeError) as e:
+            stderr = self._stderr.decode(errors="replace")
+            self.close()
+            raise ProbeError(f"Probe agent failed running {function.__name__}: {e}\nAgent stderr:\n{stderr}") from e
+        return ProbeResult(
+            ok=response["ok"], value=response["value"], stdout=response["stdout"], error=response["error"]
+        )
+
+    def _read_line(self) -> bytes:
+        while b"\n" not in self._stdout:
+            # https://docs.docker.com/reference/api/engine/version/v1.47/#tag/Container/operation/ContainerAttach
+            stream_type, size = struct.unpack(">BxxxL", self._recv_exactly(8))
+            data = self._recv_exactly(size)
+            if stream_type == 1:
+                self._stdout += data
+            else:
+                logging.debug(f"probe agent: {data.decode(errors='replace').rstrip()}")
+                self._stderr = (self._stderr + data)[-self.STDERR_TAIL :]
+        line, _, rest = bytes(self._stdout).partition(b"\n")
+        self._stdout[:] = rest
+        return line
+
+    def _recv_exactly(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise ProbeError("probe agent exited")
+            data += chunk
+        return bytes(data)
+
+
+_probe_agents: dict[tuple[str, str], ProbeAgent] = {}
+
+
+def run_probe(
+    container: testcontainers.core.container.DockerContainer,
+    function: Callable[..., Any],
+    *args: Any,
+    python: str = "python3",
+    shared: bool = True,
+) -> ProbeResult:
+    """Run `function(*args)` inside the container, in the container's probe agent for `python`.
+
+    The agent is started on first use and reused by later probes (also from
+    other tests, when the container comes from `container_pool`).  Probes that
+    look at process state left behind by imports, such as the libraries listed
+    in `/proc/self/maps`, pass `shared=False` to run in an agent of their own."""
+    wrapped = container.get_wrapped_container()
+    if not shared:
+        agent = ProbeAgent(wrapped, python=python)
+        try:
+            return agent.run(function, *args)
+        finally:
+            agent.close()
+    key = (wrapped.id, python)
+    if key not in _probe_agents:
+        _probe_agents[key] = ProbeAgent(wrapped, python=python)
+    return _probe_agents[key].run(function, *args)
+
+
+def close_probe_agents(container: Container) -> None:
+    """Stop the probe agents of a container that is going away."""
+    for key in [key for key in _probe_agents if key[0] == container.id]:
+        _probe_agents.pop(key).close()
+
+
 def get_socket_path(client: docker.client.DockerClient) -> str:
     """Determine the local socket path.
     This works even when `podman machine` with its own host-mounts is involved
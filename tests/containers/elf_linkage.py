@@ -0,0 +1,313 @@
+"""Find shared library dependencies of ELF files that the dynamic loader would not find.
+
+This is a replacement for running `ldd` on every file, meant to be executed
+inside the image under test with the image's own `/usr/bin/python3`.  For that
+reason it only uses the standard library, keeps to Python 3.9 syntax at
+runtime, and is sent to the container as a script (see
+`base_image_test.encode_python_script_execution_command`).
+
+Instead of forking `ldd` per file, `DT_NEEDED`, `DT_RPATH` and `DT_RUNPATH` are
+read from the ELF dynamic section and looked up the way glibc's `ld.so` does
+(loader RPATH chain, LD_LIBRARY_PATH, RUNPATH, `/etc/ld.so.cache`, default
+directories), transitively, like `ldd` reports them.  The loader cache is read
+once per scan and the files are scanned by a process pool.
+
+Each unresolved dependency is reported as `<soname> => not found`, which is
+the line `ldd` would print for it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import glob
+import json
+import multiprocessing
+import os
+import stat
+import struct
+import sys
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+ELF_MAGIC = b"\x7fELF"
+ELFCLASS64 = 2
+ELFDATA2LSB = 1
+
+PT_LOAD = 1
+PT_DYNAMIC = 2
+
+DT_NULL = 0
+DT_NEEDED = 1
+DT_STRTAB = 5
+DT_STRSZ = 10
+DT_RPATH = 15
+DT_RUNPATH = 29
+DT_FLAGS_1 = 0x6FFFFFFB
+DF_1_NODEFLIB = 0x800
+
+LD_SO_CACHE = "/etc/ld.so.cache"
+# glibc >= 2.32 writes only the new format; older caches append it after the old one
+LD_SO_CACHE_MAGIC = b"glibc-ld.so.cache1.1"
+
+
+class ElfInfo(NamedTuple):
+    # (EI_CLASS, EI_DATA, e_machine); the loader only accepts libraries that match the requesting object
+    ident: tuple[int, int, int]
+    needed: tuple[str, ...] = ()
+    rpath: tuple[str, ...] = ()
+    # None when the object has no DT_RUNPATH at all, which changes how DT_RPATH is used
+    runpath: tuple[str, ...] | None = None
+    nodeflib: bool = False
+
+
+def read_elf(path: str) -> ElfInfo | None:
+    """Read the dynamic linking information of an ELF file, or None if it is not an ELF file."""
+    try:
+        with open(path, "rb") as fp:
+            return _read_elf(fp)
+    except OSError:
+        return None
+    except struct.error:
+        return None  # truncated or not really ELF
+
+
+def _read_elf(fp: BinaryIO) -> ElfInfo | None:
+    ident = fp.read(16)
+    if len(ident) < 16 or ident[:4] != ELF_MAGIC:
+        return None
+    is64 = ident[4] == ELFCLASS64
+    endian = "<" if ident[5] == ELFDATA2LSB else ">"
+    header = fp.read(48 if is64 else 36)
+    header_format = endian + ("HHIQQQIHHH" if is64 else "HHIIIIIHHH")
+    _type, machine, _ver, _entry, phoff, _shoff, _flags, _ehsize, phentsize, phnum = struct.unpack_from(
+        header_format, header
+    )
+    info = ElfInfo(ident=(ident[4], ident[5], machine))
+
+    loads: list[tuple[int, int, int]] = []
+    dynamic: tuple[int, int] | None = None
+    fp.seek(phoff)
+    table = fp.read(phentsize * phnum)
+    for i in range(phnum):
+        entry = table[i * phentsize : (i + 1) * phentsize]
+        if is64:
+            p_type, _pflags, offset, vaddr, _paddr, filesz = struct.unpack_from(endian + "IIQQQQ", entry)
+        else:
+            p_type, offset, vaddr, _paddr, filesz = struct.unpack_from(endian + "IIIII", entry)
+        if p_type == PT_LOAD:
+            loads.append((vaddr, offset, filesz))
+        elif p_type == PT_DYNAMIC:
+            dynamic = (offset, filesz)
+    if dynamic is None:
+        return info  # statically linked
+
+    fp.seek(dynamic[0])
+    raw = fp.read(dynamic[1])
+    entry_format, entry_size = (endian + "qQ", 16) if is64 else (endian + "iI", 8)
+    tags: dict[int, list[int]] = collections.defaultdict(list)
+    for offset in range(0, len(raw) - entry_size + 1, entry_size):
+        tag, value = struct.unpack_from(entry_format, raw, offset)
+        if tag == DT_NULL:
+            break
+        tags[tag].append(value)
+    if not tags[DT_STRTAB]:
+        return info
+
+    # DT_STRTAB is a virtual address, find it in the file through the PT_LOAD segments
+    strtab = tags[DT_STRTAB][0]
+    for vaddr, offset, filesz in loads:
+        if vaddr <= strtab < vaddr + filesz:
+            fp.seek(offset + strtab - vaddr)
+            break
+    else:
+        return info
+    strings = fp.read(tags[DT_STRSZ][0] if tags[DT_STRSZ] else 1 << 20)
+
+    def string(offset: int) -> str:
+        return strings[offset : strings.find(b"\0", offset)].decode("utf-8", "surrogateescape")
+
+    def paths(tag: int) -> tuple[str, ...]:
+        return tuple(p for value in tags[tag] for p in string(value).split(":") if p)
+
+    return info._replace(
+        needed=tuple(string(value) for value in tags[DT_NEEDED]),
+        rpath=paths(DT_RPATH),
+        runpath=paths(DT_RUNPATH) if tags[DT_RUNPATH] else None,
+        nodeflib=any(value & DF_1_NODEFLIB for value in tags[DT_FLAGS_1]),
+    )
+
+
+def read_ld_so_cache(path: str = LD_SO_CACHE) -> dict[str, list[str]]:
+    """Map sonames to library paths, in `/etc/ld.so.cache` order (what `ldconfig -p` prints)."""
+    try:
+        with open(path, "rb") as fp:
+            data = fp.read()
+    except OSError:
+        return {}
+    start = data.find(LD_SO_CACHE_MAGIC)
+    if start < 0:
+        return {}
+    # magic + version (20 bytes), nlibs, len_strings, flags, padding, extension offset, unused (28 bytes)
+    (nlibs,) = struct.unpack_from("=I", data, start + 20)
+    cache: dict[str, list[str]] = collections.defaultdict(list)
+
+    def string(offset: int) -> str:
+        offset += start
+        return data[offset : data.find(b"\0", offset)].decode("utf-8", "surrogateescape")
+
+    for i in range(nlibs):
+        _flags, key, value = struct.unpack_from("=iII", data, start + 48 + 24 * i)
+        cache[string(key)].append(string(value))
+    return dict(cache)
+
+
+class Resolver:
+    """Resolves sonames like `ld.so` does, memoizing ELF headers and lookups across files.
+
+    `library_path` plays the role of LD_LIBRARY_PATH; a `$ORIGIN` entry in it
+    stands for the directory of the file being checked.
+    """
+
+    def __init__(self, library_path: list[str] | None = None, ld_so_cache: dict[str, list[str]] | None = None) -> None:
+        self.library_path = list(library_path or [])
+        self.ld_so_cache = read_ld_so_cache() if ld_so_cache is None else ld_so_cache
+        self._elf: dict[str, ElfInfo | None] = {}
+        self._found: dict[tuple, str | None] = {}
+
+    def elf(self, path: str) -> ElfInfo | None:
+        if path not in self._elf:
+            self._elf[path] = read_elf(path)
+        return self._elf[path]
+
+    def unresolved(self, path: str) -> list[str]:
+        """Sonames needed by `path` or any library it loads that cannot be found, in `ldd` order."""
+        main = self.elf(path)
+        if main is None:
+            return []
+        ld_library_path = tuple(self._expand(d, path, main.ident) for d in self.library_path)
+        loader_of: dict[str, str | None] = {path: None}
+        seen: set[str] = set()
+        missing: list[str] = []
+        queue = collections.deque([path])
+        while queue:
+            obj = queue.popleft()
+            for name in self.elf(obj).needed:
+                if name in seen:
+                    continue
+                seen.add(name)
+                found = self._find(name, obj, loader_of, ld_library_path, main.ident)
+                if found is None:
+                    missing.append(name)
+                elif found not in loader_of:
+                    loader_of[found] = obj
+                    queue.append(found)
+        return missing
+
+    def _find(
+        self, name: str, loader: str, loader_of: dict[str, str | None], ld_library_path: tuple[str, ...], ident: tuple
+    ) -> str | None:
+        """Search order of glibc `_dl_map_object`."""
+        info = self.elf(loader)
+        if "/" in name:
+            return self._accept(self._expand(name, loader, ident), ident)
+
+        dirs: list[str] = []
+        if info.runpath is None:
+            # DT_RPATH of the requesting object, then of the object that loaded it, up to the main one
+            obj: str | None = loader
+            while obj is not None:
+                obj_info = self.elf(obj)
+                if obj_info.runpath is None:
+                    dirs.extend(self._expand(d, obj, ident) for d in obj_info.rpath)
+                obj = loader_of[obj]
+        dirs.extend(ld_library_path)
+        if info.runpath is not None:
+            dirs.extend(self._expand(d, loader, ident) for d in info.runpath)
+
+        key = (name, tuple(dirs), ident, info.nodeflib)
+        if key not in self._found:
+            self._found[key] = self._search(name, dirs, ident, info.nodeflib)
+        return self._found[key]
+
+    def _search(self, name: str, dirs: list[str], ident: tuple, nodeflib: bool) -> str | None:
+        for d in dirs:
+            found = self._accept(os.path.join(d, name), ident)
+            if found is not None:
+                return found
+        if nodeflib:
+            return None
+        for candidate in self.ld_so_cache.get(name, []):
+            found = self._accept(candidate, ident)
+            if found is not None:
+                return found
+        defaults = ("/lib64", "/usr/lib64") if ident[0] == ELFCLASS64 else ("/lib", "/usr/lib")
+        for d in defaults:
+            found = self._accept(os.path.join(d, name), ident)
+            if found is not None:
+                return found
+        return None
+
+    def _accept(self, path: str, ident: tuple) -> str | None:
+        info = self.elf(path)
+        return path if info is not None and info.ident == ident else None
+
+    @staticmethod
+    def _expand(path: str, obj: str, ident: tuple) -> str:
+        lib = "lib64" if ident[0] == ELFCLASS64 else "lib"
+        origin = os.path.dirname(obj)
+        for token, value in (("$ORIGIN", origin), ("${ORIGIN}", origin), ("$LIB", lib), ("${LIB}", lib)):
+            path = path.replace(token, value)
+        return path
+
+
+# Set in the parent before forking the pool, so that the workers share the loader cache.
+_resolver: Resolver | None = None
+
+
+def _scan_file(path: str) -> tuple[str, bool, list[str]]:
+    """Pool worker: (path, is ELF, unresolved sonames)."""
+    if _resolver.elf(path) is None:
+        return path, False, []
+    return path, True, _resolver.unresolved(path)
+
+
+def executable_files(directory: str) -> list[str]:
+    """Regular files with an executable bit set, the candidates `ldd` used to be run on."""
+    files = []
+    for path in glob.glob(os.path.join(directory, "**"), recursive=True):
+        # we will visit all files eventually, no need to bother with symlinks
+        s = os.stat(path, follow_symlinks=False)
+        if stat.S_ISREG(s.st_mode) and s.st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
+            files.append(path)
+    return files
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Report unresolvable shared library dependencies of ELF files")
+    parser.add_argument("--library-path", action="append", default=[], help="Extra LD_LIBRARY_PATH directory")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("directories", nargs="+")
+    args = parser.parse_args(argv)
+
+    global _resolver  # noqa: PLW0603 the pool workers are forked and read it
+    library_path = [p for p in os.environ.get("LD_LIBRARY_PATH", "").split(":") if p]
+    # search the $ORIGIN, essentially; most python libs expect this
+    _resolver = Resolver([*library_path, "$ORIGIN", *args.library_path])
+
+    # fork: the workers inherit the resolver, and `python3 -c` has no __main__ file to re-import
+    with multiprocessing.get_context("fork").Pool(args.jobs) as pool:
+        for directory in args.directories:
+            count_scanned = 0
+            unsatisfied: list[tuple[str, str]] = []
+            for path, is_elf, missing in pool.imap(_scan_file, executable_files(directory), chunksize=16):
+                count_scanned += is_elf
+                unsatisfied.extend((path, f"{name} => not found") for name in missing)
+            print("OUTPUT>", json.dumps({"dir": directory, "count_scanned": count_scanned, "unsatisfied": unsatisfied}))
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
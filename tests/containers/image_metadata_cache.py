@@ -0,0 +1,136 @@
+"""Cache of image metadata (labels, env) shared by all test processes of a run.
+
+Fixtures such as `skip_if_not_cuda_image` look up the labels of the image
+under test for every test that parametrizes over it, and each lookup is a
+docker inspect that may fall back to `skopeo inspect` or a full pull.  With
+this cache, an image is inspected once; everybody else reads the result from
+a JSON file under pytest's cache directory (`.pytest_cache/d/image-metadata`).
+
+The files are shared by all pytest-xdist workers, which all use the same cache
+directory.  Each image has its own JSON file guarded by its own lock file, so a
+worker that needs an image that is being inspected waits for the result
+instead of pulling it a second time, while other images are not blocked.
+
+Entries are keyed by image digest when the image is referenced by digest
+(`name@sha256:...`, as in CI), and those are kept until `--cache-clear`.
+Entries for tag references expire after `TAG_MAX_AGE`, because the tag may
+have been pushed to since.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, ClassVar
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Callable, Generator
+
+    from pytest import Config
+
+LOGGER = logging.getLogger(__name__)
+
+# name of the directory in pytest's cache, see `pytest.Cache.mkdir`
+CACHE_DIR_NAME = "image-metadata"
+
+# roughly the length of a CI job
+TAG_MAX_AGE = 3600
+
+
+def cache_key(image: str) -> str:
+    """The image digest if `image` is referenced by digest, otherwise the reference itself.
+
+    >>> cache_key("quay.io/opendatahub/workbench-images@sha256:e98d19df")
+    'sha256:e98d19df'
+    >>> cache_key("quay.io/opendatahub/workbench-images:jupyter-minimal")
+    'quay.io/opendatahub/workbench-images:jupyter-minimal'
+    """
+    _, at, digest = image.partition("@")
+    return digest if at else image
+
+
+class ImageMetadataCache:
+    """Image metadata as JSON-serializable dicts, stored in `directory` and memoized in memory."""
+
+    # the cache of the running pytest session, used by the module-level `get`
+    session: ClassVar[ImageMetadataCache | None] = None
+
+    def __init__(self, directory: pathlib.Path) -> None:
+        self.directory = directory
+        self.inspections = 0
+        self._memo: dict[str, dict[str, Any]] = {}
+
+    def get(self, image: str, inspect: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        """Metadata of `image`, calling `inspect` only if no process of this run has done so yet."""
+        key = cache_key(image)
+        if key in self._memo:
+            return self._memo[key]
+
+        path = self.directory / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+        with self._locked(path.with_suffix(".lock")):
+            entry = self._read(path, key)
+            if entry is None:
+                self.inspections += 1
+                entry = {"key": key, "inspected_at": time.time(), "metadata": inspect()}
+                self._write(path, entry)
+        self._memo[key] = entry["metadata"]
+        return entry["metadata"]
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _locked(lock_path: pathlib.Path) -> Generator[None]:
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read(path: pathlib.Path, key: str) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            LOGGER.warning(f"Ignoring corrupted image metadata cache file {path}: {e}")
+            return None
+        if entry.get("key") != key:
+            return None
+        if not key.startswith("sha256:") and time.time() - entry.get("inspected_at", 0) > TAG_MAX_AGE:
+            return None
+        return entry
+
+    @staticmethod
+    def _write(path: pathlib.Path, entry: dict[str, Any]) -> None:
+        # readers hold the lock too, but a killed writer must not leave a truncated file behind
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, indent=2))
+        tmp.replace(path)
+
+
+def get(image: str, inspect: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    """Metadata of `image` from the session cache, or from `inspect` outside a pytest session."""
+    if ImageMetadataCache.session is None:
+        return inspect()
+    return ImageMetadataCache.session.get(image, inspect)
+
+
+def register(config: Config) -> None:
+    # `config.cache` is missing when running with `-p no:cacheprovider`
+    cache = getattr(config, "cache", None)
+    if cache is None:
+        return
+    ImageMetadataCache.session = ImageMetadataCache(cache.mkdir(CACHE_DIR_NAME))
+
+    def unregister() -> None:
+        LOGGER.info(f"Image metadata cache: {ImageMetadataCache.session.inspections} images inspected")
+        ImageMetadataCache.session = None
+
+    config.add_cleanup(unregister)
@@ -0,0 +1,177 @@
+"""Pytest plugin that runs container tests in per-image groups and pulls the next image in the background.
+
+Tests parametrized with `--image` are grouped by image.  The groups are
+ordered most expensive first, estimated from the test durations of previous
+runs (kept in pytest's cache under `image-scheduling/durations`).  Tests
+without an image run first, in their original order.
+
+While the tests of one group run, the image of the next group is pulled in a
+background thread, so that its first test does not have to wait for the pull.
+
+With pytest-xdist, every test is marked `xdist_group(<image>)`, so running with
+`--dist=loadgroup` keeps all tests of an image on one worker and
+the image is not pulled and unpacked by several workers at once.  Because the
+groups come most expensive first, xdist hands the long groups out first and
+the short ones fill in the gaps.  Workers share the docker image store, so an
+image pulled in the background by one worker is available to all of them.
+
+The plugin is registered from `tests/containers/conftest.py`; the background
+pulls are disabled with `--no-image-prefetch`.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import statistics
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import docker.errors
+import pytest
+import testcontainers.core.docker_client
+
+if TYPE_CHECKING:
+    from pytest import Config, Item, TestReport
+
+LOGGER = logging.getLogger(__name__)
+
+DURATIONS_CACHE_KEY = "image-scheduling/durations"
+
+# assumed duration of a test that has never run, when no test has run before either
+DEFAULT_TEST_SECONDS = 10.0
+
+
+def item_image(item: Item) -> str | None:
+    """The `--image` the test is parametrized with, if any."""
+    callspec = getattr(item, "callspec", None)
+    return callspec.params.get("image") if callspec is not None else None
+
+
+def order_by_image(items: list[Item], durations: dict[str, float]) -> list[str]:
+    """Reorder `items` in place into image groups, most expensive first; returns the images in that order."""
+    default = statistics.median(durations.values()) if durations else DEFAULT_TEST_SECONDS
+    costs: dict[str, float] = {}
+    for item in items:
+        image = item_image(item)
+        if image is not None:
+            costs[image] = costs.get(image, 0.0) + durations.get(item.nodeid, default)
+
+    images = sorted(costs, key=lambda image: -costs[image])
+    rank = {image: i for i, image in enumerate(images)}
+    # sort is stable, so tests keep their order within a group
+    items.sort(key=lambda item: -1 if (image := item_image(item)) is None else rank[image])
+    for image in images:
+        LOGGER.info(f"Image group {image}: estimated {costs[image]:.0f}s")
+    return images
+
+
+class ImagePrefetcher:
+    """Pulls images one at a time in a daemon thread, so an unfinished pull does not hold up exit."""
+
+    def __init__(self) -> None:
+        self._client = testcontainers.core.docker_client.DockerClient().client
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._done: dict[str, threading.Event] = {}
+        self._thread = threading.Thread(target=self._run, name="image-prefetch", daemon=True)
+        self._thread.start()
+
+    def prefetch(self, image: str) -> None:
+        if image in self._done:
+            return
+        self._done[image] = threading.Event()
+        self._queue.put(image)
+
+    def wait(self, image: str) -> None:
+        """Wait for an already requested pull of `image` to finish, so that a test does not pull it again."""
+        if (done := self._done.get(image)) is not None:
+            done.wait()
+
+    def _run(self) -> None:
+        while True:
+            image = self._queue.get()
+            try:
+                self._pull(self._client, image)
+            # best effort; the thread must keep going, or tests waiting for later images would hang
+            except Exception as e:
+                LOGGER.warning(f"Failed to prefetch {image}, the tests will pull it themselves: {e}")
+            finally:
+                self._done[image].set()
+
+    @staticmethod
+    def _pull(client: docker.DockerClient, image: str) -> None:
+        try:
+            client.images.get(image)
+        except docker.errors.ImageNotFound:
+            started = time.monotonic()
+            LOGGER.info(f"Prefetching {image}")
+            client.images.pull(image)
+            LOGGER.info(f"Prefetched {image} in {time.monotonic() - started:.0f}s")
+
+
+class ImageSchedulingPlugin:
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.prefetch = config.getoption("image_prefetch")
+        self.images: list[str] = []
+        self.durations: dict[str, float] = {}
+        self._prefetcher: ImagePrefetcher | None = None
+        self._current: str | None = None
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_itemcollected
+    def pytest_itemcollected(self, item: Item) -> None:
+        # before any `pytest_collection_modifyitems`, which is where xdist reads the groups
+        if (image := item_image(item)) is not None and self.config.pluginmanager.hasplugin("xdist"):
+            item.add_marker(pytest.mark.xdist_group(image))
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_collection_modifyitems
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config: Config, items: list[Item]) -> None:
+        # `config.cache` is missing when running with `-p no:cacheprovider`
+        cache = getattr(config, "cache", None)
+        durations = cache.get(DURATIONS_CACHE_KEY, {}) if cache is not None else {}
+        self.images = order_by_image(items, durations)
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_collection_finish
+    def pytest_collection_finish(self) -> None:
+        # the xdist controller does not run tests
+        if not self.prefetch or not self.images or self.config.pluginmanager.hasplugin("dsession"):
+            return
+        self._prefetcher = ImagePrefetcher()
+        # on xdist workers, the first group is most likely not this worker's; the others all share it
+        if not hasattr(self.config, "workerinput"):
+            self._prefetcher.prefetch(self.images[0])
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_runtest_setup
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: Item) -> None:
+        image = item_image(item)
+        if self._prefetcher is None or image is None or image == self._current:
+            return
+        self._current = image
+        self._prefetcher.wait(image)
+        following = self.images.index(image) + 1
+        if following < len(self.images):
+            self._prefetcher.prefetch(self.images[following])
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_runtest_logreport
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        # `--dist=loadgroup` appends "@<group>" to the node ids of parametrized tests; store them as without xdist
+        head, group, _ = report.nodeid.rpartition("]@")
+        nodeid = f"{head}]" if group else report.nodeid
+        self.durations[nodeid] = self.durations.get(nodeid, 0.0) + report.duration
+
+    # https://docs.pytest.org/en/latest/reference/reference.html#pytest.hookspec.pytest_sessionfinish
+    def pytest_sessionfinish(self) -> None:
+        # xdist workers report to the controller, which sees the durations of all tests
+        cache = getattr(self.config, "cache", None)
+        if hasattr(self.config, "workerinput") or cache is None or not self.durations:
+            return
+        durations = cache.get(DURATIONS_CACHE_KEY, {})
+        durations.update(self.durations)
+        cache.set(DURATIONS_CACHE_KEY, durations)
+
+
+def register(config: Config) -> None:
+    config.pluginmanager.register(ImageSchedulingPlugin(config), "image_scheduling")
@@ -7,8 +7,8 @@ match reality by checking what's actually installed in the shipped images.
 Two approaches are provided:
 
 - **SBOM-based** (fast, ~2s per image): downloads the SBOM artifact attached to the image
-  via ``cosign download sbom``, no need to pull the full image. Works when cosign+skopeo
-  are available. For multi-arch images, resolves the amd64 manifest first.
+  via ``cosign download sbom``, no need to pull the full image. Works when cosign
+  is available. For multi-arch images, resolves the amd64 manifest first.
 
 - **pip-list-based** (slow, pulls full image): starts a container and runs ``pip list``.
   Requires a container runtime (podman/docker). More thorough but much slower for large
@@ -27,6 +27,7 @@ incorrectly bumped the N-1 annotation to 5.0, even though the N-1 image still ha
 
 from __future__ import annotations
 
+import asyncio
 import collections
 import dataclasses
 import json
@@ -45,11 +46,14 @@ import packaging.version
 import pytest
 import yaml
 
+from ci.oci_registry import ImageReference, RegistryClient, RegistryError
 from manifests.tools.commit_env_refs import parse_env_file
 from manifests.tools.package_names import manifest_name_to_pip
 from tests import PROJECT_ROOT
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     import pytest_subtests
 
 _LOG = logging.getLogger(__name__)
@@ -122,26 +126,19 @@ def _resolve_amd64(image_ref: str) -> str:
     """Resolve a multi-arch manifest list to the amd64 image digest.
 
     If *image_ref* already points to a single-arch image, returns it unchanged.
-    Requires ``skopeo`` on PATH.
     """
-    raw = subprocess.run(
-        ["skopeo", "inspect", "--raw", f"docker://{image_ref}"],
-        capture_output=True,
-        text=True,
-        check=True,
-        timeout=30,
-    )
-    manifest = json.loads(raw.stdout)
-    if "manifests" in manifest:
-        amd64 = next(
-            (m["digest"] for m in manifest["manifests"] if m.get("platform", {}).get("architecture") == "amd64"),
-            None,
-        )
-        if amd64 is None:
-            raise RuntimeError(f"No amd64 manifest in {image_ref}")
-        base = image_ref.rsplit("@", 1)[0]
-        return f"{base}@{amd64}"
-    return image_ref
+    return str(asyncio.run(_registry_call(RegistryClient.resolve_platform, image_ref)))
+
+
+def _raw_manifest(image_ref: str) -> dict:
+    """Return the manifest of *image_ref* as stored in the registry (``skopeo inspect --raw``)."""
+    manifest, _ = asyncio.run(_registry_call(RegistryClient.get_manifest, image_ref))
+    return manifest
+
+
+async def _registry_call[T](method: Callable[[RegistryClient, ImageReference], Awaitable[T]], image_ref: str) -> T:
+    async with RegistryClient(timeout=30) as client:
+        return await method(client, ImageReference.parse(image_ref))
 
 
 # ---------------------------------------------------------------------------
@@ -153,7 +150,7 @@ def _packages_from_sbom(image_ref: str, *, source_hint: str = "", python_version
     """Extract {normalized_name: version} from the SBOM attached to *image_ref*.
 
     For multi-arch manifest lists, resolves the amd64 image first.
-    Requires ``cosign`` and ``skopeo`` on PATH.
+    Requires ``cosign`` on PATH.
 
     SBOMs for workbench images are generated by squashing two Syft runs (source
     repo scan + image filesystem scan).  The source scan picks up every
@@ -344,9 +341,8 @@ def _packages_from_pip_list(image_ref: str, *, cleanup: bool) -> dict[str, str]:
     """
     import docker  # noqa: PLC0415
     import docker.errors  # noqa: PLC0415
-    import testcontainers.core.container  # noqa: PLC0415
 
-    from tests.containers import docker_utils  # noqa: PLC0415
+    from tests.containers import container_pool  # noqa: PLC0415
 
     client = docker.from_env()
 
@@ -357,23 +353,22 @@ def _packages_from_pip_list(image_ref: str, *, cleanup: bool) -> dict[str, str]:
     except docker.errors.ImageNotFound:
         was_present = False
 
-    container = testcontainers.core.container.DockerContainer(image=image_ref, user=23456, group_add=[0])
-    container.with_command("/bin/sh -c 'sleep infinity'")
+    # a pooled container would keep the image from being removed
+    remove_image = not was_present and cleanup
     try:
-        container.start()
-        ecode, output = container.exec(["python3", "-m", "pip", "list", "--format", "json"])
-        assert ecode == 0, f"pip list failed in {image_ref}: {output.decode()}"
-        pkgs = json.loads(output.decode())
-        packages = {_normalize_pip_name(p["name"]): p["version"] for p in pkgs}
+        with container_pool.lease(image_ref, user=23456, reuse=not remove_image) as container:
+            ecode, output = container.exec(["python3", "-m", "pip", "list", "--format", "json"])
+            assert ecode == 0, f"pip list failed in {image_ref}: {output.decode()}"
+            pkgs = json.loads(output.decode())
+            packages = {_normalize_pip_name(p["name"]): p["version"] for p in pkgs}
 
-        # Collect software versions via commands inside the container.
-        # These populate the same dict so _resolve_software_version can find them.
-        _collect_software_versions(container, packages)
+            # Collect software versions via commands inside the container.
+            # These populate the same dict so _resolve_software_version can find them.
+            _collect_software_versions(container, packages)
 
         return packages
     finally:
-        docker_utils.NotebookContainer(container).stop(timeout=0)
-        if not was_present and cleanup:
+        if remove_image:
             try:
                 client.images.remove(image_ref, force=True)
                 _LOG.info(f"Cleaned up pulled image {image_ref}")
@@ -582,7 +577,7 @@ def test_old_tag_annotations_match_sbom(
     subtests: pytest_subtests.SubTests,
     base_dir: pathlib.Path,
 ):
-    """Fast: validate N-1 tag annotations against SBOM artifacts (cosign + skopeo, no image pull).
+    """Fast: validate N-1 tag annotations against SBOM artifacts (cosign, no image pull).
 
     The SBOM is generated by squashing two Syft runs: a source-repo scan (all
     Pipfile.lock files in the monorepo) and an image-filesystem scan.  The
@@ -598,8 +593,8 @@ def test_old_tag_annotations_match_sbom(
     (e.g. tensorboard in pytorch images).  Prefer ``test_old_tag_annotations_match_quay``
     when an authoritative per-image check is needed.
     """
-    if not shutil.which("cosign") or not shutil.which("skopeo"):
-        pytest.skip("cosign and/or skopeo not found on PATH")
+    if not shutil.which("cosign"):
+        pytest.skip("cosign not found on PATH")
 
     for t in _iter_old_tags(base_dir):
         _LOG.info(f"Fetching SBOM for {t.is_name} tag {t.tag_name}: {t.image_ref}")
@@ -611,7 +606,7 @@ def test_old_tag_annotations_match_sbom(
         python_version = _extract_python_version(t.image_ref)
         try:
             actual_packages = _packages_from_sbom(t.image_ref, source_hint=source_hint, python_version=python_version)
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as exc:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, RegistryError) as exc:
             with subtests.test(msg=f"{t.is_name} tag {t.tag_name}: SBOM fetch"):
                 pytest.fail(f"Failed to fetch SBOM for {t.image_ref}: {exc}")
             continue
@@ -699,21 +694,14 @@ def _packages_from_quay(image_ref: str, quay_auth: str) -> dict[str, str]:
     ``AddedBy`` field (compressed layer digest) matched against the image
     manifest's layer list.
 
-    Requires ``skopeo`` on PATH for multi-arch resolution and layer ordering.
+    Multi-arch resolution and layer ordering read the manifests straight from the registry.
     """
     image_ref = _resolve_amd64(image_ref)
 
     # Get layer order from the image manifest for duplicate resolution.
     # Clair's AddedBy matches the compressed layer digests from the manifest,
     # not the uncompressed DiffIDs from the image config.
-    raw = subprocess.run(
-        ["skopeo", "inspect", "--raw", f"docker://{image_ref}"],
-        capture_output=True,
-        text=True,
-        check=True,
-        timeout=30,
-    )
-    manifest = json.loads(raw.stdout)
+    manifest = _raw_manifest(image_ref)
     layer_order: dict[str, int] = {layer["digest"]: i for i, layer in enumerate(manifest.get("layers", []))}
 
     repo, digest = _image_ref_to_quay(image_ref)
@@ -784,9 +772,6 @@ def test_old_tag_annotations_match_quay(
     quay_auth = _get_quay_auth()
     if quay_auth is None:
         pytest.skip("No quay.io auth found in ~/.docker/config.json or ~/.config/containers/auth.json")
-    if not shutil.which("skopeo"):
-        pytest.skip("skopeo not found on PATH")
-
     for t in _iter_old_tags(base_dir):
         _LOG.info(f"Fetching Quay packages for {t.is_name} tag {t.tag_name}: {t.image_ref}")
         try:
@@ -796,8 +781,7 @@ def test_old_tag_annotations_match_quay(
             ValueError,
             urllib.error.URLError,
             json.JSONDecodeError,
-            subprocess.CalledProcessError,
-            subprocess.TimeoutExpired,
+            RegistryError,
         ) as exc:
             with subtests.test(msg=f"{t.is_name} tag {t.tag_name}: Quay fetch"):
                 pytest.fail(f"Failed to fetch Quay packages for {t.image_ref}: {exc}")
@@ -0,0 +1,75 @@
+"""Long-running Python process inside a test container that executes probe functions sent to it.
+
+Tests check images by running small Python functions inside the container.
+Started once per container (see `docker_utils.ProbeAgent`), this agent keeps
+one interpreter alive, so modules imported by one probe (torch, tensorflow,
+...) are already loaded for the next.
+
+Like `elf_linkage.py`, it runs with the image's Python, so it only uses the
+standard library and keeps to Python 3.9 syntax at runtime.
+
+Protocol: one JSON request per line on stdin,
+
+    {"id": 1, "source": "def probe(x): ...", "name": "probe", "args": [42]}
+
+and one JSON response per line on stdout,
+
+    {"id": 1, "ok": true, "value": <return value>, "stdout": "<printed text>", "error": null}
+
+`error` holds the formatted traceback when the probe raised.  Whatever else is
+written to file descriptor 1 (e.g. by native libraries) is redirected to stderr
+so that it cannot corrupt the responses.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import sys
+import traceback
+
+# `container_pool` spares processes with this argument when resetting a container.
+MARKER = "--probe-agent"
+
+# Tuples bound to names, because formatting for Python 3.14 drops the parentheses of `except (A, B):`,
+# which older interpreters in the images cannot parse.
+PROBE_ERRORS = (Exception, SystemExit)
+ENCODE_ERRORS = (TypeError, ValueError)
+
+
+def run(request: dict) -> dict:
+    stdout = io.StringIO()
+    response = {"id": request.get("id"), "ok": False, "value": None, "stdout": "", "error": None}
+    try:
+        namespace = {"__name__": "__probe__"}
+        exec(compile(request["source"], "<probe {}>".format(request["name"]), "exec"), namespace)  # noqa: S102 this is what the agent is for
+        with contextlib.redirect_stdout(stdout):
+            response["value"] = namespace[request["name"]](*request.get("args", []))
+        response["ok"] = True
+    except PROBE_ERRORS:
+        response["error"] = traceback.format_exc()
+    response["stdout"] = stdout.getvalue()
+    return response
+
+
+def main() -> None:
+    responses = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+
+    for line in iter(sys.stdin.readline, ""):
+        if not line.strip():
+            continue
+        response = run(json.loads(line))
+        try:
+            encoded = json.dumps(response)
+        except ENCODE_ERRORS:
+            response["value"] = repr(response["value"])
+            encoded = json.dumps(response)
+        responses.write(encoded + "\n")
+        responses.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,8 @@ import contextlib
 
 import allure
 import pytest
-import testcontainers.core.container
 
-from tests.containers import base_image_test, conftest, docker_utils
+from tests.containers import conftest, container_pool, docker_utils
 
 
 class TestRuntimeImage:
@@ -29,14 +28,12 @@ class TestRuntimeImage:
                 context.term()
 
         with running_image(runtime_image.name) as container:
-            exit_code, output_bytes = container.exec(
-                # NOTE: /usr/bin/python3 would not find zmq, we need python3 in user's venv
-                base_image_test.encode_python_function_execution_command_interpreter("python3", check_zmq)
-            )
-
-        assert exit_code == 0, f"Python script execution failed. Output: {output_bytes}"
-        assert b"pyzmq imported and socket created successfully" in output_bytes, (
-            f"Expected success message not found in output. Output: {output_bytes}"
+            # NOTE: /usr/bin/python3 would not find zmq, we need python3 in user's venv
+            result = docker_utils.run_probe(container, check_zmq, python="python3")
+
+        assert result.ok, f"Python script execution failed. Output: {result.stdout}{result.error}"
+        assert "pyzmq imported and socket created successfully" in result.stdout, (
+            f"Expected success message not found in output. Output: {result.stdout}"
         )
 
     @allure.description("Check that feast CLI works correctly (imports pyarrow._s3fs transitively).")
@@ -70,25 +67,19 @@ class TestRuntimeImage:
                 pytest.skip(
                     "MLflow import skipped for s390x images (native stack unreliable under CI QEMU user emulation)."
                 )
-            exit_code, output_bytes = container.exec(
-                base_image_test.encode_python_function_execution_command_interpreter("python3", check_mlflow)
-            )
+            result = docker_utils.run_probe(container, check_mlflow, python="python3")
 
-        assert exit_code == 0, f"Python script execution failed. Output: {output_bytes}"
-        assert b"MLflow imported successfully" in output_bytes, (
-            f"Expected success message not found in output. Output: {output_bytes}"
+        assert result.ok, f"Python script execution failed. Output: {result.stdout}{result.error}"
+        assert "MLflow imported successfully" in result.stdout, (
+            f"Expected success message not found in output. Output: {result.stdout}"
         )
 
 
 @contextlib.contextmanager
 def running_image(image: str):
     """Usage: with running_image("quay.io/...") as container:"""
-    container = testcontainers.core.container.DockerContainer(image=image, user=23456, group_add=[0])
-    container.with_command("/bin/sh -c 'sleep infinity'")
-    try:
-        container.start()
-        yield container
-    except Exception as e:
-        pytest.fail(f"Unexpected exception in test: {e}")
-    finally:
-        docker_utils.NotebookContainer(container).stop(timeout=0)
+    with container_pool.lease(image, user=23456) as container:
+        try:
+            yield container
+        except Exception as e:
+            pytest.fail(f"Unexpected exception in test: {e}")
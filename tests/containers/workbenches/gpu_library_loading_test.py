@@ -10,11 +10,7 @@ while still validating that libraries are properly installed.
 
 from __future__ import annotations
 
-import binascii
-import inspect
-import json
 import logging
-import textwrap
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -22,9 +18,8 @@ if TYPE_CHECKING:
 
 import pydantic
 import pytest
-import testcontainers.core.container
 
-from tests.containers import conftest, docker_utils
+from tests.containers import conftest, container_pool, docker_utils
 
 
 class SymlinkCheckResult(pydantic.BaseModel):
@@ -60,22 +55,6 @@ logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 
 
-def encode_python_function(python: str, function: types.FunctionType, *args: Any) -> list[str]:
-    """Returns a cli command that will run the given Python function encoded inline."""
-    code = textwrap.dedent(inspect.getsource(function))
-    ccode = binascii.b2a_base64(code.encode())
-    name = function.__name__
-    parameters = ", ".join(repr(arg) for arg in args)
-    program = textwrap.dedent(f"""
-        import binascii;
-        s=binascii.a2b_base64("{ccode.decode("ascii").strip()}");
-        exec(s.decode());
-        result = {name}({parameters});
-        import json;
-        print("RESULT>" + json.dumps(result));""")
-    return [python, "-c", program]
-
-
 class TestGPULibraryLoading:
     """Tests that verify GPU libraries can be loaded at runtime.
 
@@ -87,33 +66,16 @@ class TestGPULibraryLoading:
         self, image: str, test_fn: types.FunctionType, env: dict[str, str] | None = None
     ) -> dict[str, Any]:
         """Run a test function inside a container and return its result."""
-        container = testcontainers.core.container.DockerContainer(image=image, user=1001, group_add=[0])
-        container.with_command("/bin/sh -c 'sleep infinity'")
-
-        if env:
-            for key, value in env.items():
-                container.with_env(key, value)
-
-        started = False
-        try:
-            container.start()
-            started = True
-            cmd = encode_python_function("/opt/app-root/bin/python3", test_fn)
-            ecode, output = container.exec(cmd)
-            LOGGER.info("Container process exited with code %s", ecode)
-            if ecode != 0:
-                LOGGER.warning("Non-zero exit code %s from container", ecode)
-
-            output_str = output.decode()
-            for line in output_str.splitlines():
-                LOGGER.debug(line)
-                if line.startswith("RESULT>"):
-                    return json.loads(line[len("RESULT>") :])
-
-            pytest.fail(f"Test function did not return a result. Exit code: {ecode}, Output: {output_str}")
-        finally:
-            if started:
-                docker_utils.NotebookContainer(container).stop(timeout=0)
+        with container_pool.lease(image, user=1001, env=env) as container:
+            try:
+                # libraries loaded by earlier probes would show up in this probe's /proc/self/maps
+                result = docker_utils.run_probe(container, test_fn, python="/opt/app-root/bin/python3", shared=False)
+            except docker_utils.ProbeError as e:
+                pytest.fail(f"Test function did not return a result: {e}")
+            LOGGER.debug(result.stdout)
+            if not result.ok:
+                pytest.fail(f"Test function raised: {result.error}")
+            return result.value
 
     @pytest.mark.parametrize("loading_mode", ["LAZY", "EAGER"])
     def test_pytorch_cuda_library_loading(self, cuda_image: str, subtests: pytest_subtests.SubTests, loading_mode: str):
@@ -661,23 +623,11 @@ class TestLibrarySymlinks:
 
             return results
 
-        container = testcontainers.core.container.DockerContainer(image=rocm_image, user=1001, group_add=[0])
-        container.with_command("/bin/sh -c 'sleep infinity'")
-
-        try:
-            container.start()
-            cmd = encode_python_function("/opt/app-root/bin/python3", check_symlinks)
-            _ecode, output = container.exec(cmd)
-
-            result = None
-            for line in output.decode().splitlines():
-                if line.startswith("RESULT>"):
-                    result = SymlinkCheckResult.model_validate(json.loads(line[len("RESULT>") :]))
-                    break
-
-            if result is None:
-                pytest.fail(f"Failed to get symlink check result: {output.decode()}")
-                return  # unreachable, but helps type narrowing
+        with container_pool.lease(rocm_image, user=1001) as container:
+            probe = docker_utils.run_probe(container, check_symlinks, python="/opt/app-root/bin/python3")
+            if not probe.ok:
+                pytest.fail(f"Failed to get symlink check result: {probe.error}")
+            result = SymlinkCheckResult.model_validate(probe.value)
 
             with subtests.test("no broken symlinks"):
                 assert len(result.broken) == 0, f"Broken symlinks: {result.broken}"
@@ -692,6 +642,3 @@ class TestLibrarySymlinks:
             LOGGER.info(f"Missing (may be optional): {result.missing}")
             if result.hipsparselt_in_rocm:
                 LOGGER.warning("hipsparselt exists in ROCm but not symlinked to torch/lib")
-
-        finally:
-            docker_utils.NotebookContainer(container).stop(timeout=0)
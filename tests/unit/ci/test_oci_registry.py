@@ -0,0 +1,150 @@
+"""Unit tests for the async OCI registry client, against a local fake registry."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, ClassVar
+
+import pytest
+
+from ci.oci_registry import OCI_INDEX, OCI_MANIFEST, ImageReference, RegistryClient, RegistryError, load_registry_auths
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+CONFIG = json.dumps({"created": "2025-01-01T00:00:00Z", "config": {"Labels": {"vcs-ref": "abc1234"}}}).encode()
+CONFIG_DIGEST = f"sha256:{hashlib.sha256(CONFIG).hexdigest()}"
+AMD64_MANIFEST = json.dumps({"mediaType": OCI_MANIFEST, "config": {"digest": CONFIG_DIGEST}, "layers": []}).encode()
+AMD64_DIGEST = f"sha256:{hashlib.sha256(AMD64_MANIFEST).hexdigest()}"
+INDEX = json.dumps(
+    {
+        "mediaType": OCI_INDEX,
+        "manifests": [
+            {"digest": "sha256:arm", "platform": {"os": "linux", "architecture": "arm64"}},
+            {"digest": AMD64_DIGEST, "platform": {"os": "linux", "architecture": "amd64"}},
+        ],
+    }
+).encode()
+
+
+class _Registry(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: ClassVar[list[tuple[str, str]]] = []
+    connections: ClassVar[set[int]] = set()
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _reply(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        type(self).requests.append((self.command, self.path))
+        type(self).connections.add(id(self.connection))
+        host = f"http://{self.headers['Host']}"
+        if self.path.startswith("/token?"):
+            self._reply(200, json.dumps({"token": "secret", "expires_in": 300}).encode())
+            return
+        if self.path.startswith("/cdn/"):
+            self._reply(200, CONFIG)
+            return
+        if self.headers.get("Authorization") != "Bearer secret":
+            challenge = f'Bearer realm="{host}/token",service="fake"'
+            self._reply(401, b"", {"WWW-Authenticate": challenge})
+            return
+        manifests = {"multi": (INDEX, OCI_INDEX), AMD64_DIGEST: (AMD64_MANIFEST, OCI_MANIFEST)}
+        reference = self.path.rsplit("/", 1)[-1]
+        if "/manifests/" in self.path and reference in manifests:
+            body, media_type = manifests[reference]
+            digest = f"sha256:{hashlib.sha256(body).hexdigest()}"
+            self._reply(200, body, {"Content-Type": media_type, "Docker-Content-Digest": digest})
+        elif self.path.endswith(f"/blobs/{CONFIG_DIGEST}"):
+            self._reply(307, b"", {"Location": f"/cdn/{CONFIG_DIGEST}"})
+        else:
+            body = json.dumps({"errors": [{"code": "MANIFEST_UNKNOWN", "message": "manifest unknown"}]}).encode()
+            self._reply(404, body, {"Content-Type": "application/json"})
+
+
+@pytest.fixture
+def registry() -> Iterator[str]:
+    _Registry.requests = []
+    _Registry.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Registry)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_config_resolves_amd64_and_shares_token(registry: str) -> None:
+    async def run() -> tuple[list[dict], int]:
+        async with RegistryClient(max_connections=4, auths={}) as client:
+            ref = ImageReference.parse(f"{registry}/org/repo:multi")
+            configs = await asyncio.gather(*(client.get_config(ref) for _ in range(10)))
+            return configs, client.token_requests
+
+    configs, token_requests = asyncio.run(run())
+    assert all(c["config"]["Labels"]["vcs-ref"] == "abc1234" for c in configs)
+    assert token_requests == 1
+    assert sum(path.startswith("/token?") for _, path in _Registry.requests) == 1
+    # keep-alive: far fewer connections than requests
+    assert len(_Registry.connections) <= 4 < len(_Registry.requests)
+
+
+def test_resolve_platform_keeps_tag(registry: str) -> None:
+    async def run() -> ImageReference:
+        async with RegistryClient(auths={}) as client:
+            return await client.resolve_platform(ImageReference.parse(f"{registry}/org/repo:multi"))
+
+    assert str(asyncio.run(run())) == f"{registry}/org/repo:multi@{AMD64_DIGEST}"
+
+
+def test_exists_uses_head(registry: str) -> None:
+    async def run() -> tuple[bool, bool]:
+        async with RegistryClient(auths={}) as client:
+            present = await client.exists(ImageReference.parse(f"{registry}/org/repo@{AMD64_DIGEST}"))
+            missing = await client.exists(ImageReference.parse(f"{registry}/org/repo:nope"))
+            return present, missing
+
+    assert asyncio.run(run()) == (True, False)
+    assert {method for method, path in _Registry.requests if "/manifests/" in path} == {"HEAD"}
+
+
+def test_missing_manifest_error_message(registry: str) -> None:
+    async def run() -> None:
+        async with RegistryClient(auths={}) as client:
+            await client.get_config(ImageReference.parse(f"{registry}/org/repo:nope"))
+
+    with pytest.raises(RegistryError, match="manifest unknown") as excinfo:
+        asyncio.run(run())
+    assert excinfo.value.status == 404
+
+
+def test_load_registry_auths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    auth_file = tmp_path / "auth.json"
+    auth_file.write_text(json.dumps({"auths": {"quay.io/org": {"auth": "first"}}}))
+    docker_config = tmp_path / ".docker" / "config.json"
+    docker_config.parent.mkdir()
+    docker_config.write_text(
+        json.dumps({"auths": {"quay.io": {"auth": "second"}, "https://index.docker.io/v1/": {"auth": "hub"}}})
+    )
+    monkeypatch.setenv("REGISTRY_AUTH_FILE", str(auth_file))
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    assert load_registry_auths() == {"quay.io": "first", "docker.io": "hub"}
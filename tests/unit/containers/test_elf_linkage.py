@@ -0,0 +1,96 @@
+"""Unit tests for the ldd-free ELF linkage scanner, on synthetic ELF files."""
+
+from __future__ import annotations
+
+import json
+import struct
+import subprocess
+import sys
+from pathlib import Path
+
+from tests.containers import elf_linkage
+
+EM_X86_64 = 62
+
+
+def _write_elf(path: Path, needed: list[str], *, rpath: str | None = None, runpath: str | None = None) -> Path:
+    """Write a minimal little-endian ELF64 shared object with just a dynamic section."""
+    strtab = b"\0"
+    dynamic: list[tuple[int, int]] = []
+    for tag, value in [
+        *((elf_linkage.DT_NEEDED, n) for n in needed),
+        (elf_linkage.DT_RPATH, rpath),
+        (elf_linkage.DT_RUNPATH, runpath),
+    ]:
+        if value is not None:
+            dynamic.append((tag, len(strtab)))
+            strtab += value.encode() + b"\0"
+    phoff, phnum = 64, 2
+    dynoff = phoff + 56 * phnum
+    dynamic += [(elf_linkage.DT_STRTAB, 0), (elf_linkage.DT_STRSZ, len(strtab)), (elf_linkage.DT_NULL, 0)]
+    stroff = dynoff + 16 * len(dynamic)
+    dynamic[-3] = (elf_linkage.DT_STRTAB, stroff)  # vaddr == file offset in the single PT_LOAD
+    size = stroff + len(strtab)
+
+    ident = elf_linkage.ELF_MAGIC + bytes([elf_linkage.ELFCLASS64, elf_linkage.ELFDATA2LSB, 1]) + bytes(9)
+    header = struct.pack("<HHIQQQIHHHHHH", 3, EM_X86_64, 1, 0, phoff, 0, 0, 64, 56, phnum, 64, 0, 0)
+    phdrs = struct.pack("<IIQQQQQQ", elf_linkage.PT_LOAD, 4, 0, 0, 0, size, size, 0x1000)
+    phdrs += struct.pack(
+        "<IIQQQQQQ", elf_linkage.PT_DYNAMIC, 4, dynoff, dynoff, dynoff, 16 * len(dynamic), 16 * len(dynamic), 8
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(ident + header + phdrs + b"".join(struct.pack("<qQ", t, v) for t, v in dynamic) + strtab)
+    path.chmod(0o755)
+    return path
+
+
+def test_read_elf(tmp_path: Path) -> None:
+    lib = _write_elf(tmp_path / "libfoo.so", ["libbar.so.1", "libbaz.so.2"], runpath="$ORIGIN/../lib:/opt/lib")
+    (tmp_path / "script.sh").write_text("#!/bin/sh\n")
+
+    info = elf_linkage.read_elf(str(lib))
+    assert info == elf_linkage.ElfInfo(
+        ident=(elf_linkage.ELFCLASS64, elf_linkage.ELFDATA2LSB, EM_X86_64),
+        needed=("libbar.so.1", "libbaz.so.2"),
+        runpath=("$ORIGIN/../lib", "/opt/lib"),
+    )
+    assert elf_linkage.read_elf(str(tmp_path / "script.sh")) is None
+    assert elf_linkage.read_elf(str(tmp_path / "missing")) is None
+
+
+def test_unresolved_follows_loader_search_order(tmp_path: Path) -> None:
+    # found through the RPATH of the main object
+    _write_elf(tmp_path / "rpath" / "libdep.so.1", ["libnested.so.1", "libcached.so.1", "libgone.so.3"])
+    # found through the RPATH of the main object too, since libdep has no RUNPATH of its own
+    _write_elf(tmp_path / "rpath" / "libnested.so.1", [])
+    # an object with a RUNPATH does not get the RPATH of the objects that loaded it
+    _write_elf(tmp_path / "runpath" / "libhalf.so.1", ["libonlyrpath.so.1"], runpath="$ORIGIN")
+    _write_elf(tmp_path / "rpath" / "libonlyrpath.so.1", [])
+    _write_elf(tmp_path / "cache" / "libcached.so.1", [])
+    _write_elf(tmp_path / "origin" / "libnear.so.1", [])
+    main = _write_elf(
+        tmp_path / "bin" / "main",
+        ["libdep.so.1", "libhalf.so.1", "libnear.so.1", "libmissing.so.2"],
+        rpath=f"{tmp_path}/rpath:$ORIGIN/../runpath",
+    )
+    (tmp_path / "bin" / "libnear.so.1").symlink_to(tmp_path / "origin" / "libnear.so.1")
+
+    resolver = elf_linkage.Resolver(
+        ["$ORIGIN"], ld_so_cache={"libcached.so.1": [str(tmp_path / "cache" / "libcached.so.1")]}
+    )
+    assert resolver.unresolved(str(main)) == ["libmissing.so.2", "libgone.so.3", "libonlyrpath.so.1"]
+
+
+def test_script_output_matches_ldd_format(tmp_path: Path) -> None:
+    _write_elf(tmp_path / "app" / "bin" / "tool", ["libnotthere.so.7"])
+    (tmp_path / "app" / "data.txt").write_text("not executable")
+
+    script = Path(elf_linkage.__file__).read_text()
+    output = subprocess.check_output([sys.executable, "-c", script, "--jobs=2", str(tmp_path / "app")], text=True)
+    prefix, result = output.strip().split(" ", 1)
+    assert prefix == "OUTPUT>"
+    assert json.loads(result) == {
+        "dir": str(tmp_path / "app"),
+        "count_scanned": 1,
+        "unsatisfied": [[str(tmp_path / "app" / "bin" / "tool"), "libnotthere.so.7 => not found"]],
+    }
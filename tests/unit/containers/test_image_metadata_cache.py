@@ -0,0 +1,86 @@
+"""Unit tests for the image metadata cache shared between pytest-xdist workers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from tests.containers import image_metadata_cache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+DIGEST_REF = "quay.io/opendatahub/workbench-images@sha256:e98d19df"
+TAG_REF = "quay.io/opendatahub/workbench-images:jupyter-minimal"
+
+
+def _counting_inspect(calls: list[str], image: str, delay: float = 0.0):
+    def inspect():
+        calls.append(image)
+        time.sleep(delay)
+        return {"id": None, "labels": {"name": image}, "env": {}}
+
+    return inspect
+
+
+def test_inspects_once_across_cache_instances(tmp_path: Path):
+    """A second process (here: a second instance on the same directory) reads the first one's result."""
+    calls: list[str] = []
+    first = image_metadata_cache.ImageMetadataCache(tmp_path)
+    second = image_metadata_cache.ImageMetadataCache(tmp_path)
+
+    assert first.get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF))["labels"] == {"name": DIGEST_REF}
+    assert first.get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF))["labels"] == {"name": DIGEST_REF}
+    assert second.get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF))["labels"] == {"name": DIGEST_REF}
+    assert calls == [DIGEST_REF]
+
+    # the same digest under another repository name is the same image
+    second.get("registry.example.com/mirror@sha256:e98d19df", _counting_inspect(calls, "mirror"))
+    assert calls == [DIGEST_REF]
+
+
+def test_concurrent_lookups_wait_for_one_inspection(tmp_path: Path):
+    calls: list[str] = []
+    results = []
+
+    def worker():
+        cache = image_metadata_cache.ImageMetadataCache(tmp_path)
+        results.append(cache.get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF, delay=0.2)))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [DIGEST_REF]
+    assert len(results) == 4
+    assert all(result == results[0] for result in results)
+
+
+def test_tag_entries_expire(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    calls: list[str] = []
+    image_metadata_cache.ImageMetadataCache(tmp_path).get(TAG_REF, _counting_inspect(calls, TAG_REF))
+    image_metadata_cache.ImageMetadataCache(tmp_path).get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF))
+
+    later = time.time() + image_metadata_cache.TAG_MAX_AGE + 1
+    monkeypatch.setattr(image_metadata_cache.time, "time", lambda: later)
+    image_metadata_cache.ImageMetadataCache(tmp_path).get(TAG_REF, _counting_inspect(calls, TAG_REF))
+    image_metadata_cache.ImageMetadataCache(tmp_path).get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF))
+
+    assert calls == [TAG_REF, DIGEST_REF, TAG_REF]
+
+
+def test_corrupted_file_is_reinspected(tmp_path: Path):
+    calls: list[str] = []
+    image_metadata_cache.ImageMetadataCache(tmp_path).get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF))
+    (json_file,) = tmp_path.glob("*.json")
+    json_file.write_text("{")
+
+    metadata = image_metadata_cache.ImageMetadataCache(tmp_path).get(DIGEST_REF, _counting_inspect(calls, DIGEST_REF))
+
+    assert metadata["labels"] == {"name": DIGEST_REF}
+    assert calls == [DIGEST_REF, DIGEST_REF]
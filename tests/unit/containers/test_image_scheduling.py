@@ -0,0 +1,45 @@
+"""Unit tests for ordering container tests into per-image groups."""
+
+from __future__ import annotations
+
+import types
+
+from tests.containers import image_scheduling
+
+
+def _item(name: str, image: str | None) -> types.SimpleNamespace:
+    if image is None:
+        return types.SimpleNamespace(nodeid=f"test.py::{name}")
+    return types.SimpleNamespace(
+        nodeid=f"test.py::{name}[{image}]", callspec=types.SimpleNamespace(params={"image": image})
+    )
+
+
+def test_groups_by_image_most_expensive_first():
+    items = [
+        _item("test_a", "minimal"),
+        _item("test_a", "cuda"),
+        _item("test_plain", None),
+        _item("test_b", "minimal"),
+        _item("test_b", "cuda"),
+    ]
+    durations = {"test.py::test_a[cuda]": 300.0, "test.py::test_a[minimal]": 2.0, "test.py::test_b[minimal]": 2.0}
+
+    images = image_scheduling.order_by_image(items, durations)
+
+    assert images == ["cuda", "minimal"]
+    assert [item.nodeid for item in items] == [
+        "test.py::test_plain",
+        "test.py::test_a[cuda]",
+        "test.py::test_b[cuda]",
+        "test.py::test_a[minimal]",
+        "test.py::test_b[minimal]",
+    ]
+
+
+def test_unknown_tests_cost_the_median_duration():
+    items = [_item("test_new", "rocm"), _item("test_new", "minimal"), _item("test_old", "minimal")]
+    durations = {"test.py::test_old[minimal]": 1.0, "test.py::test_other[x]": 5.0, "test.py::test_other[y]": 100.0}
+
+    # rocm: 5 (median) < minimal: 5 (median) + 1
+    assert image_scheduling.order_by_image(items, durations) == ["minimal", "rocm"]
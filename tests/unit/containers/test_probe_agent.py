@@ -0,0 +1,167 @@
+"""Unit tests for the probe agent protocol, with a local process in place of a container exec."""
+
+from __future__ import annotations
+
+import socket as pysocket
+import struct
+import subprocess
+import sys
+import threading
+import types
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tests.containers import docker_utils
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import IO
+
+
+class LocalExecApi:
+    """The part of docker's low-level API that `ProbeAgent` uses, running the command as a local process.
+
+    Like a non-tty `exec_start(socket=True)`, the returned socket takes the
+    process' stdin and delivers its stdout and stderr as multiplexed frames.
+    """
+
+    def __init__(self) -> None:
+        self.cmd: list[str] = []
+        self.processes: list[subprocess.Popen] = []
+
+    def exec_create(self, container: str, cmd: list[str], **kwargs: object) -> dict[str, str]:
+        self.cmd = cmd
+        return {"Id": f"exec-{len(self.processes)}"}
+
+    def exec_start(self, exec_id: str, socket: bool, tty: bool) -> pysocket.socket:
+        ours, theirs = pysocket.socketpair()
+        # the agent runs with the local interpreter instead of the image's one
+        process = subprocess.Popen(
+            [sys.executable, *self.cmd[1:]], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        self.processes.append(process)
+        send_lock = threading.Lock()
+        outputs = [
+            threading.Thread(target=_send_frames, args=(process.stdout, 1, theirs, send_lock), daemon=True),
+            threading.Thread(target=_send_frames, args=(process.stderr, 2, theirs, send_lock), daemon=True),
+        ]
+        for thread in outputs:
+            thread.start()
+        threading.Thread(target=_forward_stdin, args=(theirs, process), daemon=True).start()
+        threading.Thread(target=_end_output, args=(theirs, outputs), daemon=True).start()
+        return ours
+
+
+def _send_frames(pipe: IO[bytes], stream_type: int, sock: pysocket.socket, lock: threading.Lock) -> None:
+    # https://docs.docker.com/reference/api/engine/version/v1.47/#tag/Container/operation/ContainerAttach
+    while chunk := pipe.read1(4096):
+        with lock:
+            sock.sendall(struct.pack(">BxxxL", stream_type, len(chunk)) + chunk)
+
+
+def _forward_stdin(sock: pysocket.socket, process: subprocess.Popen) -> None:
+    try:
+        while data := sock.recv(4096):
+            process.stdin.write(data)
+            process.stdin.flush()
+        process.stdin.close()
+    except OSError:
+        pass  # the process or the socket is gone
+
+
+def _end_output(sock: pysocket.socket, outputs: list[threading.Thread]) -> None:
+    """Once the process has closed its stdout and stderr, the reading side of the socket sees EOF."""
+    for thread in outputs:
+        thread.join()
+    sock.shutdown(pysocket.SHUT_WR)
+
+
+@pytest.fixture
+def exec_api() -> Iterator[LocalExecApi]:
+    api = LocalExecApi()
+    yield api
+    for process in api.processes:
+        process.kill()
+        process.wait()
+
+
+@pytest.fixture
+def container(exec_api: LocalExecApi) -> Iterator[types.SimpleNamespace]:
+    """Stands in for a testcontainers container and the docker container it wraps."""
+    wrapped = types.SimpleNamespace(id="container-id", client=types.SimpleNamespace(api=exec_api))
+    yield types.SimpleNamespace(get_wrapped_container=lambda: wrapped)
+    docker_utils.close_probe_agents(wrapped)
+
+
+def add(a, b):
+    print("adding", a, b)
+    return a + b
+
+
+def noisy():
+    import os
+
+    # e.g. a native library writing to file descriptor 1 directly
+    os.write(1, b"not a response\n")
+    return "quiet"
+
+
+def remember():
+    import sys
+
+    sys.probe_was_here = getattr(sys, "probe_was_here", 0) + 1
+    return sys.probe_was_here
+
+
+def fail():
+    raise ValueError("probe failed")
+
+
+def unserializable():
+    return {1, 2}
+
+
+def crash():
+    import os
+
+    os._exit(3)
+
+
+def test_probe_result_and_output(container: types.SimpleNamespace):
+    result = docker_utils.run_probe(container, add, 1, 2)
+
+    assert result.ok
+    assert result.value == 3
+    assert result.stdout == "adding 1 2\n"
+    assert result.error is None
+
+
+def test_stray_output_does_not_break_the_protocol(container: types.SimpleNamespace):
+    assert docker_utils.run_probe(container, noisy).value == "quiet"
+    assert docker_utils.run_probe(container, add, 2, 2).value == 4
+
+
+def test_errors_and_unserializable_values(container: types.SimpleNamespace):
+    failed = docker_utils.run_probe(container, fail)
+    assert not failed.ok
+    assert "ValueError: probe failed" in failed.error
+
+    assert docker_utils.run_probe(container, unserializable).value == "{1, 2}"
+
+
+def test_shared_agent_keeps_interpreter_state(container: types.SimpleNamespace, exec_api: LocalExecApi):
+    assert docker_utils.run_probe(container, remember).value == 1
+    assert docker_utils.run_probe(container, remember).value == 2
+    assert docker_utils.run_probe(container, remember, shared=False).value == 1
+    assert len(exec_api.processes) == 2
+    # the unshared agent is stopped after its probe
+    assert exec_api.processes[1].wait(timeout=10) == 0
+
+
+def test_crashed_agent_is_restarted(container: types.SimpleNamespace, exec_api: LocalExecApi):
+    with pytest.raises(docker_utils.ProbeError, match="probe agent exited"):
+        docker_utils.run_probe(container, crash)
+
+    assert docker_utils.run_probe(container, add, 1, 1).value == 2
+    assert len(exec_api.processes) == 2
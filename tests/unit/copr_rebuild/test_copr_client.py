@@ -0,0 +1,146 @@
+"""Unit tests for reading build states and durations from ``copr-cli list-builds``."""
+
+from __future__ import annotations
+
+import subprocess
+
+import pytest
+import stamina
+from copr_rebuild import copr_client
+from copr_rebuild.copr_client import CoprClient, CoprCliError
+
+PROJECT = "opendatahub/rhelai-el9"
+
+# `copr-cli list-builds --output-format json opendatahub/rhelai-el9`, trimmed to a few builds
+LIST_BUILDS = """\
+[
+    {
+        "chroots": ["epel-9-x86_64"],
+        "ended_on": 1750843512,
+        "id": 9211001,
+        "is_finished": true,
+        "ownername": "opendatahub",
+        "project_dirname": "rhelai-el9",
+        "projectname": "rhelai-el9",
+        "repo_url": "https://download.copr.fedorainfracloud.org/results/opendatahub/rhelai-el9",
+        "source_package": {
+            "name": "hdf5",
+            "url": "https://download.copr.fedorainfracloud.org/results/opendatahub/rhelai-el9/srpm-builds/09211001/hdf5-1.14.6-7.fc44.src.rpm",
+            "version": "1.14.6-7.fc44"
+        },
+        "started_on": 1750842912,
+        "state": "succeeded",
+        "submitted_on": 1750842800,
+        "submitter": "opendatahub"
+    },
+    {
+        "chroots": ["epel-9-x86_64"],
+        "ended_on": 1750850000,
+        "id": 9211050,
+        "is_finished": true,
+        "ownername": "opendatahub",
+        "project_dirname": "rhelai-el9",
+        "projectname": "rhelai-el9",
+        "repo_url": "https://download.copr.fedorainfracloud.org/results/opendatahub/rhelai-el9",
+        "source_package": {
+            "name": "hdf5",
+            "url": "https://download.copr.fedorainfracloud.org/results/opendatahub/rhelai-el9/srpm-builds/09211050/hdf5-1.14.6-7.fc44.src.rpm",
+            "version": "1.14.6-7.fc44"
+        },
+        "started_on": 1750849100,
+        "state": "succeeded",
+        "submitted_on": 1750849000,
+        "submitter": "opendatahub"
+    },
+    {
+        "chroots": ["epel-9-x86_64"],
+        "ended_on": 1750849900,
+        "id": 9211051,
+        "is_finished": true,
+        "ownername": "opendatahub",
+        "project_dirname": "rhelai-el9",
+        "projectname": "rhelai-el9",
+        "repo_url": "https://download.copr.fedorainfracloud.org/results/opendatahub/rhelai-el9",
+        "source_package": {
+            "name": "openblas",
+            "url": "https://download.copr.fedorainfracloud.org/results/opendatahub/rhelai-el9/srpm-builds/09211051/openblas-0.3.29-1.fc44.src.rpm",
+            "version": "0.3.29-1.fc44"
+        },
+        "started_on": 1750849200,
+        "state": "failed",
+        "submitted_on": 1750849000,
+        "submitter": "opendatahub"
+    },
+    {
+        "chroots": ["epel-9-x86_64"],
+        "ended_on": null,
+        "id": 9211052,
+        "is_finished": false,
+        "ownername": "opendatahub",
+        "project_dirname": "rhelai-el9",
+        "projectname": "rhelai-el9",
+        "repo_url": "https://download.copr.fedorainfracloud.org/results/opendatahub/rhelai-el9",
+        "source_package": {
+            "name": null,
+            "url": null,
+            "version": null
+        },
+        "started_on": null,
+        "state": "importing",
+        "submitted_on": 1750849010,
+        "submitter": "opendatahub"
+    }
+]
+"""
+
+
+class FakeCoprCli:
+    """Answers `copr-cli` commands from captured output and records them."""
+
+    def __init__(self, outputs: dict[str, str]) -> None:
+        self.outputs = outputs
+        self.commands: list[list[str]] = []
+
+    def __call__(self, cmd: list[str], **kwargs: object) -> subprocess.CompletedProcess[str]:
+        self.commands.append(cmd)
+        stdout = self.outputs.get(" ".join(cmd))
+        if stdout is None:
+            return subprocess.CompletedProcess(cmd, 1, "", "Error: Build does not exist")
+        return subprocess.CompletedProcess(cmd, 0, stdout, "")
+
+
+@pytest.fixture
+def copr_cli(monkeypatch: pytest.MonkeyPatch) -> FakeCoprCli:
+    cli = FakeCoprCli(
+        {
+            f"copr-cli list-builds --output-format json {PROJECT}": LIST_BUILDS,
+            "copr-cli status 9211099": "pending\n",
+        }
+    )
+    monkeypatch.setattr(copr_client.subprocess, "run", cli)
+    return cli
+
+
+def test_build_statuses_from_one_listing(copr_cli: FakeCoprCli) -> None:
+    statuses = CoprClient(PROJECT).get_build_statuses([9211050, 9211051, 9211052])
+
+    assert statuses == {9211050: "succeeded", 9211051: "failed", 9211052: "importing"}
+    assert copr_cli.commands == [["copr-cli", "list-builds", "--output-format", "json", PROJECT]]
+
+
+def test_builds_missing_from_listing_are_queried_directly(copr_cli: FakeCoprCli) -> None:
+    statuses = CoprClient(PROJECT).get_build_statuses([9211099, 9211001])
+
+    assert statuses == {9211001: "succeeded", 9211099: "pending"}
+    assert copr_cli.commands[1:] == [["copr-cli", "status", "9211099"]]
+
+
+def test_listing_errors_are_retried_then_raised(copr_cli: FakeCoprCli) -> None:
+    with stamina.set_testing(True, attempts=2), pytest.raises(CoprCliError):
+        CoprClient("opendatahub/missing").get_build_statuses([9211001])
+    assert len(copr_cli.commands) == 2
+
+
+def test_durations_of_latest_succeeded_builds(copr_cli: FakeCoprCli) -> None:
+    # the later hdf5 build wins; failed and unfinished builds have no duration
+    assert CoprClient(PROJECT).get_build_durations() == {"hdf5": pytest.approx(900.0)}
@@ -0,0 +1,189 @@
+"""Unit tests for the Koji client: batched multicalls and the on-disk metadata cache, against a fake hub."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any, override
+
+import koji
+import pytest
+from copr_rebuild import koji_client
+from copr_rebuild.koji_client import DEP_BUILDREQUIRES, DEP_PROVIDES, DEP_REQUIRES, KojiClient
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+HUB_URL = "https://koji.example.com/kojihub"
+
+
+class FakeHub:
+    """Koji hub data (builds, their RPMs and the RPMs' deps), answering the multicalls of a stub ClientSession."""
+
+    def __init__(self) -> None:
+        self.builds: dict[str, dict[str, Any]] = {}
+        self.rpms: dict[int, list[dict[str, Any]]] = {}
+        self.deps: dict[int, list[dict[str, Any]]] = {}
+        # method names of each multicall request
+        self.multicalls: list[list[str]] = []
+
+    def add_build(
+        self, name: str, *, build_requires: list[str] | None = None, binaries: dict[str, list[str]] | None = None
+    ) -> str:
+        """Add a build with an SRPM and binary RPMs (name -> provides); returns its NVR."""
+        build_id = len(self.builds) + 1
+        build = {"id": build_id, "name": name, "version": "1.0", "release": "1.fc44", "volume_name": "DEFAULT"}
+        build["nvr"] = nvr = f"{name}-1.0-1.fc44"
+        self.builds[nvr] = build
+        self.rpms[build_id] = []
+        for rpm_name, arch, deps in [
+            (name, "src", [(n, DEP_BUILDREQUIRES) for n in ["rpmlib(CompressedFileNames)", *(build_requires or [])]]),
+            *((rpm, "x86_64", [(n, DEP_PROVIDES) for n in provides]) for rpm, provides in (binaries or {}).items()),
+        ]:
+            rpm_id = 100 * build_id + len(self.rpms[build_id])
+            self.rpms[build_id].append(
+                {"id": rpm_id, "name": rpm_name, "version": "1.0", "release": "1.fc44", "arch": arch}
+            )
+            # Requires are listed too, with another type
+            self.deps[rpm_id] = [{"name": n, "type": t} for n, t in deps] + [{"name": "bash", "type": DEP_REQUIRES}]
+        return nvr
+
+    def call(self, method: str, args: tuple, kwargs: dict[str, Any]) -> Any:
+        if method == "getBuild":
+            return self.builds.get(args[0])
+        if method == "listRPMs":
+            return self.rpms[kwargs["buildID"]]
+        if method == "getRPMDeps":
+            if args[0] not in self.deps:
+                raise koji.GenericError(f"No such rpm: {args[0]}")
+            deps = self.deps[args[0]]
+            return [d for d in deps if d["type"] == kwargs["depType"]] if "depType" in kwargs else deps
+        raise koji.GenericError(f"Invalid method: {method}")
+
+    def session_class(self) -> type[koji.ClientSession]:
+        hub = self
+
+        class StubSession(koji.ClientSession):
+            @override
+            def _callMethod(self, name: str, args: tuple, kwargs: dict | None = None, retry: bool = True) -> Any:
+                assert name == "multiCall"
+                (calls,) = args
+                hub.multicalls.append([call["methodName"] for call in calls])
+                results: list[Any] = []
+                for call in calls:
+                    call_args, call_kwargs = koji.decode_args(*call["params"])
+                    try:
+                        results.append([hub.call(call["methodName"], call_args, call_kwargs)])
+                    except koji.GenericError as e:
+                        results.append({"faultCode": e.faultCode, "faultString": str(e)})
+                return results
+
+        return StubSession
+
+
+@pytest.fixture
+def hub(monkeypatch: pytest.MonkeyPatch) -> FakeHub:
+    hub = FakeHub()
+    monkeypatch.setattr(koji_client.koji, "ClientSession", hub.session_class())
+    return hub
+
+
+class TestMulticall:
+    def test_metadata_from_three_rounds(self, hub: FakeHub) -> None:
+        hdf5 = hub.add_build(
+            "hdf5",
+            build_requires=["zlib-devel", "gcc"],
+            binaries={"hdf5": ["hdf5", "libhdf5.so.310()(64bit)"], "hdf5-devel": ["hdf5-devel"]},
+        )
+        zlib = hub.add_build("zlib", binaries={"zlib-devel": ["zlib-devel", "pkgconfig(zlib)"]})
+
+        metadata = KojiClient(HUB_URL).get_packages_metadata([hdf5, zlib])
+
+        assert list(metadata) == [hdf5, zlib]
+        assert metadata[hdf5].name == "hdf5"
+        assert metadata[hdf5].build_requires == {"zlib-devel", "gcc"}
+        assert metadata[hdf5].provides == {"hdf5", "libhdf5.so.310()(64bit)", "hdf5-devel"}
+        assert (
+            metadata[hdf5].srpm_url
+            == "https://kojipkgs.fedoraproject.org/packages/hdf5/1.0/1.fc44/src/hdf5-1.0-1.fc44.src.rpm"
+        )
+        assert metadata[zlib].provides == {"zlib-devel", "pkgconfig(zlib)"}
+        assert hub.multicalls == [["getBuild"] * 2, ["listRPMs"] * 2, ["getRPMDeps"] * 5]
+
+    def test_batches_keep_call_order(self, hub: FakeHub, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(koji_client, "MULTICALL_BATCH_SIZE", 2)
+        nvrs = [hub.add_build(f"pkg{i}") for i in range(5)]
+
+        builds = KojiClient(HUB_URL)._multicall([("getBuild", (nvr,), {}) for nvr in nvrs])
+
+        assert [build["nvr"] for build in builds] == nvrs
+        assert sorted(len(names) for names in hub.multicalls) == [1, 2, 2]
+
+    def test_partial_fault_raises_after_the_whole_batch(self, hub: FakeHub) -> None:
+        nvr = hub.add_build("zlib", binaries={"zlib": ["zlib"]})
+        (srpm, binary) = hub.rpms[hub.builds[nvr]["id"]]
+        calls = [("getRPMDeps", (srpm["id"],), {}), ("getRPMDeps", (999,), {}), ("getRPMDeps", (binary["id"],), {})]
+
+        with pytest.raises(koji.GenericError, match="No such rpm: 999"):
+            KojiClient(HUB_URL)._call_batch(calls)
+
+        # strict=False: the calls after the fault were still answered in the same request
+        assert hub.multicalls == [["getRPMDeps"] * 3]
+
+    def test_missing_build(self, hub: FakeHub) -> None:
+        nvr = hub.add_build("zlib")
+        with pytest.raises(ValueError, match=re.escape("No such build in Koji: gone-1.0-1.fc44")):
+            KojiClient(HUB_URL).get_packages_metadata([nvr, "gone-1.0-1.fc44"])
+
+    def test_build_without_srpm(self, hub: FakeHub) -> None:
+        nvr = hub.add_build("zlib", binaries={"zlib": ["zlib"]})
+        hub.rpms[hub.builds[nvr]["id"]].pop(0)
+        with pytest.raises(ValueError, match=re.escape(f"No SRPM found for build {nvr}")):
+            KojiClient(HUB_URL).get_package_metadata(nvr)
+
+
+class TestCache:
+    def test_hits_and_misses(self, hub: FakeHub, tmp_path: Path) -> None:
+        zlib = hub.add_build("zlib", binaries={"zlib": ["zlib"]})
+        hdf5 = hub.add_build("hdf5", build_requires=["zlib-devel"])
+        first = KojiClient(HUB_URL, tmp_path).get_package_metadata(zlib)
+        hub.multicalls.clear()
+
+        metadata = KojiClient(HUB_URL, tmp_path).get_packages_metadata([hdf5, zlib])
+
+        assert metadata[zlib] == first
+        assert metadata[hdf5].build_requires == {"zlib-devel"}
+        # only hdf5 was queried
+        assert hub.multicalls == [["getBuild"], ["listRPMs"], ["getRPMDeps"]]
+        assert {path.name for path in (tmp_path / "koji.example.com").iterdir()} == {f"{zlib}.json", f"{hdf5}.json"}
+
+    def test_refresh_requeries_and_overwrites(self, hub: FakeHub, tmp_path: Path) -> None:
+        nvr = hub.add_build("zlib", binaries={"zlib": ["zlib"]})
+        KojiClient(HUB_URL, tmp_path).get_package_metadata(nvr)
+        hub.deps[hub.rpms[hub.builds[nvr]["id"]][1]["id"]].append({"name": "libz.so.1()(64bit)", "type": DEP_PROVIDES})
+        hub.multicalls.clear()
+
+        assert KojiClient(HUB_URL, tmp_path).get_package_metadata(nvr).provides == {"zlib"}
+        assert hub.multicalls == []
+
+        assert KojiClient(HUB_URL, tmp_path, refresh=True).get_package_metadata(nvr).provides == {
+            "zlib",
+            "libz.so.1()(64bit)",
+        }
+        assert KojiClient(HUB_URL, tmp_path).get_package_metadata(nvr).provides == {"zlib", "libz.so.1()(64bit)"}
+        assert len(hub.multicalls) == 3
+
+    def test_unreadable_entry_is_a_miss(self, hub: FakeHub, tmp_path: Path) -> None:
+        nvr = hub.add_build("zlib")
+        KojiClient(HUB_URL, tmp_path).get_package_metadata(nvr)
+        (tmp_path / "koji.example.com" / f"{nvr}.json").write_text("{")
+        hub.multicalls.clear()
+
+        assert KojiClient(HUB_URL, tmp_path).get_package_metadata(nvr).nvr == nvr
+        assert len(hub.multicalls) == 3
+
+    def test_no_cache_dir(self, hub: FakeHub) -> None:
+        nvr = hub.add_build("zlib")
+        client = KojiClient(HUB_URL)
+        client.get_package_metadata(nvr)
+        client.get_package_metadata(nvr)
+        assert len(hub.multicalls) == 6
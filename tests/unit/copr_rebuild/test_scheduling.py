@@ -0,0 +1,179 @@
+"""Unit tests for Copr build ordering: dependency edges, schedule estimates and the dependency scheduler."""
+
+from __future__ import annotations
+
+import pytest
+from copr_rebuild import copr_client
+from copr_rebuild.copr_client import CoprBuildError, DependencyScheduler
+from copr_rebuild.dependency_resolver import compute_build_waves, compute_dependencies, estimate_schedule
+from copr_rebuild.models import BuildWave, PackageMetadata
+
+# a <- b, a <- c, (b, c) <- d
+DIAMOND = {"a": frozenset(), "b": frozenset({"a"}), "c": frozenset({"a"}), "d": frozenset({"b", "c"})}
+
+
+def _package(name: str, build_requires: set[str] | None = None) -> PackageMetadata:
+    return PackageMetadata(
+        name=name,
+        nvr=f"{name}-1.0-1.fc44",
+        srpm_id=1,
+        srpm_url=f"https://koji.example.com/{name}-1.0-1.fc44.src.rpm",
+        provides=frozenset({name, f"{name}-devel", f"pkgconfig({name})"}),
+        build_requires=frozenset(build_requires or ()),
+    )
+
+
+def _url(name: str) -> str:
+    return f"https://koji.example.com/{name}.src.rpm"
+
+
+class FakeCopr:
+    """Stands in for CoprClient: numbers submissions and reports scripted statuses, one dict per polling round."""
+
+    def __init__(self, rounds: list[dict[str, str]]) -> None:
+        self.rounds = rounds
+        self.submitted: dict[str, tuple[int, int | None, bool]] = {}
+        self.names: dict[int, str] = {}
+
+    def _submit(self, url: str, after_build_id: int | None, custom: bool) -> int:
+        name = url.removeprefix("https://koji.example.com/").removesuffix(".src.rpm")
+        build_id = 100 + len(self.submitted)
+        self.submitted[name] = (build_id, after_build_id, custom)
+        self.names[build_id] = name
+        return build_id
+
+    def submit_build(self, url: str, *, timeout: int | None = None, after_build_id: int | None = None) -> int:
+        return self._submit(url, after_build_id, custom=False)
+
+    def submit_custom_build(self, url: str, *, timeout: int | None = None, after_build_id: int | None = None) -> int:
+        return self._submit(url, after_build_id, custom=True)
+
+    def get_build_statuses(self, build_ids: list[int]) -> dict[int, str]:
+        statuses = self.rounds.pop(0)
+        return {bid: statuses.get(self.names[bid], "running") for bid in build_ids}
+
+    def after(self, name: str) -> str | None:
+        """Name of the build that `name` was chained after."""
+        after_build_id = self.submitted[name][1]
+        return self.names[after_build_id] if after_build_id is not None else None
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(copr_client.time, "sleep", lambda _: None)
+
+
+def _scheduler(copr: FakeCopr, dependencies: dict[str, frozenset[str]], **kwargs) -> DependencyScheduler:
+    priority = [name for wave in compute_waves(dependencies) for name in wave]
+    return DependencyScheduler(copr, {name: _url(name) for name in dependencies}, dependencies, priority, **kwargs)
+
+
+def compute_waves(dependencies: dict[str, frozenset[str]]) -> list[list[str]]:
+    packages = {name: _package(name, {f"{dep}-devel" for dep in deps}) for name, deps in dependencies.items()}
+    return [wave.packages for wave in compute_build_waves(packages)]
+
+
+class TestComputeDependencies:
+    def test_edges_through_provides(self) -> None:
+        packages = {
+            "a": _package("a"),
+            "b": _package("b", {"a-devel", "gcc"}),
+            "c": _package("c", {"pkgconfig(a)", "c"}),
+            "d": _package("d", {"b", "c-devel", "python3-devel"}),
+        }
+        assert compute_dependencies(packages) == DIAMOND
+
+    def test_fan_in(self) -> None:
+        packages = {name: _package(name) for name in ("x", "y", "z")}
+        packages["sink"] = _package("sink", {"x", "y-devel", "pkgconfig(z)"})
+        assert compute_dependencies(packages)["sink"] == {"x", "y", "z"}
+
+
+class TestEstimateSchedule:
+    def test_critical_path_of_diamond(self) -> None:
+        waves = [
+            BuildWave(index=0, packages=["a"]),
+            BuildWave(index=1, packages=["b", "c"]),
+            BuildWave(index=2, packages=["d"]),
+        ]
+        estimate = estimate_schedule(waves, DIAMOND, {"a": 10.0, "b": 100.0, "c": 5.0, "d": 1.0})
+
+        assert estimate.start == {"a": 0.0, "b": 10.0, "c": 10.0, "d": 110.0}
+        assert estimate.critical_path == ["a", "b", "d"]
+        assert estimate.makespan == pytest.approx(111.0)
+        assert estimate.wave_makespan == pytest.approx(111.0)
+        assert estimate.priority == ["a", "b", "c", "d"]
+
+    def test_fan_in_beats_waves(self) -> None:
+        # z only waits for y, not for the slow x in the same wave
+        dependencies = {"x": frozenset(), "y": frozenset(), "z": frozenset({"y"})}
+        waves = [BuildWave(index=0, packages=["x", "y"]), BuildWave(index=1, packages=["z"])]
+        estimate = estimate_schedule(waves, dependencies, {"x": 100.0, "y": 1.0, "z": 1.0})
+
+        assert estimate.start["z"] == pytest.approx(1.0)
+        assert estimate.makespan == pytest.approx(100.0)
+        assert estimate.wave_makespan == pytest.approx(101.0)
+        assert estimate.critical_path == ["x"]
+        assert estimate.priority == ["x", "y", "z"]
+
+    def test_unknown_durations_use_median(self) -> None:
+        dependencies = {name: frozenset() for name in ("a", "b", "c", "new")}
+        waves = [BuildWave(index=0, packages=sorted(dependencies))]
+        estimate = estimate_schedule(waves, dependencies, {"a": 10.0, "b": 20.0, "c": 30.0})
+        assert estimate.durations["new"] == pytest.approx(20.0)
+
+        estimate = estimate_schedule(waves, dependencies, {})
+        assert set(estimate.durations.values()) == {3600.0}
+
+
+class TestDependencyScheduler:
+    def test_diamond_holds_back_build_with_two_chains(self) -> None:
+        copr = FakeCopr([{"a": "succeeded", "b": "succeeded"}, {"a": "succeeded", "b": "succeeded", "c": "succeeded"}])
+        copr.rounds.append(dict.fromkeys(DIAMOND, "succeeded"))
+        scheduler = _scheduler(copr, DIAMOND)
+
+        scheduler.submit_ready({})
+        # d needs b and c, which are on different chains after a
+        assert list(copr.submitted) == ["a", "b", "c"]
+        assert copr.after("a") is None
+        assert copr.after("b") == "a"
+        assert copr.after("c") == "a"
+
+        build_ids = scheduler.run([["a"], ["b", "c"], ["d"]])
+
+        # once b succeeded, only c is left, so d chains after c
+        assert copr.after("d") == "c"
+        assert build_ids == {name: submitted[0] for name, submitted in copr.submitted.items()}
+
+    def test_dependencies_on_one_chain_are_submitted_upfront(self) -> None:
+        # c needs a and b, but b already waits for a
+        dependencies = {"a": frozenset(), "b": frozenset({"a"}), "c": frozenset({"a", "b"})}
+        copr = FakeCopr([dict.fromkeys(dependencies, "succeeded")])
+        scheduler = _scheduler(copr, dependencies, skip_tests_names=frozenset({"b"}))
+
+        scheduler.run([["a"], ["b"], ["c"]])
+
+        assert copr.after("c") == "b"
+        assert [custom for _, _, custom in copr.submitted.values()] == [False, True, False]
+
+    def test_fan_in_waits_for_succeeded_chains(self) -> None:
+        dependencies = {"x": frozenset(), "y": frozenset(), "z": frozenset(), "sink": frozenset({"x", "y", "z"})}
+        copr = FakeCopr([{"x": "succeeded"}, {"x": "succeeded", "y": "succeeded"}])
+        copr.rounds.append(dict.fromkeys(dependencies, "succeeded"))
+        scheduler = _scheduler(copr, dependencies)
+
+        scheduler.run([["x", "y", "z"], ["sink"]])
+
+        assert copr.after("sink") == "z"
+        assert list(copr.submitted) == ["x", "y", "z", "sink"]
+
+    def test_fails_fast_without_queueing_dependents(self) -> None:
+        copr = FakeCopr([{"a": "succeeded", "b": "failed", "c": "succeeded"}])
+        scheduler = _scheduler(copr, DIAMOND)
+
+        with pytest.raises(CoprBuildError) as excinfo:
+            scheduler.run([["a"], ["b", "c"], ["d"]])
+
+        assert excinfo.value.build_id == copr.submitted["b"][0]
+        assert excinfo.value.status == "failed"
+        assert "d" not in copr.submitted
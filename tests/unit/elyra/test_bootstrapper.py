@@ -0,0 +1,107 @@
+"""Unit tests for the install plan of the vendored Elyra KFP bootstrapper."""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tests import PROJECT_ROOT
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import ModuleType
+
+BOOTSTRAPPER = PROJECT_ROOT / "prefetch-input/elyra-v4.3.1/elyra/kfp/bootstrapper.py"
+PYTHON = f"{sys.version_info.major}.{sys.version_info.minor}"
+
+
+@pytest.fixture
+def bootstrapper(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    """A fresh copy of the module, with its install plan in `tmp_path` and `tmp_path` as working directory."""
+    spec = importlib.util.spec_from_file_location("elyra_bootstrapper", BOOTSTRAPPER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "install_plan_file", str(tmp_path / "elyra-install-plan.json"))
+    monkeypatch.setattr(
+        module.OpUtil, "determine_elyra_requirements", classmethod(lambda cls: "requirements-elyra.txt")
+    )
+    monkeypatch.chdir(tmp_path)
+    return module
+
+
+@pytest.fixture
+def pip_calls(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    calls: list[list[str]] = []
+    monkeypatch.setattr(subprocess, "run", lambda args, **kwargs: calls.append(args[3:]))
+    return calls
+
+
+def _write_plan(path: Path, **plan: object) -> None:
+    path.write_text(json.dumps({"python": PYTHON, "installed": {}, "to_install": [], **plan}))
+
+
+def test_packages_to_install(bootstrapper: ModuleType) -> None:
+    required = {"older": "2.0", "newer": "1.0", "same": "1.0", "missing": "1.0", "editable": "1.0", "git": "1.0"}
+    installed = {"older": "1.5", "newer": "1.1", "same": "1.0", "editable": None, "git": "git+https://example.com"}
+
+    assert bootstrapper.OpUtil.packages_to_install(required, installed) == ["older==2.0", "missing==1.0"]
+
+
+def test_written_plan_is_loaded(bootstrapper: ModuleType, tmp_path: Path) -> None:
+    (tmp_path / "requirements-elyra.txt").write_text("# comment\npackaging==1.0\nnot-installed-package==1.0\n")
+
+    bootstrapper.OpUtil.write_install_plan("requirements-elyra.txt", bootstrapper.install_plan_file)
+    plan = bootstrapper.OpUtil.load_install_plan()
+
+    assert plan["python"] == PYTHON
+    assert "packaging" in plan["installed"]
+    assert plan["to_install"] == ["not-installed-package==1.0"]
+    assert not bootstrapper.OpUtil.install_plan_satisfies(plan, "requirements-elyra.txt")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        json.dumps({"python": "2.7", "installed": {}, "to_install": []}),
+        json.dumps({"python": PYTHON, "installed": [], "to_install": []}),
+        json.dumps({"python": PYTHON}),
+        "{",
+    ],
+    ids=["other-python", "bad-index", "incomplete", "corrupted"],
+)
+def test_unusable_plan_is_ignored(bootstrapper: ModuleType, tmp_path: Path, content: str) -> None:
+    (tmp_path / "elyra-install-plan.json").write_text(content)
+    assert bootstrapper.OpUtil.load_install_plan() is None
+
+
+def test_satisfied_plan_skips_pip(bootstrapper: ModuleType, tmp_path: Path, pip_calls: list[list[str]]) -> None:
+    (tmp_path / "requirements-elyra.txt").write_text("packaging==1.0\n")
+    _write_plan(
+        tmp_path / "elyra-install-plan.json", requirements_sha256=hashlib.sha256(b"packaging==1.0\n").hexdigest()
+    )
+
+    bootstrapper.OpUtil.package_install(user_volume_path=None)
+
+    assert pip_calls == []
+
+
+def test_changed_requirements_use_the_plan_index(
+    bootstrapper: ModuleType, tmp_path: Path, pip_calls: list[list[str]]
+) -> None:
+    (tmp_path / "requirements-elyra.txt").write_text("packaging==2.0\nminio==7.0\n")
+    _write_plan(
+        tmp_path / "elyra-install-plan.json",
+        requirements_sha256="0" * 64,
+        installed={"packaging": "1.0", "minio": "7.0"},
+    )
+
+    bootstrapper.OpUtil.package_install(user_volume_path=None)
+
+    # no requirements-current.txt: the versions come from the plan
+    assert pip_calls == [["install", "packaging==2.0"], ["freeze"]]
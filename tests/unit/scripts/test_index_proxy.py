@@ -0,0 +1,150 @@
+"""Unit tests for the pylocks_generator index caching proxy."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, ClassVar
+
+import pytest
+
+from scripts.index_proxy import IndexProxy
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    requests: ClassVar[list[str]] = []
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        type(self).requests.append(self.path)
+        if self.path.startswith("/simple/numpy/"):
+            body = json.dumps(
+                {
+                    "meta": {"api-version": "1.1"},
+                    "name": "numpy",
+                    "files": [
+                        {"filename": "numpy-2.0-py3-none-any.whl", "url": "../../files/numpy-2.0-py3-none-any.whl"}
+                    ],
+                }
+            ).encode()
+            content_type = "application/vnd.pypi.simple.v1+json"
+        elif self.path == "/files/numpy-2.0-py3-none-any.whl.metadata":
+            body, content_type = b"Metadata-Version: 2.1\nName: numpy\n", "binary/octet-stream"
+        elif self.path == "/files/numpy-2.0-py3-none-any.whl":
+            body, content_type = b"wheel bytes", "binary/octet-stream"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def upstream() -> Iterator[str]:
+    _Upstream.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def proxy(tmp_path: Path) -> Iterator[IndexProxy]:
+    with IndexProxy(tmp_path / "cache", ttl=600) as p:
+        yield p
+
+
+def _get(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read()
+
+
+def test_pages_and_metadata_are_fetched_once(upstream: str, proxy: IndexProxy) -> None:
+    index = proxy.register(f"{upstream}/simple/?format=json", "2025-01-01T00:00:00Z")
+    assert index.startswith(proxy.base_url)
+    assert index.endswith("/?format=json")
+
+    page_url = index.replace("?format=json", "numpy/?format=json")
+    page = json.loads(_get(page_url))
+    json.loads(_get(page_url))
+    file_url = page["files"][0]["url"]
+    assert file_url.startswith(f"{proxy.base_url}/files/")
+
+    assert _get(file_url + ".metadata").startswith(b"Metadata-Version")
+    assert _get(file_url + ".metadata").startswith(b"Metadata-Version")
+    assert _get(file_url) == b"wheel bytes"
+
+    assert _Upstream.requests.count("/simple/numpy/?format=json") == 1
+    assert _Upstream.requests.count("/files/numpy-2.0-py3-none-any.whl.metadata") == 1
+    assert proxy.stats.hits == 2
+    assert proxy.stats.misses == 2
+    assert proxy.stats.passthrough == 1
+
+
+def test_stale_page_is_refetched_unless_newer_than_cutoff(upstream: str, tmp_path: Path) -> None:
+    with IndexProxy(tmp_path / "cache", ttl=0) as proxy:
+        future_cutoff = proxy.register(f"{upstream}/simple/?format=json", "2999-01-01T00:00:00Z")
+        page_url = future_cutoff.replace("?format=json", "numpy/?format=json")
+        _get(page_url)
+        time.sleep(0.01)
+        _get(page_url)
+        assert _Upstream.requests.count("/simple/numpy/?format=json") == 2
+
+        past_cutoff = proxy.register(f"{upstream}/simple/?format=json", "2000-01-01T00:00:00Z")
+        _get(past_cutoff.replace("?format=json", "numpy/?format=json"))
+        assert _Upstream.requests.count("/simple/numpy/?format=json") == 2
+
+
+def test_missing_upstream_page_keeps_status(upstream: str, proxy: IndexProxy) -> None:
+    index = proxy.register(f"{upstream}/simple/?format=json")
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _get(index.replace("?format=json", "nope/?format=json"))
+    assert excinfo.value.code == 404
+
+
+def test_restore_lockfile(upstream: str, proxy: IndexProxy, tmp_path: Path) -> None:
+    index = proxy.register(f"{upstream}/simple/?format=json")
+    flags = proxy.proxy_index_flags(
+        [f"--default-index={upstream}/simple/?format=json", "--default-index=https://pypi.org/simple"], None
+    )
+    assert flags == [f"--default-index={index}", "--default-index=https://pypi.org/simple"]
+
+    wheel = f"{upstream}/files/numpy-2.0-py3-none-any.whl"
+    page = json.loads(proxy.rewrite_page(json.dumps({"files": [{"url": wheel}]}).encode(), index))
+    lockfile = tmp_path / "pylock.toml"
+    lockfile.write_text(
+        f"#    uv pip compile pyproject.toml --default-index={index}\n"
+        f'wheels = [{{ url = "{page["files"][0]["url"]}" }}]\n'
+    )
+    proxy.restore(lockfile)
+    assert lockfile.read_text() == (
+        f"#    uv pip compile pyproject.toml --default-index={upstream}/simple/?format=json\n"
+        f'wheels = [{{ url = "{wheel}" }}]\n'
+    )
+
+
+def test_restore_with_many_registrations(proxy: IndexProxy) -> None:
+    # one registration per lockfile cutoff; /idx/1 is a prefix of /idx/10 and /idx/11
+    indexes = [
+        proxy.register(f"https://index{i}.example.com/simple/?format=json", f"2025-01-{i + 1:02d}T00:00:00Z")
+        for i in range(12)
+    ]
+    text = "\n".join(f"--default-index={index}" for index in indexes)
+    assert proxy.restore_text(text) == "\n".join(
+        f"--default-index=https://index{i}.example.com/simple/?format=json" for i in range(12)
+    )
@@ -0,0 +1,192 @@
+"""Unit tests for the CVE scripts' Jira issue cache, against a stub client."""
+
+from __future__ import annotations
+
+import re
+import urllib.error
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from scripts.cve.issue_cache import IssueCache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+QUERY = 'project = RHOAIENG AND labels = "CVE"'
+
+
+def _issue(
+    key: str,
+    updated: str = "2025-01-01",
+    *,
+    blocks: tuple[str, ...] = (),
+    blocked_by: tuple[str, ...] = (),
+    duedate: str | None = None,
+) -> dict[str, Any]:
+    links = [{"type": {"name": "Blocks"}, "outwardIssue": {"key": k}} for k in blocks]
+    links += [{"type": {"name": "Blocks"}, "inwardIssue": {"key": k}} for k in blocked_by]
+    return {
+        "key": key,
+        "id": key.rpartition("-")[2],
+        "fields": {"summary": key, "updated": updated, "duedate": duedate, "issuelinks": links},
+    }
+
+
+class StubJira:
+    """Answers the JQL shapes the cache sends from an in-memory set of issues.
+
+    ``matching`` are the keys that match ``QUERY``; ``updated`` are the keys a
+    ``updated >= ...`` clause lets through.  Unknown keys in a key search fail
+    the whole search, as in Jira.
+    """
+
+    def __init__(self, issues: list[dict[str, Any]]) -> None:
+        self.issues = {issue["key"]: issue for issue in issues}
+        self.matching = set(self.issues)
+        self.updated: set[str] = set()
+        self.calls: list[str] = []
+
+    def search_issues(self, jql: str, fields: str, max_results: int = 500) -> list[dict]:
+        self.calls.append(jql)
+        if match := re.match(r"key (?:in \((?P<many>[^)]*)\)|= (?P<one>\S+))", jql):
+            keys = (match["many"] or match["one"]).split(",")
+            if missing := [key for key in keys if key not in self.issues]:
+                raise urllib.error.HTTPError("https://jira.example.com", 400, f"no issue {missing[0]}", {}, None)
+        else:
+            keys = sorted(self.matching)
+        if " AND updated >= " in jql:
+            keys = [key for key in keys if key in self.updated]
+        return [self.issues[key] for key in keys][:max_results]
+
+    def search_issues_many(self, jqls: list[str], fields: str, max_results: int = 500) -> list[list[dict]]:
+        return [self.search_issues(jql, fields, max_results) for jql in jqls]
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[IssueCache]:
+    with IssueCache(tmp_path / "issues.sqlite3") as cache:
+        yield cache
+
+
+def _keys(issues: list[dict]) -> list[str]:
+    return [issue["key"] for issue in issues]
+
+
+class TestSearch:
+    def test_delta_sync_tracks_membership(self, cache: IssueCache) -> None:
+        jira = StubJira([_issue("RHOAIENG-1"), _issue("RHOAIENG-2"), _issue("RHOAIENG-3")])
+        assert _keys(cache.search(jira, QUERY, "summary")) == ["RHOAIENG-1", "RHOAIENG-2", "RHOAIENG-3"]
+        assert jira.calls == [QUERY]
+
+        # 2 was resolved (changed, no longer matching), 3 got a new summary, 4 is new
+        jira.issues["RHOAIENG-3"] = _issue("RHOAIENG-3", "2025-01-02")
+        jira.issues["RHOAIENG-3"]["fields"]["summary"] = "renamed"
+        jira.issues["RHOAIENG-4"] = _issue("RHOAIENG-4", "2025-01-02")
+        jira.matching = {"RHOAIENG-1", "RHOAIENG-3", "RHOAIENG-4"}
+        jira.updated = {"RHOAIENG-2", "RHOAIENG-3", "RHOAIENG-4"}
+        jira.calls.clear()
+
+        issues = cache.search(jira, QUERY, "summary")
+
+        assert _keys(issues) == ["RHOAIENG-1", "RHOAIENG-3", "RHOAIENG-4"]
+        assert issues[1]["fields"]["summary"] == "renamed"
+        assert len(jira.calls) == 2
+        assert jira.calls[0].startswith(f"({QUERY}) AND updated >= ")
+        assert jira.calls[1].startswith("key in (RHOAIENG-1,RHOAIENG-2,RHOAIENG-3) AND updated >= ")
+
+    def test_order_by_is_applied_locally(self, cache: IssueCache) -> None:
+        jira = StubJira(
+            [
+                _issue("RHOAIENG-10", duedate="2025-03-01"),
+                _issue("RHOAIENG-9"),
+                _issue("RHOAIENG-11", duedate="2025-02-01"),
+            ]
+        )
+
+        by_created = cache.search(jira, f"{QUERY} ORDER BY created DESC", "summary")
+        by_due = cache.search(jira, f"{QUERY} order by duedate", "summary")
+
+        assert _keys(by_created) == ["RHOAIENG-11", "RHOAIENG-10", "RHOAIENG-9"]
+        # issues without the field come last
+        assert _keys(by_due) == ["RHOAIENG-11", "RHOAIENG-10", "RHOAIENG-9"]
+        # the ORDER BY is not part of the cached query: the second search is a delta of the first
+        assert jira.calls[1].startswith(f"({QUERY}) AND updated >= ")
+
+    def test_failed_delta_falls_back_to_full_sync(self, cache: IssueCache) -> None:
+        jira = StubJira([_issue("RHOAIENG-1"), _issue("RHOAIENG-2")])
+        cache.search(jira, QUERY, "summary")
+
+        # a deleted member makes the "key in (...)" delta search fail
+        del jira.issues["RHOAIENG-2"]
+        jira.matching = {"RHOAIENG-1"}
+        jira.calls.clear()
+
+        assert _keys(cache.search(jira, QUERY, "summary")) == ["RHOAIENG-1"]
+        assert jira.calls[-1] == QUERY
+
+    def test_full_sync_on_request(self, tmp_path: Path) -> None:
+        jira = StubJira([_issue("RHOAIENG-1")])
+        with IssueCache(tmp_path / "issues.sqlite3") as cache:
+            cache.search(jira, QUERY, "summary")
+        with IssueCache(tmp_path / "issues.sqlite3", full_sync=True) as cache:
+            cache.search(jira, QUERY, "summary")
+        assert jira.calls == [QUERY, QUERY]
+
+
+class TestGetIssues:
+    def test_refreshes_cached_issues_with_a_delta(self, cache: IssueCache) -> None:
+        jira = StubJira([_issue("RHOAIENG-1"), _issue("RHOAIENG-2")])
+        assert set(cache.get_issues(jira, ["RHOAIENG-1", "RHOAIENG-2"], "summary")) == {"RHOAIENG-1", "RHOAIENG-2"}
+        assert jira.calls == ["key in (RHOAIENG-1,RHOAIENG-2)"]
+
+        jira.issues["RHOAIENG-2"] = _issue("RHOAIENG-2", "2025-01-02", duedate="2025-05-01")
+        jira.updated = {"RHOAIENG-2"}
+        jira.calls.clear()
+        issues = cache.get_issues(jira, ["RHOAIENG-1", "RHOAIENG-2"], "summary")
+
+        assert len(jira.calls) == 1
+        assert jira.calls[0].startswith("key in (RHOAIENG-1,RHOAIENG-2) AND updated >= ")
+        assert issues["RHOAIENG-2"]["fields"]["duedate"] == "2025-05-01"
+
+        # a field that is not cached yet downloads the issues in full
+        jira.calls.clear()
+        cache.get_issues(jira, ["RHOAIENG-1", "RHOAIENG-2"], "summary,assignee")
+        assert jira.calls == ["key in (RHOAIENG-1,RHOAIENG-2)"]
+
+    def test_stale_key_falls_back_to_one_by_one(self, cache: IssueCache) -> None:
+        jira = StubJira([_issue("RHOAIENG-1", blocks=("RHOAIENG-2",)), _issue("RHOAIENG-2")])
+        cache.get_issues(jira, ["RHOAIENG-1", "RHOAIENG-2"], "summary")
+        del jira.issues["RHOAIENG-1"]
+
+        issues = cache.get_issues(jira, ["RHOAIENG-1", "RHOAIENG-2"], "summary")
+
+        assert set(issues) == {"RHOAIENG-2"}
+        assert jira.calls[-2:] == ["key = RHOAIENG-1", "key = RHOAIENG-2"]
+        # the deleted issue and its links are forgotten
+        assert cache.linked_keys("RHOAIENG-2", inward=True) == []
+
+
+class TestLinkedKeys:
+    def test_links_follow_the_latest_issue_data(self, cache: IssueCache) -> None:
+        jira = StubJira(
+            [
+                _issue("RHAIENG-1", blocks=("RHOAIENG-1", "RHOAIENG-2")),
+                _issue("RHOAIENG-1", blocked_by=("RHAIENG-1",)),
+                _issue("RHOAIENG-2", blocked_by=("RHAIENG-1",)),
+            ]
+        )
+        cache.search(jira, QUERY, "summary,issuelinks")
+
+        assert cache.linked_keys("RHAIENG-1") == ["RHOAIENG-1", "RHOAIENG-2"]
+        assert cache.linked_keys("RHOAIENG-2", "Blocks", inward=True) == ["RHAIENG-1"]
+        assert cache.linked_keys("RHOAIENG-2", "Cloners", inward=True) == []
+
+        # unlinking updates both issues; either one's links replace the edges it touches
+        jira.issues["RHOAIENG-2"] = _issue("RHOAIENG-2", "2025-01-02")
+        jira.updated = {"RHOAIENG-2"}
+        cache.search(jira, QUERY, "summary,issuelinks")
+
+        assert cache.linked_keys("RHAIENG-1") == ["RHOAIENG-1"]
+        assert cache.linked_keys("RHOAIENG-2", inward=True) == []
@@ -0,0 +1,256 @@
+"""Unit tests for the Jira client: retries on a stubbed ``requests.Session``, the bulk helpers, and the keep-alive
+fallback without ``requests``."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+from typing import TYPE_CHECKING, Any, ClassVar
+from urllib.parse import urlparse
+
+import pytest
+import requests
+
+from scripts.cve import jira_client
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+BASE_URL = "https://jira.example.com"
+
+# (status, headers, JSON payload) for a request: method, path, query params and JSON body
+Reply = tuple[int, dict[str, str], Any]
+
+
+class StubSession:
+    """A ``requests.Session`` answering each request with a ``Reply`` from ``handler``; requests are recorded."""
+
+    def __init__(self, handler: Callable[[str, str, dict[str, Any], Any], Reply]) -> None:
+        self.handler = handler
+        self.calls: list[tuple[str, str, Any]] = []
+        self._lock = threading.Lock()
+
+    def request(
+        self, method: str, url: str, params: dict | None = None, data: bytes | None = None, **kwargs: object
+    ) -> requests.Response:
+        body = json.loads(data) if data else None
+        path = urlparse(url).path
+        with self._lock:
+            self.calls.append((method, path, body))
+            status, headers, payload = self.handler(method, path, params or {}, body)
+        response = requests.Response()
+        response.status_code, response.url = status, url
+        response.headers.update(headers)
+        response._content = json.dumps(payload).encode() if payload is not None else b""
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def scripted(*replies: Reply | Exception) -> Callable[..., Reply]:
+    """A handler that answers with ``replies`` in order, then with 200."""
+    queue = list(replies)
+
+    def handler(*args: object) -> Reply:
+        reply = queue.pop(0) if queue else (200, {}, {})
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    return handler
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Backoff delays, recorded instead of slept."""
+    delays: list[float] = []
+    monkeypatch.setattr(jira_client.time, "sleep", delays.append)
+    return delays
+
+
+def _client(handler: Callable[..., Reply]) -> tuple[jira_client.JiraClient, StubSession]:
+    client = jira_client.JiraClient(BASE_URL, requests_per_second=0)
+    client._session = session = StubSession(handler)
+    return client, session
+
+
+class TestRetries:
+    def test_429_is_retried_after_retry_after(self, sleeps: list[float]) -> None:
+        client, session = _client(scripted((429, {"Retry-After": "7"}, None), (200, {}, {"key": "RHOAIENG-1"})))
+        assert client.get_issue("RHOAIENG-1", "summary") == {"key": "RHOAIENG-1"}
+        assert len(session.calls) == 2
+        assert sleeps == [7.0]
+
+    def test_get_is_retried_on_5xx_with_backoff(self, sleeps: list[float]) -> None:
+        client, session = _client(scripted((502, {}, None), (503, {}, None), (200, {}, {"key": "RHOAIENG-1"})))
+        assert client.get_issue("RHOAIENG-1", "summary") == {"key": "RHOAIENG-1"}
+        assert len(session.calls) == 3
+        assert len(sleeps) == 2
+        assert sleeps[0] < sleeps[1]
+
+    def test_post_is_not_resent_after_5xx(self, sleeps: list[float]) -> None:
+        client, session = _client(scripted((503, {}, None)))
+        with pytest.raises(requests.HTTPError) as excinfo:
+            client.create_issue("RHOAIENG", "CVE-2025-0001", "Bug")
+        assert excinfo.value.response.status_code == 503
+        assert [method for method, _, _ in session.calls] == ["POST"]
+        assert sleeps == []
+
+    def test_post_is_resent_after_429(self, sleeps: list[float]) -> None:
+        client, session = _client(scripted((429, {"Retry-After": "1"}, None), (201, {}, {"key": "RHOAIENG-2"})))
+        assert client.create_issue("RHOAIENG", "CVE-2025-0001", "Bug") == {"key": "RHOAIENG-2"}
+        assert [method for method, _, _ in session.calls] == ["POST", "POST"]
+
+    def test_gives_up_after_the_last_attempt(self, sleeps: list[float]) -> None:
+        client, session = _client(scripted(*[(500, {}, None)] * jira_client._MAX_ATTEMPTS))
+        with pytest.raises(requests.HTTPError):
+            client.get_issue("RHOAIENG-1", "summary")
+        assert len(session.calls) == jira_client._MAX_ATTEMPTS
+        assert len(sleeps) == jira_client._MAX_ATTEMPTS - 1
+
+    def test_client_errors_are_not_retried(self, sleeps: list[float]) -> None:
+        client, session = _client(scripted((404, {}, {"errorMessages": ["Issue does not exist"]})))
+        with pytest.raises(requests.HTTPError):
+            client.get_issue("RHOAIENG-404", "summary")
+        assert len(session.calls) == 1
+
+    def test_connection_errors_are_retried_for_get_only(self, sleeps: list[float]) -> None:
+        client, session = _client(scripted(requests.ConnectionError(), (200, {}, {"key": "RHOAIENG-1"})))
+        assert client.get_issue("RHOAIENG-1", "summary") == {"key": "RHOAIENG-1"}
+        assert len(session.calls) == 2
+
+        client, session = _client(scripted(requests.ConnectionError()))
+        with pytest.raises(requests.ConnectionError):
+            client.create_issue_link("Blocks", "RHAIENG-1", "RHOAIENG-1")
+        assert len(session.calls) == 1
+
+
+class TestBulkHelpers:
+    def test_update_issues_reports_errors_per_issue(self, sleeps: list[float]) -> None:
+        def handler(method: str, path: str, params: dict[str, Any], body: Any) -> Reply:
+            return (400, {}, {"errors": {"duedate": "invalid"}}) if path.endswith("/RHOAIENG-2") else (204, {}, None)
+
+        client, session = _client(handler)
+        updates = {f"RHOAIENG-{i}": {"duedate": f"2025-06-0{i}"} for i in range(1, 4)}
+
+        errors = client.update_issues(updates)
+
+        assert list(errors) == ["RHOAIENG-1", "RHOAIENG-2", "RHOAIENG-3"]
+        assert errors["RHOAIENG-1"] is None
+        assert isinstance(errors["RHOAIENG-2"], requests.HTTPError)
+        assert errors["RHOAIENG-3"] is None
+        assert sorted(session.calls) == [
+            ("PUT", f"/rest/api/3/issue/RHOAIENG-{i}", {"fields": {"duedate": f"2025-06-0{i}"}}) for i in range(1, 4)
+        ]
+
+    def test_create_issue_links_reports_errors_per_link(self, sleeps: list[float]) -> None:
+        def handler(method: str, path: str, params: dict[str, Any], body: Any) -> Reply:
+            return (404, {}, None) if body["outwardIssue"]["key"] == "RHOAIENG-9" else (201, {}, None)
+
+        client, session = _client(handler)
+
+        errors = client.create_issue_links("Blocks", "RHAIENG-1", ["RHOAIENG-1", "RHOAIENG-9"])
+
+        assert errors["RHOAIENG-1"] is None
+        assert isinstance(errors["RHOAIENG-9"], requests.HTTPError)
+        assert sorted(body["outwardIssue"]["key"] for _, _, body in session.calls) == ["RHOAIENG-1", "RHOAIENG-9"]
+        assert {(method, path) for method, path, _ in session.calls} == {("POST", "/rest/api/3/issueLink")}
+
+    def test_search_issues_many_keeps_order_and_pages(self, sleeps: list[float]) -> None:
+        def handler(method: str, path: str, params: dict[str, Any], body: Any) -> Reply:
+            project = params["jql"].removeprefix("project = ")
+            if "nextPageToken" in params:
+                return 200, {}, {"issues": [{"key": f"{project}-2"}], "isLast": True}
+            # the first project's results come back on two pages
+            is_last = project != "RHOAIENG"
+            return 200, {}, {"issues": [{"key": f"{project}-1"}], "isLast": is_last, "nextPageToken": "page-2"}
+
+        client, _ = _client(handler)
+        jqls = [f"project = {project}" for project in ["RHOAIENG", "RHAIENG", "RHOAIBUGS"]]
+
+        results = client.search_issues_many(jqls, "summary")
+
+        assert [[issue["key"] for issue in issues] for issues in results] == [
+            ["RHOAIENG-1", "RHOAIENG-2"],
+            ["RHAIENG-1"],
+            ["RHOAIBUGS-1"],
+        ]
+
+
+class FakeConnection:
+    """An ``http.client`` connection whose requests fail with scripted errors, then answer 200."""
+
+    errors: ClassVar[list[tuple[str, Exception]]] = []
+    sent: ClassVar[list[str]] = []
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        pass
+
+    def request(self, method: str, path: str, body: bytes | None = None, headers: dict | None = None) -> None:
+        type(self).sent.append(method)
+        self._fail("request")
+
+    def getresponse(self) -> FakeConnection:
+        self._fail("getresponse")
+        self.status, self.headers = 200, {}
+        return self
+
+    def read(self) -> bytes:
+        self._fail("read")
+        return b"{}"
+
+    def close(self) -> None:
+        pass
+
+    def _fail(self, step: str) -> None:
+        if self.errors and self.errors[0][0] == step:
+            raise self.errors.pop(0)[1]
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> jira_client.JiraClient:
+    monkeypatch.setattr(jira_client.http.client, "HTTPSConnection", FakeConnection)
+    monkeypatch.setattr(FakeConnection, "errors", [])
+    monkeypatch.setattr(FakeConnection, "sent", [])
+    client = jira_client.JiraClient("https://jira.example.com")
+    # open the keep-alive connection
+    client._urllib_send("GET", "https://jira.example.com/rest/api/3/myself", None)
+    FakeConnection.sent.clear()
+    return client
+
+
+@pytest.mark.parametrize("error", [http.client.RemoteDisconnected("closed"), BrokenPipeError()])
+def test_post_is_resent_when_the_idle_connection_was_closed(client: jira_client.JiraClient, error: Exception) -> None:
+    FakeConnection.errors = [("request" if isinstance(error, BrokenPipeError) else "getresponse", error)]
+    assert client._urllib_send("POST", "https://jira.example.com/rest/api/3/issue", b"{}")[0] == 200
+    assert FakeConnection.sent == ["POST", "POST"]
+
+
+def test_post_is_not_resent_after_the_response_started(client: jira_client.JiraClient) -> None:
+    FakeConnection.errors = [("read", TimeoutError())]
+    with pytest.raises(TimeoutError):
+        client._urllib_send("POST", "https://jira.example.com/rest/api/3/issue", b"{}")
+    assert FakeConnection.sent == ["POST"]
+
+
+def test_post_is_not_resent_on_timeout(client: jira_client.JiraClient) -> None:
+    FakeConnection.errors = [("getresponse", TimeoutError())]
+    with pytest.raises(TimeoutError):
+        client._urllib_send("POST", "https://jira.example.com/rest/api/3/issue", b"{}")
+    assert FakeConnection.sent == ["POST"]
+
+
+def test_get_is_resent_on_any_error(client: jira_client.JiraClient) -> None:
+    FakeConnection.errors = [("read", TimeoutError())]
+    assert client._urllib_send("GET", "https://jira.example.com/rest/api/3/search/jql", None)[0] == 200
+    assert FakeConnection.sent == ["GET", "GET"]
+
+
+def test_fresh_connection_errors_are_raised(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(jira_client.http.client, "HTTPSConnection", FakeConnection)
+    monkeypatch.setattr(FakeConnection, "errors", [("request", BrokenPipeError())])
+    monkeypatch.setattr(FakeConnection, "sent", [])
+    with pytest.raises(BrokenPipeError):
+        jira_client.JiraClient("https://jira.example.com")._urllib_send("GET", "https://jira.example.com/", None)
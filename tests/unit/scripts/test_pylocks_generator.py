@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
 import pytest
@@ -135,3 +136,190 @@ class TestEnsureJsonFormatParam:
         result = pg.ensure_json_format_param(url)
         assert result == url + "?format=json"
         assert pg.ensure_json_format_param(result) == result
+
+
+class TestInputFingerprint:
+    @pytest.fixture(autouse=True)
+    def fingerprints_dir(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        directory = tmp_path / "cache" / "fingerprints"
+        monkeypatch.setattr(pg, "FINGERPRINTS_DIR", directory)
+        return directory
+
+    @pytest.fixture
+    def project(self, tmp_path: Path) -> Path:
+        meta = tmp_path / "dependencies" / "meta-deps"
+        meta.mkdir(parents=True)
+        (meta / "pyproject.toml").write_text('[project]\nname = "meta-deps"\ndependencies = ["numpy"]\n')
+        project = tmp_path / "image" / "ubi9-python-3.12"
+        project.mkdir(parents=True)
+        (project / "pyproject.toml").write_text(
+            '[project]\nname = "image"\ndependencies = ["meta-deps"]\n\n'
+            '[tool.uv.sources]\nmeta-deps = { path = "../../dependencies/meta-deps" }\n'
+        )
+        return project
+
+    @pytest.fixture
+    def lockfile(self, project: Path) -> Path:
+        lockfile = project / "uv.lock.d" / "pylock.cpu.toml"
+        lockfile.parent.mkdir()
+        lockfile.write_text(
+            "# This file was autogenerated by uv via the following command:\n"
+            "#    uv pip compile pyproject.toml --exclude-newer=2025-06-01T12:30:45Z\n"
+            'lock-version = "1.0"\n',
+            encoding="utf-8",
+        )
+        return lockfile
+
+    def test_local_source_pyprojects(self, project: Path) -> None:
+        assert pg.local_source_pyprojects(project / "pyproject.toml") == [
+            (project / "../../dependencies/meta-deps/pyproject.toml").resolve()
+        ]
+
+    def test_record_and_match(self, project: Path, lockfile: Path, fingerprints_dir: Path) -> None:
+        flags = ["--default-index=https://example.com/simple/?format=json"]
+        content = lockfile.read_text()
+        assert not pg.is_lock_up_to_date(project, lockfile, flags, "3.12")
+
+        pg.record_fingerprint(lockfile, pg.lockfile_fingerprint(project, lockfile, flags, "3.12"))
+        # the committed lockfile is left alone
+        assert lockfile.read_text() == content
+        assert len(list(fingerprints_dir.iterdir())) == 1
+        assert pg.is_lock_up_to_date(project, lockfile, flags, "3.12")
+
+        # re-recording replaces the previous record
+        pg.record_fingerprint(lockfile, "sha256:other")
+        assert pg.read_recorded_fingerprint(lockfile) == "sha256:other"
+        assert len(list(fingerprints_dir.iterdir())) == 1
+
+    def test_edited_lockfile_is_not_up_to_date(self, project: Path, lockfile: Path) -> None:
+        flags = ["--default-index=https://example.com/simple/?format=json"]
+        pg.record_fingerprint(lockfile, pg.lockfile_fingerprint(project, lockfile, flags, "3.12"))
+
+        # e.g. a hand-edited pin, or another branch checked out
+        lockfile.write_text(lockfile.read_text() + '\n[[packages]]\nname = "numpy"\nversion = "1.0"\n')
+
+        assert pg.read_recorded_fingerprint(lockfile) is None
+        assert not pg.is_lock_up_to_date(project, lockfile, flags, "3.12")
+
+    def test_uv_version_invalidates(self, project: Path, lockfile: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        flags = ["--default-index=https://example.com/simple/?format=json"]
+        pg.record_fingerprint(lockfile, pg.lockfile_fingerprint(project, lockfile, flags, "3.12"))
+
+        monkeypatch.setattr(pg, "pinned_uv_version", lambda: "==0.0.1")
+
+        assert not pg.is_lock_up_to_date(project, lockfile, flags, "3.12")
+
+    def test_inputs_invalidate(self, project: Path, lockfile: Path) -> None:
+        flags = ["--default-index=https://example.com/simple/?format=json"]
+        pg.record_fingerprint(lockfile, pg.lockfile_fingerprint(project, lockfile, flags, "3.12"))
+
+        assert not pg.is_lock_up_to_date(project, lockfile, ["--default-index=https://other.example.com/"], "3.12")
+        assert not pg.is_lock_up_to_date(project, lockfile, flags, "3.11")
+
+        meta = project / "../../dependencies/meta-deps/pyproject.toml"
+        meta.write_text('[project]\nname = "meta-deps"\ndependencies = ["numpy", "pandas"]\n')
+        assert not pg.is_lock_up_to_date(project, lockfile, flags, "3.12")
+
+
+class TestJobScheduling:
+    def test_job_key_is_repo_relative(self) -> None:
+        tdir = _REPO_ROOT / "jupyter" / "minimal" / "ubi9-python-3.12"
+        assert pg.job_key(tdir, "cuda") == "jupyter/minimal/ubi9-python-3.12:cuda"
+
+    def test_timings_roundtrip(self, tmp_path: Path) -> None:
+        path = tmp_path / "nested" / "timings.json"
+        assert pg.load_job_timings(path) == {}
+        pg.save_job_timings({"a:cpu": 12.5}, path)
+        assert pg.load_job_timings(path) == {"a:cpu": 12.5}
+
+    def test_load_timings_ignores_garbage(self, tmp_path: Path) -> None:
+        path = tmp_path / "timings.json"
+        path.write_text("not json")
+        assert pg.load_job_timings(path) == {}
+
+    def test_order_jobs_longest_first(self) -> None:
+        a = _REPO_ROOT / "a"
+        b = _REPO_ROOT / "b"
+        timings = {"a:cpu": 10.0, "b:cpu": 200.0, "a:rocm": 50.0}
+        jobs = [(a, "cpu"), (a, "rocm"), (b, "cpu"), (b, "rocm"), (b, "cuda")]
+        # b:rocm has no history -> mean of recorded rocm jobs (50); cuda falls back to the default
+        assert pg.order_jobs(jobs, timings) == [(b, "cpu"), (b, "cuda"), (a, "rocm"), (b, "rocm"), (a, "cpu")]
+
+
+class TestConcurrencyController:
+    def test_additive_increase_up_to_maximum(self) -> None:
+        ctl = pg.ConcurrencyController(initial=2, maximum=3, is_cpu_saturated=lambda: False)
+        for _ in range(3):
+            assert ctl.acquire() <= 3
+            ctl.release(pg.LockStatus.ok, elapsed=10.0, expected=10.0)
+        assert ctl.limit == 3
+        assert ctl.peak == 3
+        assert [a["limit"] for a in ctl.adjustments] == [3]
+
+    def test_timeout_and_throttling_halve(self) -> None:
+        ctl = pg.ConcurrencyController(initial=8, maximum=8, is_cpu_saturated=lambda: False)
+        ctl.acquire()
+        ctl.release(pg.LockStatus.throttled, elapsed=30.0, expected=None)
+        assert ctl.limit == 4
+        ctl.acquire()
+        ctl.release(pg.LockStatus.timeout, elapsed=600.0, expected=None)
+        assert ctl.limit == 2
+        assert "timeout" in str(ctl.adjustments[-1]["reason"])
+
+    def test_slow_jobs_and_cpu_saturation_back_off(self) -> None:
+        saturated = [False]
+        ctl = pg.ConcurrencyController(initial=4, maximum=8, is_cpu_saturated=lambda: saturated[0])
+        ctl.acquire()
+        ctl.release(pg.LockStatus.ok, elapsed=100.0, expected=20.0)
+        assert ctl.limit == 3
+        saturated[0] = True
+        ctl.acquire()
+        ctl.release(pg.LockStatus.ok, elapsed=10.0, expected=20.0)
+        assert ctl.limit == 2
+
+    def test_skipped_jobs_do_not_adjust(self) -> None:
+        ctl = pg.ConcurrencyController(initial=1, maximum=4, is_cpu_saturated=lambda: False)
+        ctl.acquire()
+        ctl.release(None, elapsed=0.0, expected=None)
+        assert ctl.limit == 1
+        assert ctl.adjustments == []
+
+    def test_never_below_minimum(self) -> None:
+        ctl = pg.ConcurrencyController(initial=1, maximum=4, is_cpu_saturated=lambda: False)
+        ctl.acquire()
+        ctl.release(pg.LockStatus.timeout, elapsed=600.0, expected=None)
+        assert ctl.limit == 1
+
+    def test_report(self, tmp_path: Path) -> None:
+        ctl = pg.ConcurrencyController(initial=2, maximum=4, is_cpu_saturated=lambda: False)
+        report = tmp_path / "report.json"
+        jobs = [{"job": "a:cpu", "status": "ok", "success": True, "elapsed": 1.0, "concurrency": 2}]
+        pg.write_concurrency_report(report, ctl, 2, jobs, wall_time=1.0)
+        data = json.loads(report.read_text())
+        assert data["initial_workers"] == 2
+        assert data["max_workers"] == 4
+        assert data["jobs"] == jobs
+
+
+def test_generate_requirements_txt_in_process(tmp_path: Path) -> None:
+    (tmp_path / "build-args").mkdir()
+    (tmp_path / "build-args" / "cpu.conf").write_text("INDEX_URL=https://example.com/simple/\n")
+    (tmp_path / "uv.lock.d").mkdir()
+    (tmp_path / "uv.lock.d" / "pylock.cpu.toml").write_text(
+        "# This file was autogenerated by uv via the following command:\n"
+        "#    uv pip compile pyproject.toml --default-index=https://example.com/simple/?format=json\n"
+        'lock-version = "1.0"\n\n'
+        "[[packages]]\n"
+        'name = "six"\n'
+        'version = "1.17.0"\n'
+        'wheels = [{ url = "https://example.com/six-1.17.0-py2.py3-none-any.whl", hashes = { sha256 = "abc" } }]\n',
+        encoding="utf-8",
+    )
+    log = pg.LogBuffer(buffered=True)
+    assert pg.generate_requirements_txt(tmp_path, "cpu", log)
+    assert (tmp_path / "requirements.cpu.txt").read_text() == (
+        "--index-url https://example.com/simple/\nsix==1.17.0 \\\n    --hash=sha256:abc\n"
+    )
+
+    (tmp_path / "uv.lock.d" / "pylock.cpu.toml").write_text("not = [toml", encoding="utf-8")
+    assert not pg.generate_requirements_txt(tmp_path, "cpu", log)
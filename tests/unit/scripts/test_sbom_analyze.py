@@ -0,0 +1,124 @@
+"""Unit tests for sbom_analyze: the streaming and indexed queries must match the json.load path."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from scripts.cve import sbom_analyze
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _spdx_package(name: str, version: str, purl: str, path: str) -> dict[str, Any]:
+    return {
+        "name": name,
+        "versionInfo": version,
+        "externalRefs": [{"referenceType": "purl", "referenceLocator": purl}],
+        "sourceInfo": f"acquired package info from installed node module manifest file: {path}",
+    }
+
+
+SPDX_PACKAGES = [
+    _spdx_package("lodash", "4.17.21", "pkg:npm/lodash@4.17.21", "/jupyter/utils/addons/pnpm-lock.yaml"),
+    _spdx_package("Jinja2", "3.1.4", "pkg:pypi/jinja2@3.1.4", "/opt/app-root/lib/python3.12/site-packages"),
+    _spdx_package("openssl-libs", "3.0.7", "pkg:rpm/redhat/openssl-libs@3.0.7", "/var/lib/rpm/rpmdb.sqlite"),
+]
+
+SBOMS: dict[str, dict[str, Any]] = {
+    "syft": {
+        "artifacts": [
+            {
+                "name": "lodash",
+                "version": "4.17.21",
+                "type": "npm",
+                "foundBy": "javascript-lock-cataloger",
+                "locations": [{"path": "/jupyter/utils/addons/pnpm-lock.yaml"}],
+                "purl": "pkg:npm/lodash@4.17.21",
+            },
+            {"name": "jinja2", "version": "3.1.4", "type": "python", "locations": [{"path": "/opt/app-root"}]},
+        ],
+        "files": [{"id": "1"}, {"id": "2"}],
+        "source": {"name": "workbench", "version": "sha256:abc", "type": "image"},
+        "distro": {"name": "rhel", "version": "9.6"},
+        "descriptor": {"version": "1.20.0"},
+        "schema": {"version": "16.0.0"},
+    },
+    # metadata keys before the decisive one, as manifest-box writes them
+    "spdx-manifest-box": {
+        "spdxVersion": "SPDX-2.3",
+        "build_component": "odh-workbench-jupyter-minimal",
+        "build_completed_at": "2025-06-01T12:30:45Z",
+        "build_manifest": {"manifest": {"components": SPDX_PACKAGES[:1]}},
+    },
+    "spdx": {"spdxVersion": "SPDX-2.3", "name": "workbench", "packages": SPDX_PACKAGES},
+    # "packages" is checked after "build_manifest.manifest", whatever order the keys are in
+    "spdx-manifest-box-with-packages": {
+        "packages": SPDX_PACKAGES,
+        "build_manifest": {"manifest": {"components": SPDX_PACKAGES[1:]}},
+    },
+    "spdx-build-manifest-without-manifest": {
+        "build_manifest": {"other": {}},
+        "name": "workbench",
+        "packages": SPDX_PACKAGES,
+    },
+    "unknown": {"name": "not an sbom"},
+}
+
+
+def _expected(sbom: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "info": sbom_analyze.get_sbom_info(sbom),
+        "summary": sbom_analyze.summarize_by_type(sbom),
+        "path": sbom_analyze.find_packages_at_path(sbom, "/jupyter/"),
+        "search": sbom_analyze.find_package(sbom, "JINJA"),
+    }
+
+
+@pytest.fixture(params=sorted(SBOMS))
+def sbom_file(request: pytest.FixtureRequest, tmp_path: Path) -> tuple[Path, dict[str, Any]]:
+    path = tmp_path / f"{request.param}.json"
+    path.write_text(json.dumps(SBOMS[request.param]))
+    return path, SBOMS[request.param]
+
+
+QUERY = {"info": True, "summary": True, "path": "/jupyter/", "package_name": "JINJA"}
+
+
+def test_streaming_query_matches_json_load(sbom_file: tuple[Path, dict[str, Any]]) -> None:
+    pytest.importorskip("ijson")
+    path, sbom = sbom_file
+    assert sbom_analyze.SbomStream(str(path)).format == sbom_analyze.detect_sbom_format(sbom)
+    assert sbom_analyze.query_sbom(str(path), **QUERY) == _expected(sbom)
+
+
+def test_query_without_ijson_matches_json_load(
+    sbom_file: tuple[Path, dict[str, Any]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path, sbom = sbom_file
+    monkeypatch.setattr(sbom_analyze, "HAS_IJSON", False)
+    assert sbom_analyze.query_sbom(str(path), **QUERY) == _expected(sbom)
+
+
+def test_index_query_matches_json_load(sbom_file: tuple[Path, dict[str, Any]], tmp_path: Path) -> None:
+    path, sbom = sbom_file
+    index = sbom_analyze.SbomIndex.open(str(path), tmp_path / "index.sqlite3")
+    try:
+        assert index.query(**QUERY) == _expected(sbom)
+    finally:
+        index.close()
+
+
+def test_index_query_without_ijson_matches_json_load(
+    sbom_file: tuple[Path, dict[str, Any]], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path, sbom = sbom_file
+    monkeypatch.setattr(sbom_analyze, "HAS_IJSON", False)
+    index = sbom_analyze.SbomIndex.open(str(path), tmp_path / "index.sqlite3")
+    try:
+        assert index.query(**QUERY) == _expected(sbom)
+    finally:
+        index.close()